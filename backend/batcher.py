@@ -0,0 +1,84 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT = 0.02  # seconds a partial batch may wait for more frames
+
+
+class InferenceBatcher:
+    """
+    Single inference thread that owns the model calls.
+
+    Worker threads submit one preprocessed frame each and get a Future; the
+    inference thread stacks whatever arrived into one [N, ...] array (up to
+    batch_size frames, or fewer once the oldest frame has waited max_wait)
+    and resolves every Future with its own row of the output. One call on
+    N frames replaces N batch-of-one calls and their per-call dispatch.
+    `postprocess`, if given, maps the whole [N, ...] output to N per-frame
+    results, so per-row work is vectorized over the batch as well.
+    """
+
+    def __init__(self, model_fn, batch_size=DEFAULT_BATCH_SIZE, max_wait=DEFAULT_MAX_WAIT, postprocess=None):
+        self.model_fn = model_fn
+        self.postprocess = postprocess
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.stats = {"batches": 0, "frames": 0, "max_batch": 0}
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, frame):
+        future = Future()
+        self._queue.put((frame, future, time.monotonic()))
+        return future
+
+    def infer(self, frame):
+        """Blocking submit: the model output row (or postprocessed result) for this frame."""
+        return self.submit(frame).result()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            batch = []
+            # Gather frames until the batch is full or the oldest frame has waited max_wait
+            while True:
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                timeout = batch[0][2] + self.max_wait - time.monotonic()
+                try:
+                    # Past the deadline, still take frames that are already queued
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        futures = [f for _, f, _ in batch]
+        try:
+            outputs = self.model_fn(np.stack([frame for frame, _, _ in batch]))
+            if self.postprocess is not None:
+                outputs = self.postprocess(outputs)
+        except Exception as e:
+            for f in futures:
+                f.set_exception(e)
+            return
+        self.stats["batches"] += 1
+        self.stats["frames"] += len(batch)
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        for f, row in zip(futures, outputs):
+            f.set_result(row)
@@ -1,3 +1,6 @@
+import time
+STARTED_AT = time.perf_counter()
+
 import warnings
 import sys
 import os
@@ -12,24 +15,27 @@ sys.stdin.reconfigure(encoding='utf-8')
 sys.stdout.reconfigure(encoding='utf-8')
 
 def log_error(msg):
-    print(json.dumps({"status": "error", "message": msg}), flush=True)
+    emit({"status": "error", "message": msg})
 
+# Only light modules here: service mode must answer within a fraction of a second.
+# cv2/pillow_heif, MediaPipe and the inference runtime load in the background (load_models).
 try:
-    import sqlite3
     import json
-    import requests
-    import shutil
-    import pillow_heif
-    import subprocess
-    import cv2
     import numpy as np
-    import tensorflow as tf
-    import tensorflow_hub as hub
-    import mediapipe as mp
     from concurrent.futures import ThreadPoolExecutor, as_completed
     import threading
     import queue
-    import hashlib
+    from collections import Counter
+    from dedup import files_are_identical
+    import file_ops
+    import db
+    import hashing
+    from name_registry import NameRegistry
+    from batcher import InferenceBatcher, DEFAULT_BATCH_SIZE, DEFAULT_MAX_WAIT
+    from face_detector import FaceDetectorPool, LONG_RANGE, SHORT_RANGE
+    from inference import load_model, resolve_model, BACKENDS, DEFAULT_BACKEND
+    from classify_cache import ClassificationCache, ClassifyResult, DEFAULT_CACHE_DIR, DEFAULT_MAX_ENTRIES
+    from progress import ProgressReporter, emit
 except Exception as e:
     # Use fallback json via simple print since imports might have failed
     import json
@@ -43,13 +49,45 @@ PAUSE_EVENT.set()
 STOP_EVENT = threading.Event()
 
 # Models
-TF_MODEL_CLS = None
+MODEL_CLS = None
+MODEL_VERSION = None
 TF_LABELS = []
+FOOD_MASK = None    # [classes] bool: label contains a FOOD_KEYWORDS word
+PEOPLE_MASK = None  # [classes] bool: label contains a STRONG_PEOPLE_LABELS word
 MP_FACE_DETECTION = None
+BATCHER = None
+
+# Inference batching: MobileNet runs once per batch of frames instead of once per image.
+# Batches only fill when enough workers are waiting on the model, so the worker
+# count defaults to the batch size (bounded by the CPU count).
+INFERENCE_BATCH_SIZE = DEFAULT_BATCH_SIZE
+INFERENCE_MAX_WAIT = DEFAULT_MAX_WAIT
+CLASSIFY_WORKERS = None
+
+# Decode/resize runs in this many worker processes (None: one per core but one,
+# 0: in the classifier threads)
+PREPROCESS_WORKERS = None
+
+# MobileNet runtime: 'tf' (SavedModel via TensorFlow), 'tflite' or 'onnx' (see convert_model.py)
+INFERENCE_BACKEND = DEFAULT_BACKEND
+MODEL_PATH = None  # None: the backend's default model under models/
+
+# Results cache keyed by file content hash + model version (None: disabled).
+# Bump RULES_VERSION whenever the decision rules or keywords change.
+CACHE_DIR = DEFAULT_CACHE_DIR
+CACHE_SIZE = DEFAULT_MAX_ENTRIES
+RULES_VERSION = 'v3'
+TOP_K = 25
+
+# A face at least this confident means People whatever MobileNet says
+FACE_OVERRIDE_SCORE = 0.70
+
+# How often each cascade exit decided an image (reset per run)
+CASCADE_EXITS = Counter()
+CASCADE_LOCK = threading.Lock()
 
 # Paths (Local)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_PATH = os.path.join(BASE_DIR, 'models', 'mobilenet_v3')
 LABELS_PATH = os.path.join(BASE_DIR, 'models', 'ImageNetLabels.txt')
 
 # Keywords
@@ -71,195 +109,283 @@ STRONG_PEOPLE_LABELS = [
     'swing', 'parallel bars', 'horizontal bar'
 ]
 
+# Rank windows: food only counts in the top 5 (strong context), people in the top 15
+FOOD_RANKS = 5
+PEOPLE_RANKS = 15
+
+def keyword_mask(labels, keywords):
+    """One bool per label: any whole word of the label (commas dropped) is a keyword."""
+    keywords = set(keywords)
+    return np.array([not keywords.isdisjoint(label.lower().replace(',', '').split()) for label in labels],
+                    dtype=bool)
+
+def rank_classes(probs):
+    """Top TOP_K class indices, [classes] -> [TOP_K] or [N, classes] -> [N, TOP_K]"""
+    probs = np.asarray(probs)
+    classes = probs.shape[-1]
+    if classes <= TOP_K:
+        return np.argsort(-probs, axis=-1, kind='stable')
+    rows = probs.reshape(-1, classes)
+    # Select the TOP_K largest in linear time, then order only those by
+    # (-prob, index): ties keep the lower class index first, like tf.math.top_k
+    top_k = np.argpartition(-rows, TOP_K - 1, axis=-1)[:, :TOP_K]
+    top = np.take_along_axis(rows, top_k, axis=-1)
+    order = np.lexsort((top_k, -top), axis=-1)
+    top_k, top = np.take_along_axis(top_k, order, axis=-1), np.take_along_axis(top, order, axis=-1)
+    # A tie across the cut may have let a higher index in; re-rank those rows fully
+    cut = top[:, -1:]
+    tied = (rows == cut).sum(axis=-1) > (top == cut).sum(axis=-1)
+    if tied.any():
+        top_k[tied] = np.argsort(-rows[tied], axis=-1, kind='stable')[:, :TOP_K]
+    return top_k.reshape(probs.shape[:-1] + (TOP_K,))
+
+def context_flags(top_k):
+    """(is_food_context, is_people_context) for one image's ranking or a whole batch at once"""
+    return (FOOD_MASK[top_k[..., :FOOD_RANKS]].any(axis=-1),
+            PEOPLE_MASK[top_k[..., :PEOPLE_RANKS]].any(axis=-1))
+
+def rank_batch(probs):
+    """InferenceBatcher postprocess: (top_k, is_food_context, is_people_context) per frame"""
+    top_k = rank_classes(probs)
+    is_food_context, is_people_context = context_flags(top_k)
+    return list(zip(top_k, is_food_context, is_people_context))
+
+def classify_workers():
+    cpu = os.cpu_count() or 1
+    return CLASSIFY_WORKERS or max(min(4, cpu), min(INFERENCE_BATCH_SIZE, 2 * cpu))
+
+def preprocess_workers():
+    if PREPROCESS_WORKERS is not None:
+        return PREPROCESS_WORKERS
+    cpu = os.cpu_count() or 1
+    return cpu - 1 if cpu > 1 else 0
+
+# Startup stages, loaded in this order on a background thread. Each step of a
+# classification waits only for the stage it uses (wait_for), so queued work
+# starts while MediaPipe and the inference runtime are still importing.
+STAGES = ('decoder', 'face_detector', 'classifier')
+STAGE_MESSAGES = {'decoder': "Decoder Ready", 'face_detector': "Face Detector Ready",
+                  'classifier': "AI Engine Ready"}
+STAGE_READY = {stage: threading.Event() for stage in STAGES}
+STAGE_ERRORS = {}
+VERSION_READY = threading.Event()  # MODEL_VERSION resolved: the results cache can open
+STARTUP_TIMES = {"imports": round(time.perf_counter() - STARTED_AT, 3)}  # seconds per phase
+LOAD_LOCK = threading.Lock()
+LOADER = None
+LOADER_LOCK = threading.Lock()
+
+# Bound by load_decoder(): importing decode pulls in cv2
+decode_rgb = model_frame = None
+
+class EngineUnavailable(RuntimeError):
+    """A stage the image needs failed to load; the image is left unprocessed."""
+
+def wait_for(stage):
+    STAGE_READY[stage].wait()
+    if stage in STAGE_ERRORS:
+        raise EngineUnavailable(f"{stage} unavailable: {STAGE_ERRORS[stage]}")
+
+def load_decoder():
+    global decode_rgb, model_frame
+    import pillow_heif
+    pillow_heif.register_heif_opener()
+    from decode import decode_rgb, model_frame
+
+def load_face_detector():
+    global MP_FACE_DETECTION
+    # One long/short-range detector pair per worker, built once instead of per image
+    MP_FACE_DETECTION = FaceDetectorPool(classify_workers())
+
+def load_classifier():
+    global MODEL_CLS, TF_LABELS, FOOD_MASK, PEOPLE_MASK, BATCHER
+    # Load Labels from Local (before the runtime import, so a missing file fails fast)
+    if not os.path.exists(LABELS_PATH):
+        raise FileNotFoundError(f"Labels not found at {LABELS_PATH}")
+    with open(LABELS_PATH, 'r') as f:
+        TF_LABELS = [line.strip() for line in f.readlines()]
+    # Keyword matching compiled once; per image it is two fancy-indexed lookups
+    FOOD_MASK = keyword_mask(TF_LABELS, FOOD_KEYWORDS)
+    PEOPLE_MASK = keyword_mask(TF_LABELS, STRONG_PEOPLE_LABELS)
+
+    # Load MobileNet V3 (Context Analysis) from Local, through the selected runtime
+    MODEL_CLS, _, _ = load_model(INFERENCE_BACKEND, MODEL_PATH)
+    BATCHER = InferenceBatcher(MODEL_CLS, INFERENCE_BATCH_SIZE, INFERENCE_MAX_WAIT, postprocess=rank_batch)
+
+STAGE_LOADERS = {'decoder': load_decoder, 'face_detector': load_face_detector, 'classifier': load_classifier}
+
 def load_models():
-    global TF_MODEL_CLS, TF_LABELS
-    
-    if TF_MODEL_CLS is None:
-        print(json.dumps({"status": "startup", "message": "Loading AI Models..."}), flush=True)
-        
-        # Load MobileNet V3 (Context Analysis) from Local
-        try:
-            if not os.path.exists(MODEL_PATH):
-                 log_error(f"Model not found at {MODEL_PATH}")
-                 return
+    """Load every stage in order, blocking; one ready (or error) event per stage."""
+    global MODEL_VERSION
+    with LOAD_LOCK:
+        if STAGE_READY[STAGES[-1]].is_set():
+            return
+        emit({"status": "startup", "message": "Loading AI Models..."})
 
-            TF_MODEL_CLS = hub.load(MODEL_PATH)
-        except Exception as e:
-            log_error(f"Failed to load model: {e}")
-            raise e
-        
-        # Load Labels from Local
+        # Hashing the model file is cheap; the cache needs it long before the model is up
+        t0 = time.perf_counter()
         try:
-            if not os.path.exists(LABELS_PATH):
-                 log_error(f"Labels not found at {LABELS_PATH}")
-                 return
-
-            with open(LABELS_PATH, 'r') as f:
-                TF_LABELS = [line.strip() for line in f.readlines()]
-        except Exception as e:
-            log_error(f"Failed to load labels: {e}")
-            raise e
-            
-        print(json.dumps({"status": "ready", "message": "AI Engine Ready"}), flush=True)
-
-def calculate_file_hash(filepath):
-    hasher = hashlib.md5()
-    try:
-        with open(filepath, 'rb') as f:
-            for chunk in iter(lambda: f.read(65536), b""):
-                hasher.update(chunk)
-        return hasher.hexdigest()
-    except:
-        return None
+            _, MODEL_VERSION = resolve_model(INFERENCE_BACKEND, MODEL_PATH)
+        except Exception:
+            pass  # reported by the classifier stage
+        STARTUP_TIMES["model_version"] = round(time.perf_counter() - t0, 3)
+        VERSION_READY.set()
+
+        for stage in STAGES:
+            t0 = time.perf_counter()
+            try:
+                STAGE_LOADERS[stage]()
+            except Exception as e:
+                STAGE_ERRORS[stage] = str(e)
+            STARTUP_TIMES[stage] = round(time.perf_counter() - t0, 3)
+            STAGE_READY[stage].set()
+            if stage in STAGE_ERRORS:
+                emit({"status": "error", "stage": stage, "seconds": STARTUP_TIMES[stage],
+                      "message": f"Failed to load {stage}: {STAGE_ERRORS[stage]}"})
+            else:
+                emit({"status": "ready", "stage": stage, "message": STAGE_MESSAGES[stage],
+                      "seconds": STARTUP_TIMES[stage]})
 
-def files_are_identical(p1, p2):
-    try:
-        if os.path.exists(p1) and os.path.exists(p2):
-            if os.path.getsize(p1) != os.path.getsize(p2):
-                return False
-            return calculate_file_hash(p1) == calculate_file_hash(p2)
-        return False
-    except:
-        return False
+        emit({"status": "loaded", "backend": INFERENCE_BACKEND, "startup": STARTUP_TIMES,
+              "failed": sorted(STAGE_ERRORS)})
 
-pillow_heif.register_heif_opener()
+def start_loading():
+    """load_models() on a background thread, started once; returns immediately."""
+    global LOADER
+    with LOADER_LOCK:
+        if LOADER is None:
+            LOADER = threading.Thread(target=load_models, name="model-loader", daemon=True)
+            LOADER.start()
 
 def move_preserving_metadata(src, dst):
     try:
-        if os.name != 'nt':
-            subprocess.run(["mv", src, dst], check=True)
-        else:
-            shutil.move(src, dst)
-    except Exception:
-        try:
-            shutil.move(src, dst)
-        except Exception as e:
-            print(json.dumps({"status": "error", "message": f"Move failed: {e}"}))
+        file_ops.move_file(src, dst)
+    except Exception as e:
+        emit({"status": "error", "message": f"Move failed: {e}"})
 
 def detect_faces_mediapipe(img_rgb):
-    """Run MediaPipe Face Detection (Hybrid Range)"""
-    # 1. Try Long Range Model (Best for general photos)
-    with mp.solutions.face_detection.FaceDetection(
-        model_selection=1, 
-        min_detection_confidence=0.5
-    ) as face_detection:
-        results = face_detection.process(img_rgb)
-        
-        if results.detections:
-            max_score = 0.0
-            for detection in results.detections:
-                score = detection.score[0]
-                if score > max_score: max_score = score
-            return len(results.detections), max_score
-
-    # 2. Fallback: Try Short Range Model (Best for selfies/close-ups)
-    with mp.solutions.face_detection.FaceDetection(
-        model_selection=0, 
-        min_detection_confidence=0.5
-    ) as face_detection_short:
-        results_short = face_detection_short.process(img_rgb)
-        
-        if results_short.detections:
-            max_score = 0.0
-            for detection in results_short.detections:
-                score = detection.score[0]
-                if score > max_score: max_score = score
-            return len(results_short.detections), max_score
-
-    return 0, 0.0
-
-def classify_image(file_path):
+    """Run MediaPipe Face Detection (Hybrid Range): long-range model, then short-range as fallback"""
+    return MP_FACE_DETECTION.detect(img_rgb)
+
+def cascade_exit(name, result):
+    with CASCADE_LOCK:
+        CASCADE_EXITS[name] += 1
+    return result
+
+def classify_image(file_path, frame=None):
+    return analyze_image(file_path, frame).category
+
+def analyze_image(file_path, frame=None):
+    """
+    ClassifyResult for one image. frame: preprocessed Frame (views into shared
+    memory); decoded here when None. face_count is None when the models never
+    ran (unreadable file), so such results are not cached.
+    """
     try:
-        if TF_MODEL_CLS is None:
-            load_models()
+        start_loading()
             
         if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-            return "Error"
+            return cascade_exit("unreadable", ClassifyResult("Error", None, None, None))
             
         # 1. Read Image
-        try:
-            # Use OpenCV for MediaPipe (needs numpy array)
-            # Handle Korean paths by reading as byte stream first
-            img_array = np.fromfile(file_path, np.uint8)
-            img_cv = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-            if img_cv is None: return "Misc"
-            
-            img_rgb = cv2.cvtColor(img_cv, cv2.COLOR_BGR2RGB)
-            
-            # Prepare for TF (Context)
-            img_tf = tf.image.convert_image_dtype(img_rgb, tf.float32)
-            img_tf = tf.image.resize(img_tf, [224, 224])
-            img_tf = tf.expand_dims(img_tf, 0)
-        except Exception:
-            return "Misc"
-            
-        # 2. MediaPipe Face Detection (The Truth)
-        face_count, face_score = detect_faces_mediapipe(img_rgb)
-        
-        # 3. MobileNet Context Analysis
-        logits = TF_MODEL_CLS(img_tf)
-        probs = tf.nn.softmax(logits)
-        top_k = tf.math.top_k(probs, k=25).indices.numpy()[0]
-        predicted_labels = [TF_LABELS[i].lower() for i in top_k]
-        
-        # Check Keywords
-        is_food_context = False
-        is_people_context = False
-        
-        for i, label in enumerate(predicted_labels):
-            label_parts = label.replace(',', '').split()
-            
-            if i < 5: # Strong context only
-                for keyword in FOOD_KEYWORDS:
-                    if keyword in label_parts:
-                        is_food_context = True
-                        break
+        if frame is not None:
+            img_rgb, img_model = frame.rgb, frame.model
+        else:
+            wait_for('decoder')
+            try:
+                # Reduced-size decode (JPEG DCT scaling / HEIC thumbnail): the models
+                # only need a few hundred pixels, never the full 12-48 MP frame
+                img_rgb = decode_rgb(file_path)
+                if img_rgb is None: return cascade_exit("unreadable", ClassifyResult("Misc", None, None, None))
+
+                # uint8 224x224 for MobileNet; the batcher adds the batch dimension
+                img_model = model_frame(img_rgb)
+            except Exception:
+                return cascade_exit("unreadable", ClassifyResult("Misc", None, None, None))
             
-            if i < 15: # Broader check for people context
-                for keyword in STRONG_PEOPLE_LABELS:
-                    if keyword in label_parts:
-                        is_people_context = True
-                        break
+        # 2. MediaPipe Face Detection (The Truth), cheapest signal first. Same
+        # hybrid order as detect_faces_mediapipe, but a confident face settles
+        # People (Rules 1 and 2) before the short-range model or MobileNet run.
+        wait_for('face_detector')
+        face_count, face_score = MP_FACE_DETECTION.detect_range(img_rgb, LONG_RANGE)
+        detector = "long_range"
+        if face_count == 0:
+            face_count, face_score = MP_FACE_DETECTION.detect_range(img_rgb, SHORT_RANGE)
+            detector = "short_range"
+        if face_count > 0 and face_score >= FACE_OVERRIDE_SCORE:
+            return cascade_exit(f"{detector}_face", ClassifyResult("People", face_count, face_score, None))
         
-        # --- FINAL DECISION LOGIC (V3 Hybrid + Safety) ---
+        # 3. MobileNet Context Analysis (batched with other workers' frames); ranking and
+        # the keyword checks (food in the top 5, people in the top 15) run once per batch
+        wait_for('classifier')
+        top_k, is_food_context, is_people_context = BATCHER.infer(img_model)
         
-        # Rule 1: Conflict Resolution (Face vs Food)
-        if face_count > 0 and is_food_context:
-            # MediaPipe says Face, MobileNet says Food. Who to trust?
-            # Plate/Food false positives usually have scores ~0.60. Real faces usually > 0.75.
-            # Set threshold to 0.70 to separate them.
-            if face_score < 0.70: 
-                return "Food"
-            else:
-                return "People" # Strong face confidence overrides food context (e.g. person eating)
-
-        # Rule 2: Verified Face -> People
+        category = decide(face_count, face_score, is_food_context, is_people_context)
         if face_count > 0:
-            return "People"
-            
-        # Rule 3: Strong Food Context -> Food
-        if is_food_context:
-            return "Food"
-            
-        # Rule 3: Missing Face but Strong People Context -> People (Rescue)
-        # Allows 'bonnet', 'cradle', 'bassinet' etc to save the photo even if no face is visible.
-        # But ensure it's not food.
-        if is_people_context and not is_food_context:
-             return "People"
-        
-        # Rule 4: Everything else -> Misc
-        return "Misc"
+            exit_name = "weak_face_food" if category == "Food" else "weak_face"
+        else:
+            exit_name = {"Food": "food_context", "People": "people_context"}.get(category, "misc")
+        return cascade_exit(exit_name, ClassifyResult(category, face_count, face_score, [int(i) for i in top_k]))
 
+    except EngineUnavailable:
+        raise  # not Misc: the image stays unprocessed for the next run
     except Exception as e:
-        return "Misc"
+        return cascade_exit("error", ClassifyResult("Misc", None, None, None))
+
+def decide(face_count, face_score, is_food_context, is_people_context):
+    # --- FINAL DECISION LOGIC (V3 Hybrid + Safety) ---
+    
+    # Rule 1: Conflict Resolution (Face vs Food)
+    if face_count > 0 and is_food_context:
+        # MediaPipe says Face, MobileNet says Food. Who to trust?
+        # Plate/Food false positives usually have scores ~0.60. Real faces usually > 0.75.
+        # Set threshold to 0.70 to separate them.
+        if face_score < FACE_OVERRIDE_SCORE: 
+            return "Food"
+        else:
+            return "People" # Strong face confidence overrides food context (e.g. person eating)
+
+    # Rule 2: Verified Face -> People
+    if face_count > 0:
+        return "People"
+        
+    # Rule 3: Strong Food Context -> Food
+    if is_food_context:
+        return "Food"
+        
+    # Rule 3: Missing Face but Strong People Context -> People (Rescue)
+    # Allows 'bonnet', 'cradle', 'bassinet' etc to save the photo even if no face is visible.
+    # But ensure it's not food.
+    if is_people_context and not is_food_context:
+         return "People"
+    
+    # Rule 4: Everything else -> Misc
+    return "Misc"
 
-def classify_task(img_data, dest_dir):
-    img_id, current_path, filename, exif_date = img_data
+def classify_task(img_data, dest_dir, names, preprocessor=None, cache=None):
+    img_id, current_path, filename, exif_date, content_hash = img_data
     try:
         if not os.path.exists(current_path):
             return None, {"status": "error", "message": f"File not found: {current_path}"}
         
-        category = classify_image(current_path)
+        # Same bytes + same model = same answer: skip decode and inference entirely
+        result = None
+        if cache is not None:
+            content_hash = content_hash or hashing.calculate_file_hash(current_path)
+            result = cache.get(content_hash)
+            if result is not None:
+                cascade_exit("cache", result)
+
+        if result is None:
+            # Decoded by a worker process into shared memory; None falls back to decoding here
+            frame = preprocessor.load(current_path) if preprocessor else None
+            try:
+                result = analyze_image(current_path, frame)
+            finally:
+                if frame is not None:
+                    frame.release()
+            if cache is not None and result.face_count is not None:
+                cache.put(content_hash, result)
+        category = result.category
         
         # Determine target path
         if category == "Misc":
@@ -267,111 +393,127 @@ def classify_task(img_data, dest_dir):
         else:
             target_dir = os.path.join(dest_dir, exif_date, category)
             
-        os.makedirs(target_dir, exist_ok=True)
-        final_path = os.path.join(target_dir, filename)
-        
-        # Duplicate handling
-        base, ext = os.path.splitext(filename)
-        
-        if os.path.exists(final_path):
-            if files_are_identical(current_path, final_path):
-                # Duplicate found: Do NOT delete source, just skip
-                return None, {"status": "processing", "file": filename, "category": "Skipped"}
-            
-            counter = 1
-            while True:
-                candidate = os.path.join(target_dir, f"{base}_{counter}{ext}")
-                if not os.path.exists(candidate):
-                    final_path = candidate
-                    break
-                counter += 1
+        # Duplicate + collision handling through the per-run name registry.
+        # A Misc image already sitting in its date folder keeps its path.
+        final_path = names.claim(target_dir, filename, current_path=current_path,
+                                 is_duplicate=lambda existing: files_are_identical(current_path, existing))
+        if final_path is None:
+            # Duplicate found: Do NOT delete source, just skip
+            return None, {"status": "processing", "file": filename, "category": "Skipped", "outcome": "Skipped"}
         
         if current_path != final_path:
-            move_preserving_metadata(current_path, final_path)
+            try:
+                move_preserving_metadata(current_path, final_path)
+            except BaseException:
+                names.release(final_path)
+                raise
         
-        return (final_path, category, img_id), \
-               {"status": "processing", "file": filename, "category": category if category != "Misc" else exif_date}
+        return (final_path, category, content_hash, img_id), \
+               {"status": "processing", "file": filename, "category": category if category != "Misc" else exif_date,
+                "outcome": category}
                
     except Exception as e:
         return None, {"status": "error", "message": f"Error {filename}: {str(e)}"}
 
-def run_classification(dest_dir, db_path):
+# The scanner only hashes files whose size collides; keep what the cache computed
+UPDATE_CLASSIFIED_SQL = "UPDATE files SET dest_path=?, processed=1, type=?, hash=COALESCE(hash, ?) WHERE id=?"
+
+def run_classification(dest_dir, db_path, verbose=False):
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, dest_path, filename, exif_date FROM files WHERE type='image' AND processed=0")
-        images = cursor.fetchall()
+        # Adds the indexes to databases created by older scanners
+        db.ensure_schema(db_path)
+        conn = db.connect_readonly(db_path)
+        images = conn.execute("SELECT id, dest_path, filename, exif_date, hash FROM files WHERE type='image' AND processed=0").fetchall()
+        conn.close()
         total_images = len(images)
         
         if total_images == 0:
-            print(json.dumps({"status": "skipped", "message": "No new images."}))
-            conn.close()
+            emit({"status": "skipped", "message": "No new images."})
             return
     except Exception as e:
-        print(json.dumps({"status": "error", "message": f"DB Error: {e}"}))
+        emit({"status": "error", "message": f"DB Error: {e}"})
         return
 
-    load_models()
-    processed_count = 0
-    updates = []
-    max_workers = min(4, os.cpu_count() or 1)
+    # Models keep loading while the run starts; each step waits for its own stage
+    start_loading()
+    reporter = ProgressReporter("processing", "category", total=total_images, verbose=verbose)
+    # One worker per face detector pair (the pool is sized by classify_workers() too)
+    max_workers = classify_workers()
+    batches_before = dict(BATCHER.stats) if BATCHER else {}
+    with CASCADE_LOCK:
+        CASCADE_EXITS.clear()
     
-    # We must close DB connection before threading to avoid lock issues if passing it (not passing here)
-    conn.close() 
+    # Updates are batched into transactions by a single writer thread
+    db_writer = db.DBWriter(db_path)
+    names = NameRegistry()
+
+    # Each classifier thread holds at most one preprocessed frame: one ring slot per thread
+    process_count = preprocess_workers()
+    preprocessor = None
+    if process_count > 0:
+        try:
+            from preprocess import Preprocessor
+            preprocessor = Preprocessor(process_count, slots=max_workers)
+        except Exception as e:
+            # Degraded, not failed: the run goes on (ipc.ts ends a classify request on "error")
+            emit({"status": "warning", "message": f"Preprocess workers unavailable, decoding in-thread: {e}"})
 
-    # Re-open per usage or gather results and verify updates.
-    # We'll batch connect for updates.
+    cache = None
+    VERSION_READY.wait()
+    if CACHE_DIR and MODEL_VERSION:
+        try:
+            cache = ClassificationCache(f"{MODEL_VERSION}/{RULES_VERSION}", CACHE_DIR, CACHE_SIZE)
+        except Exception as e:
+            emit({"status": "warning", "message": f"Classification cache unavailable: {e}"})
 
     try:
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_img = {executor.submit(classify_task, img, dest_dir): img for img in images}
+            future_to_img = {executor.submit(classify_task, img, dest_dir, names, preprocessor, cache): img for img in images}
             
             for future in as_completed(future_to_img):
                 if STOP_EVENT.is_set(): break
                 while not PAUSE_EVENT.is_set() and not STOP_EVENT.is_set():
-                    import time
                     time.sleep(0.5)
 
                 db_entry, status_msg = future.result()
-                processed_count += 1
-                if db_entry: updates.append(db_entry)
-                
-                status_msg["progress"] = int((processed_count / total_images) * 100)
-                status_msg["total"] = total_images
-                status_msg["current"] = processed_count
-                print(json.dumps(status_msg))
-                sys.stdout.flush()
+                if db_entry: db_writer.execute(UPDATE_CLASSIFIED_SQL, db_entry)
                 
-                if len(updates) >= 20:
-                    update_db_batch(db_path, updates)
-                    updates = []
+                # Set before update(): an update may emit, and should carry this file in `current`
+                reporter.set(current=reporter.processed + 1)
+                if status_msg.get("status") == "error":
+                    reporter.update("Error", message=status_msg.get("message"), detail=status_msg)
+                else:
+                    reporter.update(status_msg["outcome"], status_msg["file"], detail=status_msg,
+                                    label=status_msg["category"])
 
-        if updates:
-            update_db_batch(db_path, updates)
-            
     except Exception as e:
-        print(json.dumps({"status": "error", "message": f"Batch Error: {e}"}))
-
-    # Final Count
+        emit({"status": "error", "message": f"Batch Error: {e}"})
+    finally:
+        if preprocessor is not None:
+            preprocessor.close()
+        if cache is not None:
+            cache.close()
+        db_writer.close()
+        reporter.flush()
+
+    # Cache hits and early exits happen even when MobileNet never loaded
+    inference = {"workers": max_workers, "preprocess_workers": preprocessor.workers if preprocessor else 0,
+                 "backend": INFERENCE_BACKEND, "model_version": MODEL_VERSION,
+                 "cache": cache.report() if cache else None, "exits": dict(CASCADE_EXITS)}
+    if BATCHER:
+        frames = BATCHER.stats["frames"] - batches_before.get("frames", 0)
+        batches = BATCHER.stats["batches"] - batches_before.get("batches", 0)
+        inference.update(frames=frames, batches=batches, mean_batch=round(frames / batches, 1) if batches else 0,
+                         batch_size=INFERENCE_BATCH_SIZE)
+
+    # Final Count (GLOB is case-sensitive, so it can use the type index unlike LIKE)
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM files WHERE type LIKE 'People%'")
-        people_count = cursor.fetchone()[0]
+        conn = db.connect_readonly(db_path)
+        people_count = conn.execute("SELECT COUNT(*) FROM files WHERE type GLOB 'People*'").fetchone()[0]
         conn.close()
-        print(json.dumps({"status": "completed", "people_count": people_count}))
+        emit({"status": "completed", "people_count": people_count, "counts": reporter.counts, "inference": inference})
     except:
-        print(json.dumps({"status": "completed", "people_count": 0}))
-
-def update_db_batch(db_path, updates):
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.executemany("UPDATE files SET dest_path=?, processed=1, type=? WHERE id=?", updates)
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(json.dumps({"status": "error", "message": f"DB Update failed: {e}"}))
+        emit({"status": "completed", "people_count": 0, "counts": reporter.counts, "inference": inference})
 
 # --- Service Mode ---
 COMMAND_QUEUE = queue.Queue()
@@ -386,17 +528,14 @@ def input_listener():
             
             if action == 'pause':
                 PAUSE_EVENT.clear()
-                print(json.dumps({"status": "paused"}))
-                sys.stdout.flush()
+                emit({"status": "paused"})
             elif action == 'resume':
                 PAUSE_EVENT.set()
-                print(json.dumps({"status": "resumed"}))
-                sys.stdout.flush()
+                emit({"status": "resumed"})
             elif action == 'stop':
                 STOP_EVENT.set()
                 PAUSE_EVENT.set()
-                print(json.dumps({"status": "stopped"}))
-                sys.stdout.flush()
+                emit({"status": "stopped"})
             elif action == 'classify':
                 COMMAND_QUEUE.put(cmd)
             elif action == 'exit':
@@ -404,15 +543,18 @@ def input_listener():
         except: pass
 
 def run_service_mode():
-    load_models()
+    # Accept commands right away; queued classify commands start while models load
     threading.Thread(target=input_listener, daemon=True).start()
+    emit({"status": "started", "message": "AI Engine Accepting Commands",
+          "seconds": round(time.perf_counter() - STARTED_AT, 3)})
+    start_loading()
     
     while True:
         command = COMMAND_QUEUE.get()
         if command.get('action') == 'classify':
             STOP_EVENT.clear()
             PAUSE_EVENT.set()
-            run_classification(command.get('dest'), command.get('db'))
+            run_classification(command.get('dest'), command.get('db'), verbose=command.get('verbose', False))
 
 if __name__ == "__main__":
     import argparse
@@ -420,14 +562,39 @@ if __name__ == "__main__":
     parser.add_argument('dest', nargs='?', help='Destination directory')
     parser.add_argument('db', nargs='?', help='Database file path')
     parser.add_argument('--mode', type=str, default='oneshot')
+    parser.add_argument('--verbose', action='store_true', help='Also emit a detail event for every image')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='Frames per MobileNet call')
+    parser.add_argument('--batch-wait-ms', type=float, default=DEFAULT_MAX_WAIT * 1000,
+                        help='Longest a partial batch waits for more frames')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Decode/face-detection threads (default: batch size, bounded by CPU count)')
+    parser.add_argument('--inference-backend', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help='MobileNet runtime (tflite/onnx need a model from convert_model.py)')
+    parser.add_argument('--model', default=None, help='Model file/directory for the backend')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help='Where the classification results cache lives')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help='Most cached results kept (least recently used are evicted)')
+    parser.add_argument('--no-cache', action='store_true', help='Classify every image, ignoring cached results')
+    parser.add_argument('--preprocess-workers', type=int, default=None,
+                        help='Decode processes (default: CPU count - 1; 0 decodes in the classifier threads)')
     args, unknown = parser.parse_known_args()
+    PREPROCESS_WORKERS = args.preprocess_workers
+    CACHE_DIR = None if args.no_cache else args.cache_dir
+    CACHE_SIZE = max(1, args.cache_size)
+    INFERENCE_BACKEND = args.inference_backend
+    MODEL_PATH = args.model
+    INFERENCE_BATCH_SIZE = max(1, args.batch_size)
+    INFERENCE_MAX_WAIT = max(0.0, args.batch_wait_ms / 1000)
+    CLASSIFY_WORKERS = args.workers
     
     try:
         if args.mode == 'service':
             run_service_mode()
         elif args.dest and args.db:
-            run_classification(args.dest, args.db)
+            run_classification(args.dest, args.db, verbose=args.verbose)
         else:
-            print(json.dumps({"status": "error", "message": "Missing arguments"}))
+            emit({"status": "error", "message": "Missing arguments"})
     except Exception:
         pass
@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+
+# Per-user, not per-library: the same photo in two libraries (or re-scanned
+# after the per-run DB reset) is classified once.
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.myphoto')
+CACHE_FILENAME = 'classify_cache.db'
+
+# ~150 bytes per row; evicted least-recently-used beyond this
+DEFAULT_MAX_ENTRIES = 500000
+
+# Hits are recorded in memory and written back in batches of this size
+TOUCH_BATCH = 500
+
+# What one classification produced. face_count/face_score/top_k are None for
+# signals the decision did not need; top_k holds MobileNet class indices.
+ClassifyResult = namedtuple('ClassifyResult', ['category', 'face_count', 'face_score', 'top_k'])
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS results (
+        content_hash TEXT NOT NULL,
+        model TEXT NOT NULL,
+        category TEXT NOT NULL,
+        face_count INTEGER,
+        face_score REAL,
+        top_k TEXT,
+        last_used REAL NOT NULL,
+        PRIMARY KEY (content_hash, model)
+    ) WITHOUT ROWID
+'''
+INDEX = "CREATE INDEX IF NOT EXISTS idx_results_last_used ON results (last_used)"
+
+PUT_SQL = "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)"
+TOUCH_SQL = "UPDATE results SET last_used=? WHERE content_hash=? AND model=?"
+EVICT_SQL = '''
+    DELETE FROM results WHERE (content_hash, model) IN
+        (SELECT content_hash, model FROM results ORDER BY last_used LIMIT ?)
+'''
+
+
+class ClassificationCache:
+    """
+    Persistent classification results keyed by (file content hash, model).
+
+    `model` combines the model version and the decision-rules version, so a
+    new model or changed thresholds never reuse stale categories. Safe to
+    share between threads; several processes may use the same file (WAL).
+    """
+
+    def __init__(self, model, cache_dir=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        self.model = model
+        self.max_entries = max_entries
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, CACHE_FILENAME)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(SCHEMA)
+        self._conn.execute(INDEX)
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._touched = []
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    def get(self, content_hash):
+        # No hash (the file could not be read): nothing to look up, and not a miss either
+        if content_hash is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT category, face_count, face_score, top_k FROM results WHERE content_hash=? AND model=?",
+                (content_hash, self.model)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self._touched.append((time.time(), content_hash, self.model))
+            if len(self._touched) >= TOUCH_BATCH:
+                self._flush_touches()
+        category, face_count, face_score, top_k = row
+        return ClassifyResult(category, face_count, face_score, json.loads(top_k) if top_k else None)
+
+    def put(self, content_hash, result):
+        if content_hash is None:
+            return
+        top_k = json.dumps([int(i) for i in result.top_k]) if result.top_k is not None else None
+        with self._lock:
+            self._conn.execute(PUT_SQL, (content_hash, self.model, result.category, result.face_count,
+                                         result.face_score, top_k, time.time()))
+            self.stats["stored"] += 1
+            if self.stats["stored"] % TOUCH_BATCH == 0:
+                self._conn.commit()
+
+    def _flush_touches(self):
+        if self._touched:
+            self._conn.executemany(TOUCH_SQL, self._touched)
+            self._touched = []
+        self._conn.commit()
+
+    def report(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return dict(self.stats, hit_rate=round(self.stats["hits"] / lookups, 3) if lookups else None)
+
+    def close(self):
+        with self._lock:
+            self._flush_touches()
+            # LRU bound, enforced once per run rather than on every insert
+            count = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(EVICT_SQL, (count - self.max_entries,))
+                self.stats["evicted"] += count - self.max_entries
+                self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,154 @@
+import os
+import queue
+import pathlib
+import sqlite3
+import threading
+from progress import emit
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 0.5  # seconds a partial batch may wait before it is committed
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS files (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source_path TEXT,
+        dest_path TEXT,
+        filename TEXT,
+        type TEXT,
+        processed INTEGER DEFAULT 0,
+        cluster_id INTEGER DEFAULT -1,
+        exif_date TEXT,
+        hash TEXT,
+        phash TEXT,
+        near_dup_of TEXT
+    )
+'''
+
+# Columns added after the first release: (name, type), applied to older databases
+MIGRATIONS = [
+    ('phash', 'TEXT'),
+    ('near_dup_of', 'TEXT'),
+]
+
+# Cover the hot queries: pending images (type/processed), People lookups, hash and date lookups
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_files_type_processed ON files (type, processed)",
+    "CREATE INDEX IF NOT EXISTS idx_files_hash ON files (hash)",
+    "CREATE INDEX IF NOT EXISTS idx_files_exif_date ON files (exif_date)",
+]
+
+INSERT_FILE_SQL = '''
+    INSERT INTO files (source_path, dest_path, filename, type, processed, exif_date, hash, phash, near_dup_of)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def connect(db_path):
+    """Read-write connection with WAL journaling (readers never block the writer)."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def connect_readonly(db_path):
+    """Read-only connection for readers; opened by URI so it can never take a write lock."""
+    uri = pathlib.Path(os.path.abspath(db_path)).as_uri() + '?mode=ro'
+    conn = sqlite3.connect(uri, uri=True, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA query_only=ON")
+    return conn
+
+
+def ensure_schema(db_path):
+    conn = connect(db_path)
+    try:
+        conn.execute(SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(files)")}
+        for name, col_type in MIGRATIONS:
+            if name not in columns:
+                conn.execute(f"ALTER TABLE files ADD COLUMN {name} {col_type}")
+        for statement in INDEXES:
+            conn.execute(statement)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class DBWriter:
+    """
+    Single writer thread that owns the only read-write connection.
+
+    Producers enqueue (sql, rows) from any thread; the writer groups them into
+    transactions of up to batch_size rows (or whatever arrived within
+    flush_interval) and commits. flush() blocks until everything enqueued so
+    far is committed.
+    """
+
+    def __init__(self, db_path, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def execute_many(self, sql, rows):
+        if rows:
+            self._queue.put((sql, list(rows)))
+
+    def execute(self, sql, params=()):
+        self._queue.put((sql, [params]))
+
+    def insert_files(self, rows):
+        self.execute_many(INSERT_FILE_SQL, rows)
+
+    def flush(self):
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        conn = connect(self.db_path)
+        try:
+            stop = False
+            while not stop:
+                item = self._queue.get()
+                batch = []
+                waiters = []
+                pending_rows = 0
+                # Gather more work until the batch is full or the queue stays idle
+                while True:
+                    if item is None:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        # Merge consecutive statements of the same kind into one executemany
+                        if batch and batch[-1][0] == item[0]:
+                            batch[-1][1].extend(item[1])
+                        else:
+                            batch.append(item)
+                        pending_rows += len(item[1])
+                    if stop or waiters or pending_rows >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get(timeout=self.flush_interval if batch else 0.001)
+                    except queue.Empty:
+                        break
+
+                if batch:
+                    try:
+                        with conn:
+                            for sql, rows in batch:
+                                conn.executemany(sql, rows)
+                    except Exception as e:
+                        emit({"status": "error", "message": f"DB write failed: {e}"})
+                for w in waiters:
+                    w.set()
+        finally:
+            conn.close()
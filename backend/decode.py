@@ -0,0 +1,106 @@
+import io
+import os
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from heif_meta import HEIF_EXTS
+
+try:
+    import pillow_heif
+except ImportError:
+    pillow_heif = None
+
+# The classifier's models never look at more than 224 px: MobileNet takes
+# 224x224, MediaPipe resizes the whole frame to 192x192 (long range) or
+# 128x128 (short range). Decoding a 12-48 MP photo at full size only to throw
+# ~99% of the pixels away is wasted time and memory. 640 on the short side
+# keeps a wide margin for the final downscale, so face-detection recall is
+# unchanged.
+DECODE_MIN_SIDE = 640
+
+# MobileNet input; frames are resized to this as uint8 and converted to float in the batch
+MODEL_INPUT_SIZE = 224
+
+# JPEG DCT-domain scaling: libjpeg decodes 1/2, 1/4 or 1/8 size directly,
+# skipping most of the IDCT and never allocating the full-size frame
+_REDUCED_JPEG = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+
+def reduced_flag(width, height, min_side=DECODE_MIN_SIDE):
+    """Largest cv2 JPEG reduction that keeps the short side at or above min_side."""
+    short = min(width, height)
+    for factor, flag in _REDUCED_JPEG:
+        if short // factor >= min_side:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def shrink(img, min_side=DECODE_MIN_SIDE):
+    """Downscale (area filter) so the short side is min_side; smaller images are returned as-is."""
+    h, w = img.shape[:2]
+    scale = min_side / min(h, w)
+    if scale >= 1:
+        return img
+    return cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+def model_frame(rgb):
+    """uint8 MobileNet input (bilinear, like the tf.image.resize it replaces)."""
+    return cv2.resize(rgb, (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE), interpolation=cv2.INTER_LINEAR)
+
+
+def decode_rgb(file_path, min_side=DECODE_MIN_SIDE):
+    """
+    RGB uint8 array for classification, decoded at (roughly) the smallest size
+    whose short side is still >= min_side. Sources smaller than that are
+    decoded as-is. Returns None when the file cannot be decoded.
+    """
+    if os.path.splitext(file_path)[1].lower() in HEIF_EXTS:
+        img = _decode_heif(file_path, min_side)
+        if img is not None:
+            return img
+
+    # Read as a byte stream first: cv2.imread cannot open Korean (non-ASCII) paths on Windows
+    buf = np.fromfile(file_path, np.uint8)
+    flag = cv2.IMREAD_COLOR
+    try:
+        with Image.open(io.BytesIO(buf)) as header:  # parses the header only
+            if header.format == 'JPEG':
+                flag = reduced_flag(*header.size, min_side=min_side)
+    except Exception:
+        pass
+    img = cv2.imdecode(buf, flag)
+    if img is None:
+        return None
+    # Formats without DCT scaling (PNG, WebP, ...) are decoded in full; shrink them
+    # so everything downstream works on the small frame
+    if min(img.shape[:2]) >= 2 * min_side:
+        img = shrink(img, min_side)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+def _decode_heif(file_path, min_side):
+    if pillow_heif is None:
+        return None
+    try:
+        heif = pillow_heif.open_heif(file_path, convert_hdr_to_8bit=True)
+        primary = heif[heif.primary_index]
+        # Fast path: the smallest embedded thumbnail that still meets min_side. The
+        # frame also feeds face detection, so the usual 320x240 iPhone thumbnail
+        # is not enough and the full frame is decoded instead.
+        thumbs = []
+        for i in range(len(primary.info.get('thumbnails', ()))):
+            thumb = primary.get_thumbnail(i)
+            if min(thumb.size) >= min_side:
+                thumbs.append((min(thumb.size), i, thumb))
+        if thumbs:
+            image = min(thumbs)[2]
+        else:
+            # HEVC has no reduced decode: full frame, then downscale
+            image = primary
+        pixels = np.asarray(image) if image.mode == 'RGB' else np.asarray(image.to_pillow().convert('RGB'))
+        return shrink(pixels, min_side)
+    except Exception:
+        return None
@@ -0,0 +1,174 @@
+import os
+import threading
+from hashing import new_hasher, format_hash, get_algorithm, calculate_file_hash
+
+# Bytes read from each end of a file for the partial (second tier) hash
+PARTIAL_BLOCK_SIZE = 64 * 1024
+
+
+def calculate_partial_hash(filepath, size=None, algorithm=None):
+    """Hash of the size plus the head and tail blocks of a file."""
+    algorithm = algorithm or get_algorithm()
+    hasher = new_hasher(algorithm)
+    try:
+        if size is None:
+            size = os.path.getsize(filepath)
+        hasher.update(str(size).encode())
+        with open(filepath, 'rb') as f:
+            if size <= PARTIAL_BLOCK_SIZE * 2:
+                hasher.update(f.read())
+            else:
+                hasher.update(f.read(PARTIAL_BLOCK_SIZE))
+                f.seek(-PARTIAL_BLOCK_SIZE, os.SEEK_END)
+                hasher.update(f.read(PARTIAL_BLOCK_SIZE))
+        return format_hash(algorithm, hasher.hexdigest())
+    except:
+        return None
+
+
+def files_are_identical(p1, p2):
+    """Check if two files are identical by size, then head/tail hash, then full hash."""
+    try:
+        size = os.path.getsize(p1)
+        if size != os.path.getsize(p2):
+            return False
+        if calculate_partial_hash(p1, size) != calculate_partial_hash(p2, size):
+            return False
+        if size <= PARTIAL_BLOCK_SIZE * 2:
+            return True
+        return calculate_file_hash(p1) == calculate_file_hash(p2)
+    except:
+        return False
+
+
+class DedupEntry:
+    __slots__ = ('path', 'size', 'partial', 'full', 'in_library')
+
+    def __init__(self, path, size, partial=None, full=None, in_library=False):
+        self.path = path
+        self.size = size
+        self.partial = partial
+        self.full = full
+        self.in_library = in_library
+
+
+class DedupEngine:
+    """
+    Tiered duplicate detector: byte size -> head/tail partial hash -> full hash.
+
+    Each tier is only consulted when the previous one found a candidate, so a
+    file with a unique size is never read at all. Hashes are computed lazily and
+    memoized per entry; library entries report newly computed hashes through
+    `on_hashed` so they can be persisted (see HashIndex).
+    """
+
+    def __init__(self, hash_func=calculate_file_hash, on_hashed=None):
+        self.hash_func = hash_func
+        self.on_hashed = on_hashed
+        self._lock = threading.Lock()
+        self._by_size = {}
+        self.stats = {
+            "resolved_by_size": 0,
+            "resolved_by_partial": 0,
+            "resolved_by_full": 0,
+            "duplicates": 0,
+            "partial_hashes": 0,
+            "full_hashes": 0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._by_size.clear()
+            for k in self.stats:
+                self.stats[k] = 0
+
+    def add_known(self, path, size, partial=None, full=None):
+        """Register an existing library file without reading it."""
+        entry = DedupEntry(path, size, partial, full, in_library=True)
+        with self._lock:
+            self._by_size.setdefault(size, []).append(entry)
+        return entry
+
+    def _partial(self, entry):
+        if entry.partial is None:
+            entry.partial = calculate_partial_hash(entry.path, entry.size)
+            self._count("partial_hashes")
+            self._notify(entry)
+        return entry.partial
+
+    def _full(self, entry):
+        if entry.full is None:
+            entry.full = self.hash_func(entry.path)
+            self._count("full_hashes")
+            self._notify(entry)
+        return entry.full
+
+    def _notify(self, entry):
+        if entry.in_library and self.on_hashed:
+            self.on_hashed(entry)
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def check_and_add(self, path, size=None):
+        """
+        Returns (is_duplicate, entry). A new file is registered before it is
+        compared, and only compared against entries registered earlier, so two
+        identical files racing through different threads still resolve to
+        exactly one original.
+        """
+        if size is None:
+            size = os.path.getsize(path)
+        entry = DedupEntry(path, size)
+
+        with self._lock:
+            group = self._by_size.setdefault(size, [])
+            candidates = list(group)
+            group.append(entry)
+            if not candidates:
+                self.stats["resolved_by_size"] += 1
+                return False, entry
+
+        # Tier 2: head/tail partial hash
+        partial = self._partial(entry)
+        matches = [c for c in candidates if partial is not None and self._partial(c) == partial]
+        if not matches:
+            self._count("resolved_by_partial")
+            return False, entry
+
+        # Small files were read completely by the partial hash, so it is conclusive
+        if size <= PARTIAL_BLOCK_SIZE * 2:
+            self._count("resolved_by_partial")
+            return self._duplicate(entry)
+
+        # Tier 3: full content hash
+        full = self._full(entry)
+        self._count("resolved_by_full")
+        if full is not None and any(self._full(c) == full for c in matches):
+            return self._duplicate(entry)
+        return False, entry
+
+    def _duplicate(self, entry):
+        with self._lock:
+            group = self._by_size.get(entry.size)
+            if group and entry in group:
+                group.remove(entry)
+            self.stats["duplicates"] += 1
+        return True, entry
+
+    def ensure_full(self, entry):
+        """
+        Full hash of an entry the tiers never had to read, for recording it
+        (files.hash). Not counted in the dedup stats.
+        """
+        if entry.full is None:
+            entry.full = self.hash_func(entry.path)
+            self._notify(entry)
+        return entry.full
+
+    def relocate(self, entry, new_path):
+        """Mark an entry as now living at new_path inside the library."""
+        entry.path = new_path
+        entry.in_library = True
+        self._notify(entry)
@@ -0,0 +1,124 @@
+import os
+import sys
+import plistlib
+import threading
+import subprocess
+from contextlib import contextmanager
+
+# Concurrent readers allowed per block device. A spinning disk slows down badly
+# once several streams make it seek; an SSD/NVMe drive wants a deep queue.
+DEFAULT_LIMITS = {'hdd': 2, 'ssd': 16, 'unknown': 8}
+
+
+def is_rotational(st_dev):
+    """
+    True for a spinning disk, False for SSD/NVMe, None when it cannot be told
+    (Windows, network or virtual filesystems).
+    """
+    if sys.platform == 'darwin':
+        return _is_rotational_darwin(st_dev)
+    return _is_rotational_linux(st_dev)
+
+
+def _is_rotational_linux(st_dev):
+    try:
+        base = os.path.realpath(f"/sys/dev/block/{os.major(st_dev)}:{os.minor(st_dev)}")
+    except (OSError, ValueError):
+        return None
+    # Partitions (sdb1) have no queue/ of their own; it lives on the parent disk
+    for d in (base, os.path.dirname(base)):
+        try:
+            with open(os.path.join(d, 'queue', 'rotational')) as f:
+                return f.read().strip() == '1'
+        except OSError:
+            continue
+    return None
+
+
+def _darwin_disk(st_dev):
+    """BSD name of the disk node backing st_dev (e.g. disk4s2), or None."""
+    try:
+        names = os.listdir('/dev')
+    except OSError:
+        return None
+    for name in names:
+        if not name.startswith('disk'):
+            continue
+        try:
+            if os.stat(os.path.join('/dev', name)).st_rdev == st_dev:
+                return name
+        except OSError:
+            continue
+    return None
+
+
+def _is_rotational_darwin(st_dev):
+    # diskutil reports IOKit's "Solid State" medium property; it is missing when
+    # the bridge does not say (some USB enclosures), which stays unknown
+    disk = _darwin_disk(st_dev)
+    if disk is None:
+        return None
+    try:
+        out = subprocess.run(['diskutil', 'info', '-plist', disk], capture_output=True, timeout=10, check=True).stdout
+        solid_state = plistlib.loads(out).get('SolidState')
+    except (OSError, ValueError, subprocess.SubprocessError, plistlib.InvalidFileException):
+        return None
+    return None if solid_state is None else not solid_state
+
+
+def device_kind(st_dev):
+    rotational = is_rotational(st_dev)
+    if rotational is None:
+        return 'unknown'
+    return 'hdd' if rotational else 'ssd'
+
+
+class DeviceLimiter:
+    """
+    Per-device I/O concurrency limits, keyed by st_dev.
+
+    Each device gets a semaphore sized by its kind the first time it is seen,
+    so a USB hard disk is read by 1-2 workers at a time while an SSD source
+    keeps many requests in flight, whatever the pool sizes are.
+    """
+
+    def __init__(self, limits=None):
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self._lock = threading.Lock()
+        self._devices = {}
+
+    def _entry(self, st_dev):
+        with self._lock:
+            entry = self._devices.get(st_dev)
+        if entry is None:
+            kind = device_kind(st_dev)
+            entry = (kind, threading.BoundedSemaphore(max(1, self.limits[kind])))
+            with self._lock:
+                entry = self._devices.setdefault(st_dev, entry)
+        return entry
+
+    def _semaphore(self, st_dev):
+        return self._entry(st_dev)[1]
+
+    def kind(self, st_dev):
+        """'hdd', 'ssd' or 'unknown'."""
+        return self._entry(st_dev)[0]
+
+    @contextmanager
+    def slot(self, *devices):
+        """Hold one I/O slot on every given device (acquired in a fixed order to avoid deadlocks)."""
+        held = []
+        try:
+            for dev in sorted(set(d for d in devices if d is not None)):
+                sem = self._semaphore(dev)
+                sem.acquire()
+                held.append(sem)
+            yield
+        finally:
+            for sem in reversed(held):
+                sem.release()
+
+    def describe(self):
+        with self._lock:
+            return {str(dev): {"kind": kind, "limit": self.limits[kind]}
+                    for dev, (kind, _) in self._devices.items()}
@@ -1,15 +1,15 @@
-import sqlite3
-import json
 import sys
 import os
-import shutil
 import numpy as np
 from sklearn.cluster import DBSCAN
 from deepface import DeepFace
-import subprocess
 import cv2
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+import file_ops
+from name_registry import NameRegistry
+import db
+from progress import ProgressReporter, emit
 
 def read_image_safe(path):
     """Read image dealing with non-ASCII paths."""
@@ -23,17 +23,11 @@ def read_image_safe(path):
         return None
 
 def move_preserving_metadata(src, dst):
-    """Move file preserving metadata by using system 'mv' on Unix-like systems."""
+    """Move file in-process (rename keeps all metadata; copy + delete across volumes)."""
     try:
-        if os.name != 'nt':
-            subprocess.run(["mv", src, dst], check=True)
-        else:
-            shutil.move(src, dst)
+        file_ops.move_file(src, dst)
     except Exception:
-        try:
-            shutil.move(src, dst)
-        except Exception:
-            pass
+        pass
 
 # Suppress TensorFlow logs
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
@@ -67,23 +61,21 @@ def extract_embedding(img_data):
     return None
 
 def run_face_clustering(dest_dir, db_path):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, dest_path, filename FROM files WHERE type LIKE 'People' AND processed=1")
-    people_images = cursor.fetchall()
+    db.ensure_schema(db_path)
+    conn = db.connect_readonly(db_path)
+    people_images = conn.execute("SELECT id, dest_path, filename FROM files WHERE type = 'People' AND processed=1").fetchall()
+    conn.close()
     
     if not people_images:
-        print(json.dumps({"status": "completed", "message": "No 'People' photos found."}))
-        conn.close()
+        emit({"status": "completed", "message": "No 'People' photos found."})
         return
 
     total = len(people_images)
-    print(json.dumps({"status": "analyzing", "message": f"Analyzing {total} photos for faces (Parallel)..."}))
-    sys.stdout.flush()
+    emit({"status": "analyzing", "message": f"Analyzing {total} photos for faces (Parallel)..."})
 
     encodings = []
     image_ids = []
-    processed_count = 0
+    reporter = ProgressReporter("progress", "outcome", total=total)
     
     # Parallel extraction
     max_workers = min(4, os.cpu_count() or 1)
@@ -92,27 +84,23 @@ def run_face_clustering(dest_dir, db_path):
         
         for future in as_completed(future_to_img):
             result = future.result()
-            processed_count += 1
+            done = reporter.processed + 1
+            reporter.set(message=f"Extracting faces... {int(done/total*100)}% ({done}/{total})")
             if result:
                 img_id, f_path, f_name, embedding = result
                 encodings.append(embedding)
                 image_ids.append((img_id, f_path, f_name))
-            
-            if processed_count % 5 == 0 or processed_count == total:
-                print(json.dumps({
-                    "status": "progress", 
-                    "message": f"Extracting faces... {int(processed_count/total*100)}% ({processed_count}/{total})"
-                }))
-                sys.stdout.flush()
+                reporter.update("face", f_name)
+            else:
+                reporter.update("no_face")
+    reporter.flush()
 
     if not encodings:
-        print(json.dumps({"status": "completed", "message": "No faces detected."}))
-        conn.close()
+        emit({"status": "completed", "message": "No faces detected."})
         return
 
     # Grouping
-    print(json.dumps({"status": "clustering", "message": f"Grouping {len(encodings)} faces..."}))
-    sys.stdout.flush()
+    emit({"status": "clustering", "message": f"Grouping {len(encodings)} faces..."})
     
     clt = DBSCAN(metric="cosine", n_jobs=-1, eps=0.30, min_samples=1)
     clt.fit(encodings)
@@ -121,6 +109,7 @@ def run_face_clustering(dest_dir, db_path):
     unique_labels = set(labels)
     grouped_count = 0
     db_updates = []
+    names = NameRegistry()
     
     for label_id in unique_labels:
         if label_id == -1: continue
@@ -130,14 +119,7 @@ def run_face_clustering(dest_dir, db_path):
         for idx in indices:
             img_id, current_path, filename = image_ids[idx]
             target_dir = os.path.join(os.path.dirname(current_path), cluster_name)
-            os.makedirs(target_dir, exist_ok=True)
-            
-            final_path = os.path.join(target_dir, filename)
-            base, ext = os.path.splitext(filename)
-            counter = 1
-            while os.path.exists(final_path) and final_path != current_path:
-                final_path = os.path.join(target_dir, f"{base}_{counter}{ext}")
-                counter += 1
+            final_path = names.claim(target_dir, filename, current_path=current_path)
                 
             if current_path != final_path:
                 move_preserving_metadata(current_path, final_path)
@@ -145,24 +127,24 @@ def run_face_clustering(dest_dir, db_path):
                 grouped_count += 1
 
     if db_updates:
-        cursor.executemany("UPDATE files SET dest_path=? WHERE id=?", db_updates)
-        conn.commit()
+        db_writer = db.DBWriter(db_path)
+        db_writer.execute_many("UPDATE files SET dest_path=? WHERE id=?", db_updates)
+        db_writer.close()
 
-    conn.close()
-    print(json.dumps({
+    emit({
         "status": "completed", 
         "message": f"Clustering complete. {grouped_count} photos grouped into {len(unique_labels) - (1 if -1 in unique_labels else 0)} clusters."
-    }))
+    })
 
 if __name__ == "__main__":
     if len(sys.argv) < 3:
-        print(json.dumps({"status": "error", "message": "Missing arguments"}))
+        emit({"status": "error", "message": "Missing arguments"})
         sys.exit(1)
         
     dest = sys.argv[1]
-    db = sys.argv[2]
+    db_path = sys.argv[2]
     
     try:
-        run_face_clustering(dest, db)
+        run_face_clustering(dest, db_path)
     except Exception as e:
-        print(json.dumps({"status": "error", "message": str(e)}))
+        emit({"status": "error", "message": str(e)})
@@ -0,0 +1,66 @@
+import queue
+import contextlib
+
+LONG_RANGE = 1   # MediaPipe model_selection: full-range model, best for general photos
+SHORT_RANGE = 0  # short-range model, best for selfies / close-ups
+RANGES = (LONG_RANGE, SHORT_RANGE)  # order of each pooled pair
+MIN_CONFIDENCE = 0.5
+
+
+def _faces(detector, img_rgb):
+    results = detector.process(img_rgb)
+    if not results.detections:
+        return 0, 0.0
+    return len(results.detections), max(d.score[0] for d in results.detections)
+
+
+class FaceDetectorPool:
+    """
+    Long-lived MediaPipe detectors, one long-range + short-range pair per
+    worker.
+
+    Building a FaceDetection graph costs far more than running it, so the
+    pairs are created once and leased to workers. A MediaPipe graph is not
+    safe to run from two threads at once; the lease guarantees each pair is
+    used by one worker at a time.
+    """
+
+    def __init__(self, size, min_confidence=MIN_CONFIDENCE):
+        import mediapipe as mp  # seconds to import; deferred until a pool is built
+        self.size = size
+        self._all = []
+        self._idle = queue.Queue()
+        for _ in range(size):
+            pair = tuple(mp.solutions.face_detection.FaceDetection(model_selection=model,
+                                                                   min_detection_confidence=min_confidence)
+                         for model in RANGES)
+            self._all.append(pair)
+            self._idle.put(pair)
+
+    @contextlib.contextmanager
+    def lease(self):
+        pair = self._idle.get()
+        try:
+            yield pair
+        finally:
+            self._idle.put(pair)
+
+    def detect(self, img_rgb):
+        """(face count, best score): long-range model first, short-range only when it finds nothing."""
+        with self.lease() as pair:
+            for detector in pair:
+                found = _faces(detector, img_rgb)
+                if found[0]:
+                    return found
+        return 0, 0.0
+
+    def detect_range(self, img_rgb, model_selection):
+        """(face count, best score) from one model, so callers can stop before the other."""
+        with self.lease() as pair:
+            return _faces(pair[RANGES.index(model_selection)], img_rgb)
+
+    def close(self):
+        for pair in self._all:
+            for detector in pair:
+                detector.close()
+        self._all = []
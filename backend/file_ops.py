@@ -0,0 +1,174 @@
+import os
+import sys
+import errno
+import shutil
+
+# Organize modes for the scanner:
+#   copy     - copy bytes (reflink clone when the filesystem supports it)
+#   hardlink - link the source into the library; no bytes copied (same volume only)
+#   move     - rename the source into the library (same volume), else copy + delete
+ORGANIZE_MODES = ('copy', 'hardlink', 'move')
+
+# Errors meaning "this fast path is not available here", as opposed to real I/O failures
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP,
+                errno.EPERM, errno.EBADF, errno.ENOTTY}
+
+# Linux FICLONE ioctl (btrfs, XFS with reflink, bcachefs, ...)
+FICLONE = 0x40049409
+
+_clonefile = None
+if sys.platform == 'darwin':
+    try:
+        import ctypes
+        _libc = ctypes.CDLL(None, use_errno=True)
+        _clonefile = _libc.clonefile
+        _clonefile.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_uint32]
+        _clonefile.restype = ctypes.c_int
+    except Exception:
+        _clonefile = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def _is_unsupported(e):
+    return isinstance(e, OSError) and e.errno in _UNSUPPORTED
+
+
+def _clone_darwin(src, dst):
+    """APFS clonefile(2): copy-on-write clone that also keeps all metadata."""
+    if _clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+        import ctypes
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err), dst)
+
+
+def _copy_fd(src_fd, dst_fd, size):
+    """Kernel-side copy: reflink clone, then copy_file_range, then sendfile. Returns the method used."""
+    if fcntl is not None and sys.platform.startswith('linux'):
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+            return 'clone'
+        except OSError as e:
+            if not _is_unsupported(e):
+                raise
+
+    if hasattr(os, 'copy_file_range'):
+        try:
+            copied = 0
+            while copied < size:
+                n = os.copy_file_range(src_fd, dst_fd, size - copied)
+                if n == 0:
+                    break
+                copied += n
+            if copied >= size:
+                return 'copy_file_range'
+        except OSError as e:
+            if not _is_unsupported(e):
+                raise
+        # Partial or unsupported: restart from scratch below
+        os.lseek(src_fd, 0, os.SEEK_SET)
+        os.lseek(dst_fd, 0, os.SEEK_SET)
+        os.ftruncate(dst_fd, 0)
+
+    if sys.platform.startswith('linux'):
+        try:
+            offset = 0
+            while offset < size:
+                n = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                if n == 0:
+                    break
+                offset += n
+            if offset >= size:
+                return 'sendfile'
+        except OSError as e:
+            if not _is_unsupported(e):
+                raise
+        os.lseek(dst_fd, 0, os.SEEK_SET)
+        os.ftruncate(dst_fd, 0)
+
+    return None
+
+
+def copy_file(src, dst):
+    """
+    Copy src to a new file dst in-process, preserving timestamps and permissions.
+    Returns the method that was used.
+    """
+    if _clonefile is not None:
+        try:
+            _clone_darwin(src, dst)
+            return 'clone'
+        except OSError as e:
+            if not _is_unsupported(e):
+                raise
+
+    if os.name == 'nt':
+        # Windows: shutil.copy2 generally preserves creation time on modern Python
+        shutil.copy2(src, dst)
+        return 'copy2'
+
+    method = None
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        size = os.fstat(src_fd).st_size
+        # Outside the cleanup below: if dst already exists it is not ours to remove
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            try:
+                method = _copy_fd(src_fd, dst_fd, size)
+            finally:
+                os.close(dst_fd)
+        except BaseException:
+            try:
+                os.remove(dst)
+            except OSError:
+                pass
+            raise
+    finally:
+        os.close(src_fd)
+
+    if method is None:
+        # Userspace fallback (shutil uses fcopyfile on macOS)
+        shutil.copyfile(src, dst)
+        method = 'copyfile'
+
+    # cp -p equivalent: mode + atime/mtime. On macOS, setting an mtime earlier
+    # than the birth time also moves the birth time back.
+    shutil.copystat(src, dst)
+    return method
+
+
+def link_file(src, dst):
+    """Hardlink src to dst; falls back to a copy across volumes or on filesystems without links."""
+    try:
+        os.link(src, dst)
+        return 'hardlink'
+    except OSError as e:
+        if not _is_unsupported(e) and e.errno != errno.EMLINK:
+            raise
+    return copy_file(src, dst)
+
+
+def move_file(src, dst):
+    """Rename src to dst (keeps every attribute); copy + delete across volumes."""
+    try:
+        os.rename(src, dst)
+        return 'rename'
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    method = copy_file(src, dst)
+    os.remove(src)
+    return method
+
+
+def transfer(src, dst, mode='copy'):
+    """Place src at dst according to an organize mode. Returns the method used."""
+    if mode == 'hardlink':
+        return link_file(src, dst)
+    if mode == 'move':
+        return move_file(src, dst)
+    return copy_file(src, dst)
@@ -0,0 +1,165 @@
+import os
+import sqlite3
+import threading
+import db
+from hashing import parse_hash, get_algorithm
+from walker import iter_entries
+
+# Lives next to the library (not in myphoto.db) so it survives the per-run DB reset.
+INDEX_FILENAME = '.myphoto_index.db'
+
+
+# Upsert: a hash given as NULL keeps the stored one, unless the file itself changed
+RECORD_SQL = '''
+    INSERT INTO hash_index VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(path) DO UPDATE SET
+        hash = COALESCE(excluded.hash, CASE WHEN {same} THEN hash END),
+        partial_hash = COALESCE(excluded.partial_hash, CASE WHEN {same} THEN partial_hash END),
+        phash = COALESCE(excluded.phash, CASE WHEN {same} THEN phash END),
+        size = excluded.size, mtime_ns = excluded.mtime_ns, inode = excluded.inode
+'''.format(same="(size, mtime_ns, inode) = (excluded.size, excluded.mtime_ns, excluded.inode)")
+
+
+class HashIndex:
+    """
+    Durable content-hash index of the destination library.
+
+    Rows are keyed by path and validated against (size, mtime_ns, inode). A
+    refresh only stats the library; hashes of files whose stat changed are
+    dropped and recomputed lazily by the dedup engine when a same-sized
+    candidate actually needs them. Files that were renamed or moved inside the
+    library (e.g. by the classifier) keep their inode and mtime, so their
+    hashes are carried over.
+    """
+
+    def __init__(self, dest_dir, read_only=False):
+        # read_only (--plan): never create the library or the index, never write rows
+        self.dest_dir = dest_dir
+        self.read_only = read_only
+        self.db_path = os.path.join(dest_dir, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._pending = []
+        self.phashes = {}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS hash_index (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime_ns INTEGER,
+                inode INTEGER,
+                hash TEXT,
+                partial_hash TEXT,
+                phash TEXT
+            )
+        ''')
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(hash_index)")}
+        if 'partial_hash' not in columns:
+            conn.execute("ALTER TABLE hash_index ADD COLUMN partial_hash TEXT")
+        if 'phash' not in columns:
+            conn.execute("ALTER TABLE hash_index ADD COLUMN phash TEXT")
+        return conn
+
+    def _rows(self):
+        if not self.read_only:
+            conn = self._connect()
+        elif os.path.exists(self.db_path):
+            conn = db.connect_readonly(self.db_path)
+        else:
+            return []
+        try:
+            return conn.execute("SELECT path, size, mtime_ns, inode, hash, partial_hash, phash FROM hash_index").fetchall()
+        except sqlite3.OperationalError:
+            return []  # read-only and the table (or a column) is not there yet
+        finally:
+            conn.close()
+
+    def refresh(self, exts):
+        """
+        Bring the index in line with the files currently under dest_dir.
+        Returns a list of (path, size, partial_hash, hash); hashes may be None.
+        Hashes made with a different algorithm than the current one are dropped.
+        Known perceptual hashes are left in self.phashes ({path: phash}).
+        """
+        if not self.read_only:
+            os.makedirs(self.dest_dir, exist_ok=True)
+        algorithm = get_algorithm()
+        cached = {}
+        for path, size, mtime_ns, inode, h, ph, pp in self._rows():
+            if h and parse_hash(h)[0] != algorithm:
+                h = None
+            if ph and parse_hash(ph)[0] != algorithm:
+                ph = None
+            cached[path] = ((size, mtime_ns, inode), h, ph, pp)
+
+        # Secondary lookup so moved files can reuse their previous hashes
+        by_stat = {key: (h, ph, pp) for key, h, ph, pp in cached.values()}
+        self.phashes = {}
+
+        exts = tuple(exts)
+        seen = set()
+        changed = []
+        entries = []
+
+        for entry in iter_entries(self.dest_dir):
+            if not entry.name.lower().endswith(exts):
+                continue
+            path = entry.path
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            key = (st.st_size, st.st_mtime_ns, st.st_ino)
+            seen.add(path)
+
+            row = cached.get(path)
+            if row and row[0] == key:
+                h, ph, pp = row[1], row[2], row[3]
+            else:
+                h, ph, pp = by_stat.get(key, (None, None, None))
+                changed.append((path,) + key + (h, ph, pp))
+            entries.append((path, st.st_size, ph, h))
+            if pp:
+                self.phashes[path] = pp
+
+        removed = [(p,) for p in cached if p not in seen]
+        if (changed or removed) and not self.read_only:
+            conn = self._connect()
+            try:
+                conn.executemany("DELETE FROM hash_index WHERE path=?", removed)
+                conn.executemany("INSERT OR REPLACE INTO hash_index VALUES (?, ?, ?, ?, ?, ?, ?)", changed)
+                conn.commit()
+            finally:
+                conn.close()
+        return entries
+
+    def record(self, path, file_hash=None, partial_hash=None, phash=None):
+        """
+        Queue a library file's hashes so the next refresh does not recompute them.
+        Hashes passed as None keep the stored value while the file is unchanged.
+        """
+        if not file_hash and not partial_hash and not phash:
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        with self._lock:
+            self._pending.append((path, st.st_size, st.st_mtime_ns, st.st_ino, file_hash, partial_hash, phash))
+
+    def record_entry(self, entry):
+        """Callback for DedupEngine.on_hashed."""
+        self.record(entry.path, entry.full, entry.partial)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending or self.read_only:
+            return
+        conn = self._connect()
+        try:
+            conn.executemany(RECORD_SQL, pending)
+            conn.commit()
+        finally:
+            conn.close()
@@ -0,0 +1,92 @@
+import hashlib
+
+# Optional fast non-cryptographic / SIMD hashers
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Name -> hasher factory. Stdlib algorithms are always available.
+ALGORITHMS = {
+    'md5': hashlib.md5,
+    'sha1': hashlib.sha1,
+    'sha256': hashlib.sha256,
+    'blake2b': hashlib.blake2b,
+    'blake2s': hashlib.blake2s,
+}
+if xxhash is not None:
+    ALGORITHMS['xxh64'] = xxhash.xxh64
+    ALGORITHMS['xxh3_64'] = xxhash.xxh3_64
+    ALGORITHMS['xxh3_128'] = xxhash.xxh3_128
+if blake3 is not None:
+    ALGORITHMS['blake3'] = blake3.blake3
+
+# Fastest first. sha256 is the stdlib fallback because OpenSSL uses the
+# SHA extensions on both x86-64 and Apple Silicon, beating md5 and blake2.
+PREFERRED_ALGORITHMS = ['xxh3_128', 'blake3', 'sha256']
+
+# Hashes written before algorithms were recorded are bare MD5 hex digests
+LEGACY_ALGORITHM = 'md5'
+
+_config = {
+    'algorithm': next(a for a in PREFERRED_ALGORITHMS if a in ALGORITHMS),
+    'chunk_size': DEFAULT_CHUNK_SIZE,
+}
+
+
+def configure(algorithm=None, chunk_size=None):
+    """Set the process-wide default algorithm and read size."""
+    if algorithm:
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unsupported hash algorithm: {algorithm} (available: {', '.join(sorted(ALGORITHMS))})")
+        _config['algorithm'] = algorithm
+    if chunk_size:
+        _config['chunk_size'] = int(chunk_size)
+
+
+def get_algorithm():
+    return _config['algorithm']
+
+
+def new_hasher(algorithm=None):
+    return ALGORITHMS[algorithm or _config['algorithm']]()
+
+
+def format_hash(algorithm, digest):
+    """Tagged form stored in files.hash and the library index, e.g. 'sha256:ab12...'."""
+    return f"{algorithm}:{digest}"
+
+
+def parse_hash(value):
+    """Split a stored hash into (algorithm, digest). Untagged values are legacy MD5."""
+    if not value:
+        return None, None
+    if ':' in value:
+        algorithm, digest = value.split(':', 1)
+        return algorithm, digest
+    return LEGACY_ALGORITHM, value
+
+
+def calculate_file_hash(filepath, algorithm=None, chunk_size=None):
+    """Hash a whole file with the configured algorithm. Returns a tagged digest or None."""
+    algorithm = algorithm or _config['algorithm']
+    hasher = ALGORITHMS[algorithm]()
+    buf = bytearray(chunk_size or _config['chunk_size'])
+    view = memoryview(buf)
+    try:
+        with open(filepath, 'rb', buffering=0) as f:
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                hasher.update(view[:n])
+        return format_hash(algorithm, hasher.hexdigest())
+    except:
+        return None
@@ -0,0 +1,243 @@
+import os
+import struct
+
+# HEIC/HEIF (ISOBMFF) metadata without libheif: the top-level 'meta' box is
+# read in one positioned read and parsed in memory (pitm / iinf / iloc /
+# iprp), then the EXIF item's extents are read directly. No HEVC data is
+# touched, and no decoder is initialized.
+
+HEIF_EXTS = {'.heic', '.heif', '.hif', '.avif'}
+HEIF_BRANDS = {b'heic', b'heix', b'heim', b'heis', b'hevc', b'hevx', b'mif1', b'msf1', b'avif', b'avis'}
+
+# Camera HEICs keep 'meta' within the first few KB; cap what a corrupt size can make us read
+MAX_META_SIZE = 4 * 1024 * 1024
+MAX_EXIF_SIZE = 1024 * 1024
+HEADER_PROBE = 64 * 1024
+
+
+def _boxes(buf, start, end):
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from('>I4s', buf, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end:
+                return
+            size = struct.unpack_from('>Q', buf, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            return
+        yield box_type, pos + header, pos + size
+        pos += size
+
+
+def _uint(buf, pos, n):
+    if n == 0:
+        return 0, pos
+    if n == 1:
+        return buf[pos], pos + 1
+    if n == 2:
+        return struct.unpack_from('>H', buf, pos)[0], pos + 2
+    if n == 4:
+        return struct.unpack_from('>I', buf, pos)[0], pos + 4
+    if n == 8:
+        return struct.unpack_from('>Q', buf, pos)[0], pos + 8
+    raise ValueError(f"Unsupported field size {n}")
+
+
+def _parse_pitm(buf, start):
+    version = buf[start]
+    return _uint(buf, start + 4, 2 if version == 0 else 4)[0]
+
+
+def _parse_iinf(buf, start, end):
+    """{item_id: item_type} from the infe entries (versions 2/3 carry the type)."""
+    version = buf[start]
+    pos = start + 4 + (2 if version == 0 else 4)
+    items = {}
+    for box_type, body, box_end in _boxes(buf, pos, end):
+        if box_type != b'infe':
+            continue
+        infe_version = buf[body]
+        if infe_version < 2:
+            continue
+        item_id, p = _uint(buf, body + 4, 2 if infe_version == 2 else 4)
+        items[item_id] = bytes(buf[p + 2:p + 6])  # skip item_protection_index
+    return items
+
+
+def _parse_iloc(buf, start):
+    """{item_id: (construction_method, [(offset, length), ...])}"""
+    version = buf[start]
+    pos = start + 4
+    offset_size, length_size = buf[pos] >> 4, buf[pos] & 0xF
+    base_offset_size, index_size = buf[pos + 1] >> 4, buf[pos + 1] & 0xF
+    if version == 0:
+        index_size = 0
+    pos += 2
+    count, pos = _uint(buf, pos, 2 if version < 2 else 4)
+    locations = {}
+    for _ in range(count):
+        item_id, pos = _uint(buf, pos, 2 if version < 2 else 4)
+        method = 0
+        if version in (1, 2):
+            method, pos = _uint(buf, pos, 2)
+            method &= 0xF
+        pos += 2  # data_reference_index
+        base, pos = _uint(buf, pos, base_offset_size)
+        extent_count, pos = _uint(buf, pos, 2)
+        extents = []
+        for _ in range(extent_count):
+            _, pos = _uint(buf, pos, index_size)
+            offset, pos = _uint(buf, pos, offset_size)
+            length, pos = _uint(buf, pos, length_size)
+            extents.append((base + offset, length))
+        locations[item_id] = (method, extents)
+    return locations
+
+
+def _parse_iprp(buf, start, end):
+    """(properties list, {item_id: [property index, ...]}) from ipco + ipma."""
+    properties = []
+    associations = {}
+    for box_type, body, box_end in _boxes(buf, start, end):
+        if box_type == b'ipco':
+            properties = [(t, b, e) for t, b, e in _boxes(buf, body, box_end)]
+        elif box_type == b'ipma':
+            version, flags = buf[body], int.from_bytes(buf[body + 1:body + 4], 'big')
+            count, pos = _uint(buf, body + 4, 4)
+            for _ in range(count):
+                item_id, pos = _uint(buf, pos, 2 if version < 1 else 4)
+                n = buf[pos]
+                pos += 1
+                indices = []
+                for _ in range(n):
+                    if flags & 1:
+                        value, pos = _uint(buf, pos, 2)
+                        indices.append(value & 0x7FFF)
+                    else:
+                        indices.append(buf[pos] & 0x7F)
+                        pos += 1
+                associations[item_id] = indices
+    return properties, associations
+
+
+def _dimensions(buf, properties, indices):
+    """
+    Displayed size: the coded size from 'ispe', then the transforms in
+    association order - 'clap' crops (HEVC pads to the coding block size),
+    'irot' by 90/270 degrees swaps the axes.
+    """
+    width = height = None
+    for index in indices:
+        if not 0 < index <= len(properties):
+            continue
+        box_type, body, _ = properties[index - 1]
+        if box_type == b'ispe':
+            width, height = struct.unpack_from('>II', buf, body + 4)
+        elif box_type == b'clap' and width is not None:
+            wn, wd, hn, hd = struct.unpack_from('>IIII', buf, body)
+            if wd and hd:
+                width, height = round(wn / wd), round(hn / hd)
+        elif box_type == b'irot' and width is not None and buf[body] & 1:
+            width, height = height, width
+    return width, height
+
+
+def read_heif_metadata(file_path):
+    """
+    Returns (exif_bytes or None, width, height) for the primary image, or
+    None when the file is not a HEIF container this parser understands
+    (the caller then falls back to Pillow). exif_bytes starts at the TIFF
+    header, ready for PIL's Image.Exif().load().
+    """
+    with open(file_path, 'rb', buffering=0) as f:
+        fd = f.fileno()
+        size = os.fstat(fd).st_size
+
+        def read_at(offset, n):
+            if hasattr(os, 'pread'):
+                return os.pread(fd, n, offset)
+            f.seek(offset)
+            return f.read(n)
+
+        head = read_at(0, HEADER_PROBE)
+        if len(head) < 16 or head[4:8] != b'ftyp':
+            return None
+        ftyp_size = struct.unpack_from('>I', head, 0)[0]
+        brands = {head[8:12]} | {head[p:p + 4] for p in range(16, min(ftyp_size, len(head)) - 3, 4)}
+        if not brands & HEIF_BRANDS:
+            return None
+
+        # Locate the top-level 'meta' box (normally right after ftyp)
+        pos = 0
+        meta = None
+        while pos + 16 <= size:
+            header = head[pos:pos + 16] if pos + 16 <= len(head) else read_at(pos, 16)
+            box_size, box_type = struct.unpack_from('>I4s', header, 0)
+            header_len = 8
+            if box_size == 1:
+                box_size = struct.unpack_from('>Q', header, 8)[0]
+                header_len = 16
+            elif box_size == 0:
+                box_size = size - pos
+            if box_size < header_len:
+                return None
+            if box_type == b'meta':
+                meta = (pos + header_len, pos + box_size)
+                break
+            pos += box_size
+        if meta is None or meta[1] - meta[0] > MAX_META_SIZE:
+            return None
+
+        meta_start, meta_end = meta
+        if meta_end <= len(head):
+            buf = memoryview(head)[:meta_end]
+        else:
+            # Zero-pad the front so box offsets stay absolute file offsets
+            buf = memoryview(bytearray(meta_start) + read_at(meta_start, meta_end - meta_start))
+        if len(buf) < meta_end:
+            return None
+
+        primary = None
+        items = {}
+        locations = {}
+        properties, associations = [], {}
+        idat = None
+        # 'meta' is a full box: 4 bytes of version/flags before its children
+        for box_type, body, box_end in _boxes(buf, meta_start + 4, meta_end):
+            if box_type == b'pitm':
+                primary = _parse_pitm(buf, body)
+            elif box_type == b'iinf':
+                items = _parse_iinf(buf, body, box_end)
+            elif box_type == b'iloc':
+                locations = _parse_iloc(buf, body)
+            elif box_type == b'iprp':
+                properties, associations = _parse_iprp(buf, body, box_end)
+            elif box_type == b'idat':
+                idat = (body, box_end)
+        if primary is None:
+            return None
+
+        width, height = _dimensions(buf, properties, associations.get(primary, ()))
+
+        exif = None
+        exif_id = next((item_id for item_id, item_type in items.items() if item_type == b'Exif'), None)
+        if exif_id is not None and exif_id in locations:
+            method, extents = locations[exif_id]
+            total = sum(length for _, length in extents)
+            if 0 < total <= MAX_EXIF_SIZE:
+                if method == 0:
+                    data = b''.join(read_at(offset, length) for offset, length in extents)
+                elif method == 1 and idat is not None:
+                    data = b''.join(bytes(buf[idat[0] + offset:idat[0] + offset + length])
+                                    for offset, length in extents)
+                else:
+                    data = b''
+                # Exif item payload: 4-byte offset to the TIFF header, then (usually) "Exif\0\0" + TIFF
+                if len(data) >= 4:
+                    tiff_offset = struct.unpack_from('>I', data, 0)[0]
+                    exif = data[4 + tiff_offset:] or None
+        return exif, width, height
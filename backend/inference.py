@@ -0,0 +1,148 @@
+import os
+import hashlib
+
+import numpy as np
+
+# MobileNet backends. Every backend takes a [N, 224, 224, 3] uint8 batch and
+# returns [N, classes] softmax probabilities, so the classifier does not care
+# which runtime is behind it.
+#
+#   tf      the TF-Hub SavedModel through full TensorFlow (reference)
+#   tflite  a converted (optionally float16/int8 quantized) .tflite model
+#   onnx    a converted .onnx model through ONNX Runtime
+#
+# convert_model.py produces the .tflite / .onnx files from the SavedModel.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, 'models')
+
+BACKENDS = ('tf', 'tflite', 'onnx')
+DEFAULT_BACKEND = 'tf'
+DEFAULT_MODELS = {
+    'tf': os.path.join(MODELS_DIR, 'mobilenet_v3'),
+    'tflite': os.path.join(MODELS_DIR, 'mobilenet_v3_int8.tflite'),
+    'onnx': os.path.join(MODELS_DIR, 'mobilenet_v3.onnx'),
+}
+
+
+def softmax(logits):
+    e = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def model_version(model_path):
+    """Short content digest of the model file(s): changes whenever the model does."""
+    digest = hashlib.sha256()
+    if os.path.isdir(model_path):
+        for root, dirs, files in os.walk(model_path):
+            dirs.sort()
+            for name in sorted(files):
+                digest.update(name.encode())
+                with open(os.path.join(root, name), 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(chunk)
+    else:
+        with open(model_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class TFModel:
+    def __init__(self, model_path):
+        import tensorflow as tf
+        import tensorflow_hub as hub
+        self._tf = tf
+        self._model = hub.load(model_path)
+
+    def __call__(self, frames):
+        tf = self._tf
+        logits = self._model(tf.image.convert_image_dtype(tf.constant(frames), tf.float32))
+        return tf.nn.softmax(logits).numpy()
+
+
+def _tflite_interpreter(model_path):
+    # Smallest runtime first; full TensorFlow only as a last resort
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+    return Interpreter(model_path=model_path, num_threads=os.cpu_count() or 1)
+
+
+class TFLiteModel:
+    """
+    Interpreters are not thread-safe; the InferenceBatcher's single thread
+    is the only caller. The batch dimension is resized on demand.
+    """
+
+    def __init__(self, model_path):
+        self._interpreter = _tflite_interpreter(model_path)
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch = None
+
+    def __call__(self, frames):
+        interpreter = self._interpreter
+        if len(frames) != self._batch:
+            interpreter.resize_tensor_input(self._input['index'], [len(frames), *frames.shape[1:]])
+            interpreter.allocate_tensors()
+            self._batch = len(frames)
+        interpreter.set_tensor(self._input['index'], _quantize(frames, self._input))
+        interpreter.invoke()
+        logits = interpreter.get_tensor(self._output['index'])
+        return softmax(_dequantize(logits, self._output))
+
+
+def _quantize(frames, detail):
+    dtype = detail['dtype']
+    if dtype == np.float32:
+        return frames.astype(np.float32) / 255.0
+    # Fully int8-quantized model: map [0, 1] floats onto the input's quantization
+    scale, zero_point = detail['quantization']
+    values = np.round(frames.astype(np.float32) / 255.0 / scale + zero_point)
+    info = np.iinfo(dtype)
+    return np.clip(values, info.min, info.max).astype(dtype)
+
+
+def _dequantize(values, detail):
+    if values.dtype == np.float32:
+        return values
+    scale, zero_point = detail['quantization']
+    return (values.astype(np.float32) - zero_point) * scale
+
+
+class OnnxModel:
+    def __init__(self, model_path):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = os.cpu_count() or 1
+        self._session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self._input = self._session.get_inputs()[0].name
+
+    def __call__(self, frames):
+        logits = self._session.run(None, {self._input: frames.astype(np.float32) / 255.0})[0]
+        return softmax(logits)
+
+
+_LOADERS = {'tf': TFModel, 'tflite': TFLiteModel, 'onnx': OnnxModel}
+
+
+def resolve_model(backend=DEFAULT_BACKEND, model_path=None):
+    """(model path, model version) for the chosen backend, without importing its runtime."""
+    if backend not in _LOADERS:
+        raise ValueError(f"Unknown inference backend: {backend}")
+    model_path = model_path or DEFAULT_MODELS[backend]
+    if not os.path.exists(model_path):
+        hint = "" if backend == 'tf' else " (create it with convert_model.py)"
+        raise FileNotFoundError(f"Model not found at {model_path}{hint}")
+    return model_path, f"{backend}:{model_version(model_path)}"
+
+
+def load_model(backend=DEFAULT_BACKEND, model_path=None):
+    """(model callable, model path, model version) for the chosen backend."""
+    model_path, version = resolve_model(backend, model_path)
+    return _LOADERS[backend](model_path), model_path, version
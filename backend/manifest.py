@@ -0,0 +1,44 @@
+import os
+import json
+import time
+
+MANIFEST_VERSION = 1
+
+
+class ManifestWriter:
+    """
+    Writes an organize plan as JSON lines: one header line, then one record
+    per source file with source, target, type, date, hash and action
+    ('copy' / 'hardlink' / 'move', or 'skip' for duplicates).
+
+    The file is written under a temporary name and renamed on close, so an
+    interrupted plan never leaves a truncated manifest behind.
+    """
+
+    def __init__(self, path, **header):
+        self.path = path
+        self._tmp_path = path + '.part'
+        self._f = open(self._tmp_path, 'w', encoding='utf-8')
+        self.count = 0
+        self._write(dict(header, manifest=MANIFEST_VERSION, created=time.time()))
+
+    def _write(self, record):
+        self._f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def write(self, record):
+        self._write(record)
+        self.count += 1
+
+    def close(self):
+        self._f.close()
+        os.replace(self._tmp_path, self.path)
+
+
+def read_manifest(path):
+    """Returns (header, records)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get('manifest') != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version: {header.get('manifest')}")
+        records = [json.loads(line) for line in f if line.strip()]
+    return header, records
@@ -0,0 +1,123 @@
+import os
+import datetime
+from collections import namedtuple
+from PIL import Image
+from phash import dhash_image, dhash_heif_thumbnail, TAG_ORIENTATION
+from heif_meta import HEIF_EXTS, read_heif_metadata
+
+try:
+    import pillow_heif
+    pillow_heif.register_heif_opener()
+except ImportError:
+    pillow_heif = None
+
+# EXIF tag ids (IFD0)
+TAG_MAKE = 0x010F
+TAG_MODEL = 0x0110
+TAG_SOFTWARE = 0x0131
+TAG_DATETIME = 0x0132
+# Exif sub-IFD
+IFD_EXIF = 0x8769
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_DATETIME_DIGITIZED = 0x9004
+
+EXIF_DATE_FORMAT = '%Y:%m:%d %H:%M:%S'
+
+# Formats that can carry EXIF. For anything else (BMP, GIF, ...) has_exif is None,
+# meaning "unknown", so screenshot detection falls back to the filename only.
+EXIF_FORMATS = {'JPEG', 'MPO', 'PNG', 'WEBP', 'TIFF', 'HEIF', 'AVIF'}
+
+# Compact per-file record shared by date extraction and screenshot detection.
+# date_taken is the first parseable of DateTimeOriginal, DateTimeDigitized, DateTime.
+# phash is the 64-bit dHash, only computed when asked for (needs a reduced decode).
+ImageMetadata = namedtuple('ImageMetadata', [
+    'has_exif', 'date_taken', 'make', 'model', 'software', 'width', 'height', 'phash'
+], defaults=(None,))
+
+EMPTY_METADATA = ImageMetadata(None, None, None, None, None, None, None)
+
+
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', 'ignore')
+    value = str(value).strip('\x00 ')
+    return value or None
+
+
+def _parse_date(*values):
+    for value in values:
+        value = _text(value)
+        if not value:
+            continue
+        try:
+            return datetime.datetime.strptime(value[:19], EXIF_DATE_FORMAT)
+        except ValueError:
+            continue
+    return None
+
+
+def metadata_from_exif(exif, width=None, height=None):
+    """Build an ImageMetadata from a PIL Image.Exif, reading only the tags we use."""
+    if not exif:
+        return ImageMetadata(False, None, None, None, None, width, height)
+    try:
+        sub = exif.get_ifd(IFD_EXIF)
+    except Exception:
+        sub = {}
+    return ImageMetadata(
+        True,
+        _parse_date(sub.get(TAG_DATETIME_ORIGINAL), sub.get(TAG_DATETIME_DIGITIZED), exif.get(TAG_DATETIME)),
+        _text(exif.get(TAG_MAKE)),
+        _text(exif.get(TAG_MODEL)),
+        _text(exif.get(TAG_SOFTWARE)),
+        width,
+        height,
+    )
+
+
+def _heif_fast_path(file_path):
+    """HEIC/HEIF straight from the container boxes, without libheif. None if it cannot be parsed."""
+    try:
+        found = read_heif_metadata(file_path)
+    except Exception:
+        return None
+    if found is None:
+        return None
+    exif_bytes, width, height = found
+    if not exif_bytes:
+        return ImageMetadata(False, None, None, None, None, width, height)
+    exif = Image.Exif()
+    exif.load(exif_bytes)
+    return metadata_from_exif(exif, width, height)
+
+
+def extract_metadata(file_path, with_phash=False):
+    """
+    Open the file once and extract the fields we use. Only the header is read,
+    unless with_phash asks for a perceptual hash from a reduced decode of the
+    same open image. HEIC/HEIF skips Pillow entirely: metadata comes from the
+    container and the perceptual hash from the embedded thumbnail.
+    """
+    if os.path.splitext(file_path)[1].lower() in HEIF_EXTS:
+        meta = _heif_fast_path(file_path)
+        if meta is not None:
+            # Without a thumbnail there is no hash: a full HEVC decode costs ~100x more
+            return meta._replace(phash=dhash_heif_thumbnail(file_path)) if with_phash else meta
+    try:
+        with Image.open(file_path) as img:
+            width, height = img.size
+            exif = img.getexif() if img.format in EXIF_FORMATS else None
+            if exif is None:
+                meta = EMPTY_METADATA._replace(width=width, height=height)
+            else:
+                meta = metadata_from_exif(exif, width, height)
+            if with_phash:
+                try:
+                    meta = meta._replace(phash=dhash_image(img, exif.get(TAG_ORIENTATION) if exif else None))
+                except Exception:
+                    pass
+            return meta
+    except Exception:
+        return EMPTY_METADATA
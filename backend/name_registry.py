@@ -0,0 +1,106 @@
+import os
+import sys
+import threading
+import unicodedata
+
+# Default filesystems on macOS (APFS/HFS+) and Windows (NTFS) are case-insensitive,
+# and APFS also treats NFC/NFD spellings (e.g. Korean filenames) as the same name.
+CASE_INSENSITIVE = sys.platform == 'darwin' or os.name == 'nt'
+
+
+def name_key(filename):
+    """Comparison key for a filename on this platform's default filesystem."""
+    if CASE_INSENSITIVE:
+        return unicodedata.normalize('NFC', filename).casefold()
+    return filename
+
+
+class _DirState:
+    __slots__ = ('on_disk', 'taken')
+
+    def __init__(self, names):
+        # Names present when the directory was first listed (candidates for content-duplicate checks)
+        self.on_disk = names
+        # Everything unavailable: on_disk plus names handed out during this run
+        self.taken = set(names)
+
+
+class NameRegistry:
+    """
+    Per-run registry of destination directories and claimed filenames.
+
+    Each target directory is created and listed once; after that, unique
+    names (`name`, `name_1`, `name_2`, ...) are handed out from memory under a
+    lock, so concurrent workers never race for the same path and no
+    os.path.exists probe hits the filesystem per candidate. Assumes nothing
+    else writes into the library while a run is in progress.
+
+    With dry_run (--plan) directories are never created: an existing one is
+    listed, a missing one counts as empty.
+    """
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self._lock = threading.Lock()
+        self._dirs = {}
+
+    def ensure_dir(self, target_dir):
+        """Create target_dir if needed and load its listing. Cached per run."""
+        key = os.path.normcase(os.path.abspath(target_dir))
+        with self._lock:
+            state = self._dirs.get(key)
+        if state is not None:
+            return state
+
+        if self.dry_run:
+            names = os.listdir(target_dir) if os.path.isdir(target_dir) else []
+        else:
+            os.makedirs(target_dir, exist_ok=True)
+            names = os.listdir(target_dir)
+        state = _DirState({name_key(n) for n in names})
+        with self._lock:
+            # Another worker may have listed the same directory meanwhile; keep the first
+            return self._dirs.setdefault(key, state)
+
+    def claim(self, target_dir, filename, current_path=None, is_duplicate=None):
+        """
+        Reserve a unique path for filename inside target_dir.
+
+        - current_path: the file being placed. If it already sits at the
+          requested path, that path is returned as-is.
+        - is_duplicate(existing_path): called when the requested name belongs
+          to a file that was already in the directory before this run; if it
+          returns True, nothing is claimed and None is returned.
+        """
+        state = self.ensure_dir(target_dir)
+        path = os.path.join(target_dir, filename)
+        if current_path is not None and os.path.normcase(os.path.abspath(current_path)) == \
+                os.path.normcase(os.path.abspath(path)):
+            return path
+
+        key = name_key(filename)
+        if is_duplicate is not None:
+            with self._lock:
+                existed = key in state.on_disk
+            # Compare outside the lock: it reads file contents
+            if existed and is_duplicate(path):
+                return None
+
+        base, ext = os.path.splitext(filename)
+        with self._lock:
+            name = filename
+            counter = 1
+            while key in state.taken:
+                name = f"{base}_{counter}{ext}"
+                key = name_key(name)
+                counter += 1
+            state.taken.add(key)
+        return os.path.join(target_dir, name)
+
+    def release(self, path):
+        """Give back a claimed name (e.g. the transfer into it failed)."""
+        key = os.path.normcase(os.path.abspath(os.path.dirname(path)))
+        with self._lock:
+            state = self._dirs.get(key)
+            if state is not None:
+                state.taken.discard(name_key(os.path.basename(path)))
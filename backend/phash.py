@@ -0,0 +1,165 @@
+import os
+import threading
+from PIL import Image
+from heif_meta import HEIF_EXTS
+
+try:
+    import pillow_heif
+except ImportError:
+    pillow_heif = None
+
+# dHash: 8x8 horizontal gradient signs of a 9x8 grayscale thumbnail -> 64 bits.
+# Survives re-encoding, resizing and mild edits; Hamming distance measures similarity.
+HASH_SIZE = 8
+DEFAULT_RADIUS = 6  # max differing bits (of 64) to call two images near-duplicates
+
+# Smallest decode that still leaves enough detail for a 9x8 thumbnail
+DRAFT_SIZE = (HASH_SIZE * 8, HASH_SIZE * 8)
+
+# Thumbnails whose brightest and darkest pixel differ by less than this have no usable gradients
+MIN_CONTRAST = 8
+
+TAG_ORIENTATION = 0x0112
+_ORIENTATION_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+
+def dhash_image(img, orientation=None):
+    """
+    dHash of an open PIL image. For JPEG, draft() makes the decoder produce a
+    1/2..1/8 scaled grayscale image directly, so the full-size pixels are never
+    materialized. The EXIF orientation is applied before the final resize so
+    a rotated re-export hashes like its original. Returns None for
+    near-uniform images.
+    """
+    img.draft('L', DRAFT_SIZE)
+    gray = img.convert('L')
+    op = _ORIENTATION_TRANSPOSE.get(orientation)
+    if op is not None:
+        gray = gray.transpose(op)
+    px = gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR).tobytes()
+    if max(px) - min(px) < MIN_CONTRAST:
+        # Blank / single-color frames all hash alike; not a useful signal
+        return None
+    width = HASH_SIZE + 1
+    value = 0
+    for row in range(HASH_SIZE):
+        base = row * width
+        for col in range(HASH_SIZE):
+            value = (value << 1) | (px[base + col] < px[base + col + 1])
+    return value
+
+
+def dhash_heif_thumbnail(file_path):
+    """
+    dHash of a HEIC/HEIF from its smallest embedded thumbnail (iPhones store
+    320x240), so the full-size HEVC frame is never decoded. None when the file
+    has no thumbnail or it cannot be read.
+    """
+    if pillow_heif is None:
+        return None
+    try:
+        heif = pillow_heif.open_heif(file_path, convert_hdr_to_8bit=True)
+        primary = heif[heif.primary_index]
+        thumbs = [primary.get_thumbnail(i) for i in range(len(primary.info.get('thumbnails', ())))]
+        if not thumbs:
+            return None
+        # libheif applies the item transforms (irot/imir) when decoding, so no EXIF orientation here
+        return dhash_image(min(thumbs, key=lambda t: min(t.size)).to_pillow())
+    except Exception:
+        return None
+
+
+def dhash_file(file_path):
+    # Same source as extract_metadata for HEIC, so library and incoming hashes compare alike
+    if os.path.splitext(file_path)[1].lower() in HEIF_EXTS:
+        return dhash_heif_thumbnail(file_path)
+    try:
+        with Image.open(file_path) as img:
+            return dhash_image(img, img.getexif().get(TAG_ORIENTATION))
+    except Exception:
+        return None
+
+
+def format_phash(value):
+    return f"{value:016x}" if value is not None else None
+
+
+def parse_phash(text):
+    return int(text, 16) if text else None
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class MultiIndexHash:
+    """
+    Hamming-radius index over 64-bit hashes (multi-index hashing).
+
+    The hash is split into radius + 1 disjoint chunks, each with its own
+    exact-match table. Two hashes within `radius` bits must agree exactly on
+    at least one chunk (pigeonhole), so a query only compares against the
+    entries sharing a chunk with it instead of the whole library.
+    """
+
+    def __init__(self, radius=DEFAULT_RADIUS):
+        self.radius = radius
+        count = min(radius + 1, 64)
+        self._chunks = []
+        shift = 0
+        for i in range(count):
+            bits = 64 // count + (1 if i < 64 % count else 0)
+            self._chunks.append((shift, (1 << bits) - 1))
+            shift += bits
+        self._tables = [{} for _ in self._chunks]
+        self._lock = threading.Lock()
+        self.size = 0
+
+    def _insert(self, value, item):
+        entry = (value, item)
+        for (shift, mask), table in zip(self._chunks, self._tables):
+            table.setdefault((value >> shift) & mask, []).append(entry)
+        self.size += 1
+
+    def _search(self, value):
+        found = []
+        seen = set()
+        for (shift, mask), table in zip(self._chunks, self._tables):
+            for entry in table.get((value >> shift) & mask, ()):
+                d = hamming(value, entry[0])
+                # An entry sharing several chunks shows up in several tables
+                if d <= self.radius and id(entry) not in seen:
+                    seen.add(id(entry))
+                    found.append((d, entry[1]))
+        found.sort(key=lambda x: x[0])
+        return found
+
+    def add(self, value, item):
+        with self._lock:
+            self._insert(value, item)
+
+    def search(self, value):
+        """All (distance, item) within the radius, closest first."""
+        with self._lock:
+            return self._search(value)
+
+    def add_or_match(self, value, item):
+        """
+        Atomically return the closest (distance, item) within the radius, or
+        add the item and return None. Concurrent near-identical files
+        therefore resolve to exactly one original.
+        """
+        with self._lock:
+            found = self._search(value)
+            if found:
+                return found[0]
+            self._insert(value, item)
+            return None
@@ -0,0 +1,134 @@
+import queue
+import threading
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a Pipeline, run by its own pool of worker threads.
+
+    `func(item)` works on the item in place. It returns True to pass the item
+    on to the next stage, or False when the item is finished early (duplicate,
+    error, ...) and should go straight to the results.
+    """
+
+    def __init__(self, name, func, workers, queue_size=None):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.input = queue.Queue(maxsize=queue_size or self.workers * 2)
+        self.busy = 0
+        self._lock = threading.Lock()
+        self._alive = 0
+
+    def occupancy(self):
+        return {"busy": self.busy, "workers": self.workers, "queued": self.input.qsize()}
+
+
+class Pipeline:
+    """
+    Chain of stages connected by bounded queues, so each stage can be sized
+    for its bottleneck (disk, GIL-bound parsing, ...) and a slow stage
+    back-pressures the ones before it instead of piling up work in memory.
+
+    Items that leave the last stage, or leave any stage early, are yielded by
+    results(). pause_event (set = running) and stop_event are honoured before
+    each item; after a stop, remaining items are dropped.
+    """
+
+    def __init__(self, stages, on_error, pause_event=None, stop_event=None, result_size=None):
+        self.stages = stages
+        self.on_error = on_error
+        self.pause_event = pause_event
+        self.stop_event = stop_event
+        self._results = queue.Queue(maxsize=result_size or sum(s.workers for s in stages) * 2)
+
+    def start(self):
+        for index, stage in enumerate(self.stages):
+            stage._alive = stage.workers
+            nxt = self.stages[index + 1].input if index + 1 < len(self.stages) else self._results
+            for _ in range(stage.workers):
+                threading.Thread(target=self._work, args=(stage, nxt), daemon=True).start()
+
+    def put(self, item):
+        self.stages[0].input.put(item)
+
+    def close(self):
+        """No more input; results() ends once everything in flight has drained."""
+        self.stages[0].input.put(_DONE)
+
+    def results(self):
+        while True:
+            item = self._results.get()
+            if item is _DONE:
+                return
+            yield item
+
+    def occupancy(self):
+        return {stage.name: stage.occupancy() for stage in self.stages}
+
+    def _work(self, stage, nxt):
+        while True:
+            item = stage.input.get()
+            if item is _DONE:
+                # Hand the marker to a sibling worker; the last one out passes it on
+                with stage._lock:
+                    stage._alive -= 1
+                    last = stage._alive == 0
+                (nxt if last else stage.input).put(_DONE)
+                return
+
+            if self.pause_event is not None:
+                self.pause_event.wait()
+            if self.stop_event is not None and self.stop_event.is_set():
+                continue
+
+            with stage._lock:
+                stage.busy += 1
+            try:
+                forward = stage.func(item)
+            except Exception as e:
+                self.on_error(item, e)
+                forward = False
+            finally:
+                with stage._lock:
+                    stage.busy -= 1
+            (nxt if forward else self._results).put(item)
+
+
+class PipelineGroup:
+    """
+    Independent pipelines drained as one, e.g. one copier per source device so
+    each disk is read in its own order while the devices work in parallel.
+    Offers the same results() / occupancy() as a single Pipeline.
+    """
+
+    def __init__(self, pipelines):
+        self.pipelines = pipelines
+        self._results = queue.Queue()
+
+    def start(self):
+        for pipeline in self.pipelines:
+            pipeline.start()
+            threading.Thread(target=self._drain, args=(pipeline,), daemon=True).start()
+
+    def _drain(self, pipeline):
+        for item in pipeline.results():
+            self._results.put(item)
+        self._results.put(_DONE)
+
+    def results(self):
+        remaining = len(self.pipelines)
+        while remaining:
+            item = self._results.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            yield item
+
+    def occupancy(self):
+        occupancy = {}
+        for pipeline in self.pipelines:
+            occupancy.update(pipeline.occupancy())
+        return occupancy
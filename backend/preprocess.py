@@ -0,0 +1,197 @@
+import queue
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+
+from decode import decode_rgb, model_frame, MODEL_INPUT_SIZE
+
+# Face-detection frames are stored at up to this many pixels (decode_rgb
+# already delivers ~640-1280 px on the short side); larger frames are
+# shrunk to fit their slot. MediaPipe looks at 192x192 at most.
+MAX_FRAME_PIXELS = 1280 * 960
+
+MODEL_SHAPE = (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE, 3)
+MODEL_BYTES = MODEL_INPUT_SIZE * MODEL_INPUT_SIZE * 3
+SLOT_BYTES = MODEL_BYTES + MAX_FRAME_PIXELS * 3
+
+RESULT_POLL = 1.0  # seconds between worker liveness checks while waiting for results
+
+
+class FrameRing:
+    """
+    Fixed-size frame slots in one shared memory block. Slot layout: the
+    224x224x3 MobileNet frame, then the face-detection frame (h x w x 3).
+    Views are plain numpy arrays over the block: reading a frame never
+    copies it out of shared memory.
+    """
+
+    def __init__(self, slots, name=None):
+        self.slots = slots
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=slots * SLOT_BYTES)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.name = self._shm.name
+
+    def views(self, slot, height, width):
+        base = slot * SLOT_BYTES
+        model = np.ndarray(MODEL_SHAPE, np.uint8, self._shm.buf, base)
+        rgb = np.ndarray((height, width, 3), np.uint8, self._shm.buf, base + MODEL_BYTES)
+        return rgb, model
+
+    def close(self, unlink=False):
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+class Frame:
+    """Zero-copy views of one decoded image; release() hands the slot back."""
+    __slots__ = ('rgb', 'model', '_release')
+
+    def __init__(self, rgb, model, release):
+        self.rgb = rgb
+        self.model = model
+        self._release = release
+
+    def release(self):
+        if self._release is not None:
+            # The views die with the slot; drop them before it can be rewritten
+            self.rgb = self.model = None
+            self._release()
+            self._release = None
+
+
+def fit_pixels(img, max_pixels=MAX_FRAME_PIXELS):
+    h, w = img.shape[:2]
+    if h * w <= max_pixels:
+        return img
+    scale = (max_pixels / (h * w)) ** 0.5
+    size = (max(1, int(w * scale)), max(1, int(h * scale)))
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+
+def _worker_main(ring_name, slots, tasks, results):
+    ring = FrameRing(slots, ring_name)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            slot, path = task
+            try:
+                rgb = decode_rgb(path)
+                if rgb is None:
+                    results.put((slot, None))
+                    continue
+                rgb = fit_pixels(rgb)
+                height, width = rgb.shape[:2]
+                face_view, model_view = ring.views(slot, height, width)
+                face_view[...] = rgb
+                model_view[...] = model_frame(rgb)
+                results.put((slot, (height, width)))
+            except Exception:
+                results.put((slot, None))
+    finally:
+        ring.close()
+
+
+class Preprocessor:
+    """
+    Decode + resize in worker processes instead of GIL-bound threads.
+
+    Each classifier thread calls load(path): a free ring slot is assigned,
+    a worker process decodes the image into it (face-detection frame +
+    uint8 MobileNet frame), and the thread gets a Frame of views into the
+    slot. Slots == threads, since a thread holds at most one frame at a time.
+    Workers are spawned (not forked) so they never inherit TensorFlow or
+    MediaPipe state. spawn re-imports the parent's main script in each
+    worker, so that script must keep heavy imports out of its top level and
+    its entry point under `if __name__ == "__main__"` (classifier.py does). If a worker dies, load() returns None from then on and
+    the caller decodes in-thread.
+    """
+
+    def __init__(self, workers, slots):
+        ctx = multiprocessing.get_context('spawn')
+        self.workers = workers
+        self.ring = FrameRing(slots)
+        self._free = queue.Queue()
+        for slot in range(slots):
+            self._free.put(slot)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.broken = False
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        self._processes = [ctx.Process(target=_worker_main, args=(self.ring.name, slots, self._tasks, self._results),
+                                       daemon=True) for _ in range(workers)]
+        for process in self._processes:
+            process.start()
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    def load(self, path):
+        """Frame for path, or None if it could not be decoded (or the pool is broken)."""
+        if self.broken:
+            return None
+        slot = self._free.get()
+        future = Future()
+        with self._lock:
+            if self.broken:
+                self._free.put(slot)
+                return None
+            self._pending[slot] = future
+        self._tasks.put((slot, path))
+        dims = future.result()
+        if dims is None:
+            self._free.put(slot)
+            return None
+        rgb, model = self.ring.views(slot, *dims)
+        return Frame(rgb, model, lambda: self._free.put(slot))
+
+    def _collect(self):
+        while True:
+            try:
+                item = self._results.get(timeout=RESULT_POLL)
+            except queue.Empty:
+                if any(not p.is_alive() for p in self._processes):
+                    self._fail_pending()
+                    return
+                continue
+            if item is None:
+                return
+            slot, dims = item
+            with self._lock:
+                future = self._pending.pop(slot, None)
+            if future is not None:
+                future.set_result(dims)
+
+    def _fail_pending(self):
+        # A crashed worker took its task with it; nobody can tell which one
+        with self._lock:
+            self.broken = True
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_result(None)
+
+    def close(self):
+        for _ in self._processes:
+            self._tasks.put(None)
+        for p in self._processes:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        self._results.put(None)
+        self._collector.join()
+        self._fail_pending()
+        self.ring.close(unlink=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
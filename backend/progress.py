@@ -0,0 +1,115 @@
+import sys
+import json
+import time
+import threading
+from collections import deque
+
+DEFAULT_INTERVAL = 0.25  # seconds between batched progress events
+DEFAULT_SAMPLE_SIZE = 5
+
+_STDOUT_LOCK = threading.Lock()
+
+
+def emit(message):
+    """Write one JSON line to stdout in a single call so concurrent writers never interleave."""
+    line = json.dumps(message) + '\n'
+    with _STDOUT_LOCK:
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
+
+class ProgressReporter:
+    """
+    Aggregates per-file outcomes and emits at most one progress event per
+    `interval` instead of one JSON line per file.
+
+    Each event carries counts per outcome, throughput, ETA (when the total is
+    known) and a sample of recent filenames. The last file is also exposed as
+    `file` plus `detail_key` (e.g. "type" / "category") so existing listeners
+    keep working. With verbose=True every file is additionally emitted as a
+    {"status": "detail", ...} line.
+    """
+
+    def __init__(self, status, detail_key, total=None, interval=DEFAULT_INTERVAL,
+                 verbose=False, sample_size=DEFAULT_SAMPLE_SIZE):
+        self.status = status
+        self.detail_key = detail_key
+        self.total = total
+        self.interval = interval
+        self.verbose = verbose
+        self.counts = {}
+        self.processed = 0
+        self.extra = {}
+        self._recent = deque(maxlen=sample_size)
+        self._errors = deque(maxlen=sample_size)
+        self._last = None
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._last_emit = 0.0
+        self._dirty = False
+
+    def set_total(self, total):
+        with self._lock:
+            self.total = total
+
+    def set(self, **fields):
+        """Extra fields carried on every event (e.g. discovered counts, stage occupancy)."""
+        with self._lock:
+            self.extra.update(fields)
+
+    def update(self, outcome, filename=None, message=None, detail=None, label=None):
+        """
+        Record one finished file. `label` overrides what is shown for the last
+        file (defaults to the outcome); `detail` is the full per-file message
+        for verbose mode.
+        """
+        with self._lock:
+            self.processed += 1
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+            if filename:
+                self._recent.append(filename)
+                self._last = (filename, label or outcome)
+            if message:
+                self._errors.append(message)
+            self._dirty = True
+            due = time.monotonic() - self._last_emit >= self.interval
+        if self.verbose and detail is not None:
+            emit(dict(detail, status="detail", detail_status=detail.get("status")))
+        if due:
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            rate = self.processed / elapsed if elapsed > 0 else 0.0
+            eta = None
+            if self.total and rate > 0:
+                eta = max(self.total - self.processed, 0) / rate
+            event = {
+                "status": self.status,
+                "processed": self.processed,
+                "total": self.total,
+                "counts": dict(self.counts),
+                "rate": round(rate, 2),
+                "eta": round(eta, 1) if eta is not None else None,
+                "elapsed": round(elapsed, 1),
+                "recent": list(self._recent),
+            }
+            if self.total:
+                event["progress"] = int(self.processed / self.total * 100)
+            if self._errors:
+                event["errors"] = list(self._errors)
+                self._errors.clear()
+            if self._last:
+                event["file"], event[self.detail_key] = self._last
+            event.update(self.extra)
+            return event
+
+    def flush(self, force=False):
+        """Emit an event if anything changed since the last one."""
+        with self._lock:
+            if not self._dirty and not force:
+                return
+            self._dirty = False
+            self._last_emit = time.monotonic()
+        emit(self.snapshot())
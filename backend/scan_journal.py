@@ -0,0 +1,98 @@
+import os
+import time
+import sqlite3
+import threading
+import db
+from hash_index import INDEX_FILENAME
+
+# Pending entries are written once this many piled up or this long passed,
+# whichever comes first, so a crash loses little even when few rows reach the DB
+FLUSH_ENTRIES = 500
+FLUSH_INTERVAL = 2.0  # seconds
+
+
+class ScanJournal:
+    """
+    Per-library record of source files that were already handled.
+
+    Keyed by source path and validated against (size, mtime_ns), so a re-run
+    (or a new scan after a stop/crash) skips finished sources with one stat and
+    a dict lookup instead of hashing and decoding them again. Stored in the
+    library index file, so it survives the per-run myphoto.db reset.
+    """
+
+    def __init__(self, dest_dir, read_only=False):
+        self.db_path = os.path.join(dest_dir, INDEX_FILENAME)
+        self.read_only = read_only  # --plan: read what exists, never create or write
+        self._lock = threading.Lock()
+        self._pending = []
+        self._done = {}
+        self._last_flush = time.monotonic()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS scan_journal (
+                source_path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime_ns INTEGER,
+                outcome TEXT,
+                dest_path TEXT,
+                finished_at REAL
+            )
+        ''')
+        return conn
+
+    def load(self):
+        if not self.read_only:
+            conn = self._connect()
+        elif os.path.exists(self.db_path):
+            conn = db.connect_readonly(self.db_path)
+        else:
+            return 0
+        try:
+            self._done = {path: (size, mtime_ns) for path, size, mtime_ns in
+                          conn.execute("SELECT source_path, size, mtime_ns FROM scan_journal")}
+        except sqlite3.OperationalError:
+            self._done = {}  # read-only index without a journal yet
+        finally:
+            conn.close()
+        return len(self._done)
+
+    def reset(self):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM scan_journal")
+            conn.commit()
+        finally:
+            conn.close()
+        self._done = {}
+
+    def is_done(self, path, st):
+        return self._done.get(path) == (st.st_size, st.st_mtime_ns)
+
+    def record(self, path, size, mtime_ns, outcome, dest_path=None):
+        with self._lock:
+            self._pending.append((path, size, mtime_ns, outcome, dest_path, time.time()))
+
+    def flush_due(self):
+        with self._lock:
+            if not self._pending or self.read_only:
+                return False
+            return (len(self._pending) >= FLUSH_ENTRIES
+                    or time.monotonic() - self._last_flush >= FLUSH_INTERVAL)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+        if not pending or self.read_only:
+            return
+        conn = self._connect()
+        try:
+            conn.executemany("INSERT OR REPLACE INTO scan_journal VALUES (?, ?, ?, ?, ?, ?)", pending)
+            conn.commit()
+        finally:
+            conn.close()
+        for path, size, mtime_ns, _, _, _ in pending:
+            self._done[path] = (size, mtime_ns)
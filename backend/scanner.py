@@ -3,24 +3,47 @@ import warnings
 warnings.filterwarnings("ignore", message=".*NotOpenSSLWarning.*")
 
 import os
-import shutil
-import sqlite3
 import datetime
-from PIL import Image
-from PIL.ExifTags import TAGS
 import json
 import sys
 import pillow_heif
-import hashlib
-import subprocess
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import functools
+import itertools
 import threading
-import queue
+from concurrent.futures import ThreadPoolExecutor
+from hash_index import HashIndex
+from dedup import DedupEngine, files_are_identical
+import hashing
+from metadata import extract_metadata
+from video_meta import extract_video_date
+import file_ops
+from walker import iter_source_files
+from scan_journal import ScanJournal
+from name_registry import NameRegistry
+from devices import DeviceLimiter
+from pipeline import Stage, Pipeline, PipelineGroup
+from manifest import ManifestWriter, read_manifest
+from phash import MultiIndexHash, DEFAULT_RADIUS, dhash_file, format_phash, parse_phash
+import db
+from progress import ProgressReporter, emit
 
 # Global state for duplicate tracking
-HASH_LOCK = threading.Lock()
-PROCESSED_HASHES = set()
+HASH_INDEX = None
+DEDUP = None
+NAMES = None
+DEVICES = DeviceLimiter()
+DEST_DEV = None
+
+# Perceptual near-duplicate handling: 'off', 'flag' (import + record near_dup_of)
+# or 'review' (import into Review/<date> instead of the date folder)
+NEAR_DUP_MODES = ('off', 'flag', 'review')
+NEAR_DUP_MODE = 'flag'
+NEAR_DUP_RADIUS = DEFAULT_RADIUS
+PHASH_INDEX = None
+
+# How files are placed into the library: 'copy', 'hardlink' or 'move' (see file_ops)
+ORGANIZE_MODE = 'copy'
 
 # Register HEIF opener
 pillow_heif.register_heif_opener()
@@ -28,26 +51,21 @@ pillow_heif.register_heif_opener()
 # Supported image extensions
 IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.heic', '.webp', '.gif', '.bmp'}
 
-def get_exif_date(file_path):
+def get_exif_date(file_path, meta=None):
     # User Request: Prioritize EXIF "Content Creation Date" over File System "Creation Date".
     
     # Priority 1: EXIF Data (Content Created)
-    try:
-        img = Image.open(file_path)
-        exif_data = img._getexif()
-        if exif_data:
-            # Create a dict for easier lookup
-            exif = {TAGS.get(k, k): v for k, v in exif_data.items()}
-            
-            if 'DateTimeOriginal' in exif:
-                return datetime.datetime.strptime(exif['DateTimeOriginal'], '%Y:%m:%d %H:%M:%S')
-            if 'DateTimeDigitized' in exif:
-                return datetime.datetime.strptime(exif['DateTimeDigitized'], '%Y:%m:%d %H:%M:%S')
-            if 'DateTime' in exif:
-                return datetime.datetime.strptime(exif['DateTime'], '%Y:%m:%d %H:%M:%S')
-    except Exception:
-        pass
+    if meta is None:
+        meta = extract_metadata(file_path)
+    if meta.date_taken:
+        return meta.date_taken
+    return get_file_date(file_path)
+
+def get_video_date(file_path):
+    # Recording date from the container header (mvhd / ©day / DateUTC / IDIT / ASF), else file times
+    return extract_video_date(file_path) or get_file_date(file_path)
 
+def get_file_date(file_path):
     # Priority 2: File System Creation Time (macOS 'Created')
     # Use this if EXIF is missing.
     try:
@@ -61,175 +79,226 @@ def get_exif_date(file_path):
     mtime = os.path.getmtime(file_path)
     return datetime.datetime.fromtimestamp(mtime)
 
-def calculate_file_hash(filepath):
-    """Calculate MD5 hash of a file."""
-    hasher = hashlib.md5()
-    try:
-        with open(filepath, 'rb') as f:
-            for chunk in iter(lambda: f.read(65536), b""):
-                hasher.update(chunk)
-        return hasher.hexdigest()
-    except:
-        return None
-
-def is_screenshot(file_path):
+# Covers: Screenshot..., Screen Shot..., 스크린샷..., 화면 캡처...
+SCREENSHOT_NAME_PATTERN = re.compile(r"screenshot|screen shot|스크린샷|화면 캡처|screencast")
+
+def is_screenshot(file_path, meta=None):
     """
     Determine if an image is a screenshot based on:
     1. Filename patterns
-    2. Missing Camera EXIF (Model, Make)
-    3. Software tags
+    2. Missing EXIF
+    3. Missing Camera EXIF (Model, Make)
+
+    A 'Software' tag alone (e.g. "iOS 17.0") is not a signal: real photos carry
+    it too, and they always have Make/Model.
     """
     filename = os.path.basename(file_path).lower()
     
     # 1. Filename Pattern Matching
-    # Covers: Screenshot..., Screen Shot..., 스크린샷..., 화면 캡처...
-    patterns = [
-        r"screenshot", 
-        r"screen shot", 
-        r"스크린샷", 
-        r"화면 캡처",
-        r"screencast"
-    ]
-    if any(re.search(p, filename) for p in patterns):
+    if SCREENSHOT_NAME_PATTERN.search(filename):
         return True
-        
-    try:
-        img = Image.open(file_path)
-        exif_data = img._getexif()
-        
-        # 2. No EXIF data -> Very likely a screenshot (or downloaded image)
-        if exif_data is None:
-            # We can tentatively say yes, but let's be careful. 
-            # Many screenshots have NO exif. Real photos usually have basic EXIF.
-            return True
-            
-        exif = {TAGS.get(k, k): v for k, v in exif_data.items()}
-        
-        # 3. Check specific EXIF indicators
-        # If 'Model' and 'Make' are missing, it's likely a screenshot
-        has_camera_info = 'Model' in exif or 'Make' in exif
-        
-        if not has_camera_info:
-            return True
-            
-        # 4. Check 'Software' tag
-        software = exif.get('Software', '').lower()
-        screenshot_indicators = ['screenshot', 'capture', 'ios', 'android', 'macos', 'windows']
-        if any(ind in software for ind in screenshot_indicators):
-            # But wait, 'iOS' is in real photos too (e.g. Software: iOS 17.0).
-            # Real photos have 'Make': 'Apple'.
-            # So if we have 'Software' but NO 'Model'/'Make' -> Screenshot.
-            # We strictly checked `not has_camera_info` above.
-            # If we HAVE camera info, it's a photo.
-            if has_camera_info:
-                return False
-                
-            return True
-            
-    except Exception:
-        pass
-        
-    return False
-def files_are_identical(p1, p2):
-    """Check if two files are identical by size and hash."""
-    try:
-        if os.path.getsize(p1) != os.path.getsize(p2):
-            return False
-        return calculate_file_hash(p1) == calculate_file_hash(p2)
-    except:
+
+    if meta is None:
+        meta = extract_metadata(file_path)
+
+    # 2. No EXIF data -> Very likely a screenshot (or downloaded image)
+    # has_exif is None when the format can't be read or carries no EXIF at all.
+    if meta.has_exif is None:
         return False
+    if not meta.has_exif:
+        return True
 
-def copy_preserving_metadata(src, dst):
-    """Copy file preserving all metadata including creation time (OS aware)."""
-    try:
-        if os.name == 'nt':
-            # Windows: shutil.copy2 generally preserves creation time on modern Python
-            shutil.copy2(src, dst)
+    # 3. If 'Model' and 'Make' are missing, it's likely a screenshot
+    return not (meta.make or meta.model)
+
+def copy_preserving_metadata(src, dst, mode=None):
+    """Place src at dst (copy / hardlink / move) in-process, preserving timestamps and permissions."""
+    return file_ops.transfer(src, dst, mode or ORGANIZE_MODE)
+
+class ScanJob:
+    """One source file moving through the scan pipeline."""
+    __slots__ = ('path', 'name', 'st', 'ext', 'dedup_entry', 'target_type', 'target_dir',
+                 'date_folder', 'row', 'status', 'planned', 'phash', 'near_dup_of')
+
+    def __init__(self, path, name, st=None):
+        self.path = path
+        self.name = name
+        self.st = st
+        self.ext = os.path.splitext(name)[1].lower()
+        self.dedup_entry = None
+        self.target_type = "unknown"
+        self.target_dir = ""
+        self.date_folder = "unknown"
+        self.row = None
+        self.status = None
+        self.planned = None  # manifest record when executing a plan
+        self.phash = None
+        self.near_dup_of = None  # DedupEntry (or path) of the closest earlier near-duplicate
+
+    @property
+    def st_dev(self):
+        return self.st.st_dev if self.st is not None else None
+
+
+def hash_stage(job):
+    """Stage 1 (disk-bound): duplicate detection (size -> partial hash -> full hash cascade)."""
+    with DEVICES.slot(job.st_dev):
+        is_duplicate, job.dedup_entry = DEDUP.check_and_add(job.path, job.st.st_size if job.st else None)
+    if is_duplicate:
+        job.status = {"status": "skipped", "file": job.name, "reason": "duplicate_content"}
+        return False
+    return True
+
+
+def metadata_stage(job, dest_dir, VIDEO_EXTS, IMAGE_EXTS):
+    """Stage 2 (GIL-bound header parsing): determine type & target dir."""
+    if job.ext in VIDEO_EXTS:
+        job.target_type = "video"
+        with DEVICES.slot(job.st_dev):
+            dt = get_video_date(job.path)
+        job.date_folder = dt.strftime('%Y-%m')
+        job.target_dir = os.path.join(dest_dir, "Videos", job.date_folder)
+    elif job.ext in IMAGE_EXTS:
+        # Single header read shared by screenshot detection and date extraction
+        # (plus a reduced decode for the perceptual hash when near-dup detection is on)
+        with DEVICES.slot(job.st_dev):
+            meta = extract_metadata(job.path, with_phash=PHASH_INDEX is not None)
+        dt = get_exif_date(job.path, meta)
+        job.date_folder = dt.strftime('%Y-%m')
+        if is_screenshot(job.path, meta):
+            job.target_type = "screenshot"
+            job.target_dir = os.path.join(dest_dir, "Screenshots", job.date_folder)
         else:
-            # macOS/Linux: Use cp -p to strictly preserve attributes including birthtime
-            subprocess.run(["cp", "-p", src, dst], check=True)
-    except Exception:
-        # Fallback to python copy2 if subprocess fails
+            job.target_type = "image"
+            job.target_dir = os.path.join(dest_dir, job.date_folder)
+            if meta.phash is not None and PHASH_INDEX is not None:
+                job.phash = meta.phash
+                match = PHASH_INDEX.add_or_match(meta.phash, job.dedup_entry)
+                if match is not None:
+                    job.near_dup_of = match[1]
+                    if NEAR_DUP_MODE == 'review':
+                        job.target_type = "near_duplicate"
+                        job.target_dir = os.path.join(dest_dir, "Review", job.date_folder)
+    else:
+        job.target_type = "document"
+        job.target_dir = os.path.join(dest_dir, "Documents")
+    return True
+
+
+def _near_dup_path(job):
+    return getattr(job.near_dup_of, 'path', job.near_dup_of)
+
+def _db_row(job, new_path, file_hash):
+    # processed=1 for duplicates, videos, documents, screenshots or near-dups under review to avoid AI processing
+    processed = 1 if job.target_type in ['video', 'document', 'screenshot', 'duplicate', 'near_duplicate',
+                                         'unknown'] else 0
+    return (job.path, new_path, job.name, job.target_type, processed,
+            job.date_folder if job.date_folder != "unknown" else None, file_hash,
+            format_phash(job.phash), _near_dup_path(job))
+
+
+def copy_stage(job, dry_run=False):
+    """
+    Stage 3 (disk-bound): claim a unique name and copy (or link / move) into the library.
+    With dry_run the name is only claimed, for --plan.
+    """
+    # Duplicate check against a same-named existing file + collision handling,
+    # resolved in memory by the per-run name registry
+    new_path = NAMES.claim(job.target_dir, job.name,
+                           is_duplicate=lambda existing: files_are_identical(job.path, existing))
+    if new_path is None:
+        job.status = {"status": "skipped", "file": job.name, "reason": "duplicate"}
+        return False
+
+    if not dry_run:
         try:
-            shutil.copy2(src, dst)
-        except Exception as e:
-            print(json.dumps({"status": "error", "message": f"Copy failed: {e}"}))
+            with DEVICES.slot(job.st_dev, DEST_DEV):
+                copy_preserving_metadata(job.path, new_path)
+        except BaseException:
+            NAMES.release(new_path)
+            raise
+        # In a plan the entry keeps pointing at the source, which is still readable
+        DEDUP.relocate(job.dedup_entry, new_path)
+        if job.phash is not None:
+            HASH_INDEX.record(new_path, phash=format_phash(job.phash))
+        # Dedup only hashes size collisions; files.hash is filled for every placed
+        # file from the fresh copy (usually still in the page cache). Recorded in the
+        # library index too, so later runs never hash it again.
+        DEDUP.ensure_full(job.dedup_entry)
 
-def process_single_file(file_info, dest_dir, VIDEO_EXTS, IMAGE_EXTS):
-    """Processes a single file and returns DB row data and status message."""
-    file_path, file = file_info
-    _, ext = os.path.splitext(file)
-    ext = ext.lower()
-    
-    try:
-        # 0. Calculate Hash for Duplicate Detection
-        file_hash = calculate_file_hash(file_path)
-        
-        is_duplicate = False
-        if file_hash:
-            with HASH_LOCK:
-                if file_hash in PROCESSED_HASHES:
-                    is_duplicate = True
-                else:
-                    PROCESSED_HASHES.add(file_hash)
-
-        # 1. Determine Type & Target Dir
-        target_type = "unknown"
-        target_dir = ""
-        date_folder = "unknown"
-        
-        if is_duplicate:
-            return None, {"status": "skipped", "file": file, "reason": "duplicate_content"}
-        elif ext in VIDEO_EXTS:
-            target_type = "video"
-            target_dir = os.path.join(dest_dir, "Videos")
-        elif ext in IMAGE_EXTS:
-            if is_screenshot(file_path):
-                target_type = "screenshot"
-                dt = get_exif_date(file_path)
-                date_folder = dt.strftime('%Y-%m')
-                target_dir = os.path.join(dest_dir, "Screenshots", date_folder)
-            else:
-                target_type = "image"
-                dt = get_exif_date(file_path)
-                date_folder = dt.strftime('%Y-%m')
-                target_dir = os.path.join(dest_dir, date_folder)
-        else:
-            target_type = "document"
-            target_dir = os.path.join(dest_dir, "Documents")
+    job.row = _db_row(job, new_path, job.dedup_entry.full)
+    job.status = {"status": "progress", "file": job.name, "type": job.target_type.capitalize()}
+    return True
 
-        os.makedirs(target_dir, exist_ok=True)
-        new_path = os.path.join(target_dir, file)
 
-        # 2. Duplicate Check
-        if os.path.exists(new_path) and files_are_identical(file_path, new_path):
-            return None, {"status": "skipped", "file": file, "reason": "duplicate"}
+def execute_stage(job, existing_dest_paths):
+    """Copy stage for --execute: place one manifest record at its planned target."""
+    rec = job.planned
+    target = rec["target"]
+    # Claim the planned name; a file already there with the same content means an
+    # earlier (interrupted) run placed it, and it is not copied again
+    new_path = NAMES.claim(os.path.dirname(target), os.path.basename(target), current_path=job.path,
+                           is_duplicate=lambda existing: files_are_identical(job.path, existing))
+    if new_path is None:
+        new_path = target
+        if target in existing_dest_paths:
+            job.status = {"status": "skipped", "file": job.name, "reason": "already_present"}
+            return True
+    elif new_path != job.path:
+        with DEVICES.slot(job.st_dev, DEST_DEV):
+            copy_preserving_metadata(job.path, new_path, rec["action"])
 
-        # 3. Collision Handling
-        base, extension = os.path.splitext(file)
-        counter = 1
-        while os.path.exists(new_path):
-            new_path = os.path.join(target_dir, f"{base}_{counter}{extension}")
-            counter += 1
+    # Plans only carry a hash when dedup needed one; fill it from the placed file
+    file_hash = rec.get("hash") or hashing.calculate_file_hash(new_path)
+    HASH_INDEX.record(new_path, file_hash, rec.get("partial"), rec.get("phash"))
+    job.row = _db_row(job, new_path, file_hash)
+    job.status = {"status": "progress", "file": job.name, "type": job.target_type.capitalize()}
+    return True
 
-        # 4. Copy
-        copy_preserving_metadata(file_path, new_path)
-        
-        # 5. Return DB record
-        # processed=1 for duplicates, videos, documents, or screenshots to avoid AI processing
-        processed = 1 if target_type in ['video', 'document', 'screenshot', 'duplicate', 'unknown'] else 0
-        return (file_path, new_path, file, target_type, processed, date_folder if date_folder != "unknown" else None, file_hash), \
-               {"status": "progress", "file": file, "type": target_type.capitalize()}
 
+def plan_record(job, action):
+    """Manifest line for a job that went through the pipeline with dry_run copying."""
+    entry = job.dedup_entry
+    record = {"source": job.path, "target": job.row[1] if job.row else None,
+              "type": job.target_type if job.row else None,
+              "date": job.date_folder if job.date_folder != "unknown" else None,
+              "hash": entry.full if entry else None, "partial": entry.partial if entry else None,
+              "phash": format_phash(job.phash), "near_dup_of": _near_dup_path(job),
+              "size": job.st.st_size, "mtime_ns": job.st.st_mtime_ns,
+              "action": action if job.row else "skip"}
+    if not job.row:
+        record["reason"] = job.status.get("reason")
+    return record
+
+
+def fail_job(job, error):
+    job.row = None
+    job.status = {"status": "error", "message": f"Failed {job.name}: {str(error)}"}
+
+
+def process_single_file(file_info, dest_dir, VIDEO_EXTS, IMAGE_EXTS):
+    """Processes a single file through all stages in order and returns DB row data and status message."""
+    file_path, file = file_info
+    job = ScanJob(file_path, file)
+    try:
+        job.st = os.stat(file_path)
+        for stage in (hash_stage, functools.partial(metadata_stage, dest_dir=dest_dir, VIDEO_EXTS=VIDEO_EXTS,
+                                                    IMAGE_EXTS=IMAGE_EXTS), copy_stage):
+            if not stage(job):
+                break
     except Exception as e:
-        return None, {"status": "error", "message": f"Failed {file}: {str(e)}"}
+        fail_job(job, e)
+    return job.row, job.status
 
 # Control Flags
 PAUSE_EVENT = threading.Event()
 PAUSE_EVENT.set() # Set = Running, Cleared = Paused
 STOP_EVENT = threading.Event()
 
-def scan_and_organize(source_dir, dest_dir, db_path):
+IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.heic', '.webp', '.bmp', '.tiff'}
+VIDEO_EXTS = {'.mp4', '.mov', '.avi', '.mkv', '.wmv', '.flv', '.webm', '.m4v'}
+
+def start_command_listener():
     # Command listener for pause/stop
     def command_listener():
         while True:
@@ -240,12 +309,10 @@ def scan_and_organize(source_dir, dest_dir, db_path):
                 action = cmd.get('action')
                 if action == 'pause':
                     PAUSE_EVENT.clear()
-                    print(json.dumps({"status": "paused"}))
-                    sys.stdout.flush()
+                    emit({"status": "paused"})
                 elif action == 'resume':
                     PAUSE_EVENT.set()
-                    print(json.dumps({"status": "resumed"}))
-                    sys.stdout.flush()
+                    emit({"status": "resumed"})
                 elif action == 'stop':
                     STOP_EVENT.set()
                     PAUSE_EVENT.set()
@@ -256,108 +323,396 @@ def scan_and_organize(source_dir, dest_dir, db_path):
     listener_thread = threading.Thread(target=command_listener, daemon=True)
     listener_thread.start()
 
-    IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.heic', '.webp', '.bmp', '.tiff'}
-    VIDEO_EXTS = {'.mp4', '.mov', '.avi', '.mkv', '.wmv', '.flv', '.webm', '.m4v'}
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS files (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            source_path TEXT,
-            dest_path TEXT,
-            filename TEXT,
-            type TEXT,
-            processed INTEGER DEFAULT 0,
-            cluster_id INTEGER DEFAULT -1,
-            exif_date TEXT,
-            hash TEXT
-        )
-    ''')
-    conn.commit()
-
-    # Reset and pre-populate hash tracking from destination
-    print(json.dumps({"status": "progress", "file": "기존 파일 중복 검사 중...", "type": "System"}))
-    with HASH_LOCK:
-        PROCESSED_HASHES.clear()
-        # Pre-scan destination tree for existing files to avoid re-organizing
-        if os.path.exists(dest_dir):
-            for root, _, files in os.walk(dest_dir):
-                for f in files:
-                    if f.lower().endswith(tuple(IMAGE_EXTS | VIDEO_EXTS)):
-                        h = calculate_file_hash(os.path.join(root, f))
-                        if h: PROCESSED_HASHES.add(h)
-
-    file_list = []
-    if os.path.isfile(source_dir):
-        with open(source_dir, 'r', encoding='utf-8') as f:
-            paths = json.load(f)
-            file_list = [(p, os.path.basename(p)) for p in paths if os.path.exists(p)]
+def build_phash_index(dest_dir, library_images):
+    """
+    Hamming index of the library's perceptual hashes (screenshots and the review
+    folder excluded), from the library index only. Returns (index, missing):
+    images without a stored hash yet (first run with near-dup detection), to be
+    hashed by backfill_phashes().
+    """
+    excluded = tuple(os.path.join(dest_dir, d) + os.sep for d in ("Screenshots", "Review"))
+    index = MultiIndexHash(NEAR_DUP_RADIUS)
+    missing = []
+    for entry in library_images:
+        if entry.path.startswith(excluded):
+            continue
+        value = parse_phash(HASH_INDEX.phashes.get(entry.path))
+        if value is None:
+            missing.append(entry)
+        else:
+            index.add(value, entry)
+    return index, missing
+
+def backfill_phashes(index, missing, stop_event=None):
+    """
+    Hash library images that have no perceptual hash yet into the index and
+    record them, so later runs start with a complete index. With stop_event
+    (background mode) it hashes one file at a time under the library device's
+    reader limit, honours pause, and stops once the event is set; whatever is
+    left is picked up by the next run.
+    """
+    def hash_entry(entry):
+        with DEVICES.slot(DEST_DEV):
+            return dhash_file(entry.path)
+
+    def add(entry, value):
+        if value is not None:
+            index.add(value, entry)
+            HASH_INDEX.record(entry.path, phash=format_phash(value))
+
+    if stop_event is None:
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+            for entry, value in zip(missing, executor.map(hash_entry, missing)):
+                add(entry, value)
     else:
-        for root, _, files in os.walk(source_dir):
-            for file in files:
-                if not file.startswith('.'):
-                    file_list.append((os.path.join(root, file), file))
-    
-    total_files = len(file_list)
-    print(json.dumps({"status": "started", "total": total_files}))
-    sys.stdout.flush()
-    
-    # Use ThreadPool for I/O and non-GIL-blocked tasks
+        for entry in missing:
+            while not PAUSE_EVENT.wait(0.5) and not stop_event.is_set():
+                pass
+            if stop_event.is_set():
+                break
+            add(entry, hash_entry(entry))
+    HASH_INDEX.flush()
+
+def collect_results(pipeline, reporter, journal, counts, discovery_finished,
+                    db_writer=None, db_batch_size=db.DEFAULT_BATCH_SIZE, on_result=None):
+    """
+    Drain finished jobs: journal + batched DB inserts (or `on_result` in plan
+    mode, where nothing is recorded), aggregated progress events.
+    Returns the number of new images that need AI processing.
+    """
     results_to_insert = []
     new_images_count = 0
-    max_workers = min(32, (os.cpu_count() or 1) * 4) 
-    
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_file = {executor.submit(process_single_file, f, dest_dir, VIDEO_EXTS, IMAGE_EXTS): f for f in file_list}
-        
-        for future in as_completed(future_to_file):
-            if STOP_EVENT.is_set():
-                break
-            
-            while not PAUSE_EVENT.is_set() and not STOP_EVENT.is_set():
-                import time
-                time.sleep(0.5)
 
-            db_data, status_msg = future.result()
+    for job in pipeline.results():
+        db_data, status_msg = job.row, job.status
+        counts["processed"] += 1
+        if on_result is not None:
+            on_result(job)
+        elif status_msg.get("status") in ("progress", "skipped"):
+            journal.record(job.path, job.st.st_size, job.st.st_mtime_ns, status_msg.get("type") or status_msg.get("reason"),
+                           db_data[1] if db_data else None)
             if db_data:
                 results_to_insert.append(db_data)
-                # db_data[3] is target_type. Only 'image' needs AI processing.
-                if db_data[3] == 'image':
-                    new_images_count += 1
-            
-            # Print status and periodically commit
-            print(json.dumps(status_msg))
-            sys.stdout.flush()
-            
-            if len(results_to_insert) >= 100:
-                cursor.executemany('''
-                    INSERT INTO files (source_path, dest_path, filename, type, processed, exif_date, hash)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', results_to_insert)
-                conn.commit()
+        # db_data[3] is target_type. Only 'image' needs AI processing.
+        if db_data and db_data[3] == 'image':
+            new_images_count += 1
+        if db_data and db_data[8]:
+            counts["near_duplicates"] = counts.get("near_duplicates", 0) + 1
+        
+        # Aggregate status (batched events, with per-stage occupancy) and periodically commit
+        discovery_done = discovery_finished.is_set()
+        if discovery_done and reporter.total is None:
+            reporter.set_total(counts["discovered"] - counts["already_done"])
+        reporter.set(discovered=counts["discovered"], already_done=counts["already_done"],
+                     discovery_done=discovery_done, stages=pipeline.occupancy())
+        status = status_msg.get("status")
+        if status == "progress":
+            reporter.update(status_msg["type"], status_msg["file"], detail=status_msg)
+        elif status == "skipped":
+            reporter.update("Skipped", status_msg["file"], detail=status_msg)
+        else:
+            reporter.update("Error", message=status_msg.get("message"), detail=status_msg)
+        
+        # The journal has its own cadence: skipped and duplicate sources add no DB rows,
+        # so waiting for a full DB batch could leave thousands of them unrecorded
+        db_due = db_writer is not None and len(results_to_insert) >= db_batch_size
+        if db_due or journal.flush_due():
+            if db_writer is not None:
+                db_writer.insert_files(results_to_insert)
                 results_to_insert = []
+                # Journal is written after the DB rows so a crash never marks an unrecorded file as done
+                db_writer.flush()
+            HASH_INDEX.flush()
+            journal.flush()
+
+    if db_writer is not None:
+        db_writer.insert_files(results_to_insert)
+        db_writer.close()
+    HASH_INDEX.flush()
+    journal.flush()
+    reporter.flush()
+    return new_images_count
+
+def existing_ancestor(path):
+    """path itself, or its nearest existing parent (a planned library may not exist yet)."""
+    path = os.path.abspath(path)
+    while not os.path.exists(path) and os.path.dirname(path) != path:
+        path = os.path.dirname(path)
+    return path
+
+def scan_and_organize(source_dir, dest_dir, db_path, rescan=False, db_batch_size=db.DEFAULT_BATCH_SIZE, verbose=False,
+                      hash_workers=None, meta_workers=None, copy_workers=None, device_limits=None, plan_path=None):
+    """
+    Organize source_dir into dest_dir. With plan_path nothing is copied or
+    recorded: every decision is written to a manifest for execute_manifest().
+    """
+    global HASH_INDEX, DEDUP, NAMES, DEVICES, DEST_DEV, PHASH_INDEX
+
+    start_command_listener()
+
+    # All writes go through one writer thread (WAL, batched transactions)
+    db_writer = None
+    if not plan_path:
+        db.ensure_schema(db_path)
+        db_writer = db.DBWriter(db_path, batch_size=db_batch_size)
+
+    # Reset and pre-populate duplicate tracking from the persistent destination index.
+    # Existing files are registered by size only; they are hashed on demand when
+    # a same-sized source file shows up.
+    emit({"status": "progress", "file": "기존 파일 중복 검사 중...", "type": "System"})
+    # A plan reads the library and its index but never creates or writes anything there
+    HASH_INDEX = HashIndex(dest_dir, read_only=bool(plan_path))
+    DEDUP = DedupEngine(hashing.calculate_file_hash, on_hashed=HASH_INDEX.record_entry)
+    library_images = []
+    for path, size, partial, full in HASH_INDEX.refresh(IMAGE_EXTS | VIDEO_EXTS):
+        entry = DEDUP.add_known(path, size, partial, full)
+        if os.path.splitext(path)[1].lower() in IMAGE_EXTS:
+            library_images.append(entry)
+    NAMES = NameRegistry(dry_run=bool(plan_path))
+    PHASH_INDEX, missing_phashes = (build_phash_index(dest_dir, library_images) if NEAR_DUP_MODE != 'off'
+                                    else (None, []))
+
+    # Sources finished by an earlier (possibly interrupted) run are skipped after a stat
+    journal = ScanJournal(dest_dir, read_only=bool(plan_path))
+    if not rescan:
+        journal.load()
+    elif not plan_path:
+        journal.reset()
 
-    if results_to_insert:
-        cursor.executemany('''
-            INSERT INTO files (source_path, dest_path, filename, type, processed, exif_date, hash)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', results_to_insert)
-        conn.commit()
+    # Staged pipeline: hashing and copying are disk-bound, header parsing is
+    # GIL-bound, so each stage gets its own pool and bounded input queue.
+    # Per-device limits keep a spinning source disk at 1-2 concurrent readers.
+    DEVICES = DeviceLimiter(device_limits)
+    DEST_DEV = os.stat(existing_ancestor(dest_dir)).st_dev
 
+    # Library images without a perceptual hash (first run with near-dup detection)
+    backfill = None
+    backfill_stop = threading.Event()
+    if missing_phashes:
+        emit({"status": "progress", "file": f"유사 사진 색인 생성 중... ({len(missing_phashes)})", "type": "System"})
+        if NEAR_DUP_MODE == 'review':
+            # Review diverts imports into Review/, so the whole library must be comparable first
+            backfill_phashes(PHASH_INDEX, missing_phashes)
+        else:
+            # 'flag' only annotates rows: start importing now and hash the library alongside.
+            # Imports matched before their library twin is hashed go unflagged this run.
+            backfill = threading.Thread(target=backfill_phashes, args=(PHASH_INDEX, missing_phashes, backfill_stop),
+                                        daemon=True)
+            backfill.start()
+
+    cpu = os.cpu_count() or 1
+    pipeline = Pipeline([
+        Stage("hash", hash_stage, hash_workers or min(16, cpu * 2)),
+        Stage("metadata", functools.partial(metadata_stage, dest_dir=dest_dir, VIDEO_EXTS=VIDEO_EXTS,
+                                            IMAGE_EXTS=IMAGE_EXTS), meta_workers or min(4, cpu)),
+        Stage("copy", functools.partial(copy_stage, dry_run=bool(plan_path)), copy_workers or min(16, cpu * 2)),
+    ], on_error=fail_job, pause_event=PAUSE_EVENT, stop_event=STOP_EVENT)
+    pipeline.start()
+
+    # Stream the source tree: a discovery thread feeds the first stage's bounded
+    # queue, so work starts on the first file and memory stays flat regardless of tree size.
+    counts = {"discovered": 0, "processed": 0, "already_done": 0}
+    discovery_finished = threading.Event()
+
+    def discover():
+        try:
+            for path, name in iter_source_files(source_dir):
+                if STOP_EVENT.is_set():
+                    break
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                counts["discovered"] += 1
+                if journal.is_done(path, st):
+                    counts["already_done"] += 1
+                    continue
+                pipeline.put(ScanJob(path, name, st))
+        except Exception as e:
+            emit({"status": "error", "message": f"Scan failed: {e}"})
+        finally:
+            discovery_finished.set()
+            pipeline.close()
+
+    threading.Thread(target=discover, daemon=True).start()
+
+    # Total is unknown up front; progress events carry discovered/processed counts instead.
+    emit({"status": "started", "total": None})
+    reporter = ProgressReporter("progress", "type", verbose=verbose)
+
+    manifest = None
+    on_result = None
+    if plan_path:
+        manifest = ManifestWriter(plan_path, source=os.path.abspath(source_dir), dest=os.path.abspath(dest_dir),
+                                  mode=ORGANIZE_MODE, hash_algo=hashing.get_algorithm())
+
+        def on_result(job):
+            if job.status.get("status") in ("progress", "skipped"):
+                manifest.write(plan_record(job, ORGANIZE_MODE))
+
+    new_images_count = collect_results(pipeline, reporter, journal, counts, discovery_finished,
+                                       db_writer=db_writer, db_batch_size=db_batch_size, on_result=on_result)
+    if backfill is not None:
+        backfill_stop.set()
+        backfill.join()
+
+    completed = {"status": "completed", "new_images": new_images_count,
+                 "discovered": counts["discovered"], "processed": counts["processed"],
+                 "already_done": counts["already_done"], "counts": reporter.counts, "dedup": DEDUP.stats,
+                 "near_duplicates": counts.get("near_duplicates", 0), "devices": DEVICES.describe()}
+    if manifest is not None:
+        manifest.close()
+        # A plan only previews: nothing new reaches the DB for the classifier yet
+        completed.update(new_images=0, planned_images=new_images_count, plan=plan_path, planned=manifest.count)
+    emit(completed)
+
+def execute_manifest(manifest_path, dest_dir, db_path, db_batch_size=db.DEFAULT_BATCH_SIZE, verbose=False,
+                     copy_workers=None, device_limits=None, organize_mode=None):
+    """
+    Apply a manifest written by --plan. Records are copied in source-location
+    order (device, then inode, which tracks on-disk allocation on common
+    filesystems) by one copier per source device; a spinning disk's copier is
+    a single thread, so it reads front to back without interleaving. Progress
+    goes to the scan journal, so an interrupted run resumes where it stopped.
+    """
+    global HASH_INDEX, NAMES, DEVICES, DEST_DEV
+
+    start_command_listener()
+
+    header, records = read_manifest(manifest_path)
+    if os.path.abspath(header.get("dest", "")) != os.path.abspath(dest_dir):
+        emit({"status": "error", "message": f"Manifest was planned for {header.get('dest')}, not {dest_dir}"})
+        return
+
+    # A plan never creates the library, so it may not exist yet
+    os.makedirs(dest_dir, exist_ok=True)
+    db.ensure_schema(db_path)
+    db_writer = db.DBWriter(db_path, batch_size=db_batch_size)
+    conn = db.connect_readonly(db_path)
+    existing_dest_paths = {row[0] for row in conn.execute("SELECT dest_path FROM files")}
     conn.close()
-    print(json.dumps({"status": "completed", "new_images": new_images_count}))
+
+    HASH_INDEX = HashIndex(dest_dir)
+    NAMES = NameRegistry()
+    DEVICES = DeviceLimiter(device_limits)
+    DEST_DEV = os.stat(dest_dir).st_dev
+    journal = ScanJournal(dest_dir)
+    journal.load()
+
+    reporter = ProgressReporter("progress", "type", verbose=verbose)
+    counts = {"discovered": 0, "processed": 0, "already_done": 0}
+    jobs = []
+    for rec in records:
+        if rec.get("action") not in file_ops.ORGANIZE_MODES:
+            continue
+        counts["discovered"] += 1
+        if organize_mode:
+            rec["action"] = organize_mode
+        job = ScanJob(rec["source"], os.path.basename(rec["source"]))
+        job.target_type = rec["type"]
+        job.date_folder = rec["date"] or "unknown"
+        job.phash = parse_phash(rec.get("phash"))
+        job.near_dup_of = rec.get("near_dup_of")
+        job.planned = rec
+        try:
+            job.st = os.stat(job.path)
+        except OSError:
+            # A move that finished right before an interruption leaves only the target
+            if rec["action"] == "move" and os.path.exists(rec["target"]):
+                counts["already_done"] += 1
+            else:
+                reporter.update("Error", message=f"Missing source: {job.path}")
+            continue
+        if journal.is_done(job.path, job.st):
+            counts["already_done"] += 1
+            continue
+        if (job.st.st_size, job.st.st_mtime_ns) != (rec["size"], rec["mtime_ns"]):
+            reporter.update("Error", message=f"Changed since plan: {job.path}")
+            continue
+        jobs.append(job)
+    jobs.sort(key=lambda j: (j.st.st_dev, j.st.st_ino))
+
+    # One copier pipeline per source device. A spinning disk gets a single worker,
+    # so its files are read strictly in inode order; SSDs keep a parallel pool.
+    copy_func = functools.partial(execute_stage, existing_dest_paths=existing_dest_paths)
+    pool_size = copy_workers or min(16, (os.cpu_count() or 1) * 2)
+    feeds = []
+    for st_dev, dev_jobs in itertools.groupby(jobs, key=lambda j: j.st.st_dev):
+        workers = 1 if DEVICES.kind(st_dev) == 'hdd' else pool_size
+        feeds.append((Pipeline([Stage(f"copy:{st_dev}", copy_func, workers)], on_error=fail_job,
+                               pause_event=PAUSE_EVENT, stop_event=STOP_EVENT), list(dev_jobs)))
+    pipeline = PipelineGroup([p for p, _ in feeds])
+    pipeline.start()
+
+    def feed(device_pipeline, device_jobs):
+        for job in device_jobs:
+            if STOP_EVENT.is_set():
+                break
+            device_pipeline.put(job)
+        device_pipeline.close()
+
+    discovery_finished = threading.Event()
+    discovery_finished.set()
+    for device_pipeline, device_jobs in feeds:
+        threading.Thread(target=feed, args=(device_pipeline, device_jobs), daemon=True).start()
+
+    emit({"status": "started", "total": len(jobs)})
+    reporter.set_total(len(jobs))
+    new_images_count = collect_results(pipeline, reporter, journal, counts, discovery_finished,
+                                       db_writer=db_writer, db_batch_size=db_batch_size)
+
+    emit({"status": "completed", "new_images": new_images_count,
+          "discovered": counts["discovered"], "processed": counts["processed"],
+          "already_done": counts["already_done"], "counts": reporter.counts,
+          "near_duplicates": counts.get("near_duplicates", 0), "devices": DEVICES.describe()})
 
 if __name__ == "__main__":
-    if len(sys.argv) < 4:
-        print(json.dumps({"status": "error", "message": "Missing arguments"}))
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('source', nargs='?', help='Source directory or JSON file list')
+    parser.add_argument('dest', nargs='?', help='Destination directory')
+    parser.add_argument('db', nargs='?', help='Database file path')
+    parser.add_argument('--hash-algo', type=str, default=None,
+                        help=f"Content hash algorithm ({', '.join(sorted(hashing.ALGORITHMS))})")
+    parser.add_argument('--hash-chunk-kb', type=int, default=None, help='Read size for hashing in KB')
+    parser.add_argument('--organize-mode', choices=file_ops.ORGANIZE_MODES, default=None,
+                        help="'hardlink' and 'move' avoid copying bytes for same-volume imports (default: copy, "
+                             "or the planned action with --execute)")
+    parser.add_argument('--db-batch-size', type=int, default=db.DEFAULT_BATCH_SIZE, help='Rows per DB transaction')
+    parser.add_argument('--verbose', action='store_true', help='Also emit a detail event for every file')
+    parser.add_argument('--hash-workers', type=int, default=None, help='Threads for the hashing / dedup stage')
+    parser.add_argument('--meta-workers', type=int, default=None, help='Threads for the metadata stage')
+    parser.add_argument('--copy-workers', type=int, default=None, help='Threads for the copy stage')
+    parser.add_argument('--hdd-readers', type=int, default=None, help='Concurrent I/O per rotational disk')
+    parser.add_argument('--ssd-readers', type=int, default=None, help='Concurrent I/O per SSD')
+    parser.add_argument('--near-dup', choices=NEAR_DUP_MODES, default=NEAR_DUP_MODE,
+                        help="Perceptual near-duplicates: 'flag' records them, 'review' imports them into Review/")
+    parser.add_argument('--near-dup-radius', type=int, default=DEFAULT_RADIUS,
+                        help='Max differing dHash bits (of 64) for a near-duplicate')
+    parser.add_argument('--plan', metavar='MANIFEST', default=None,
+                        help='Dry run: write the organize decisions to a JSONL manifest without touching files')
+    parser.add_argument('--execute', action='store_true',
+                        help='Apply a --plan manifest (given in place of the source) in source-location order')
+    parser.add_argument('--rescan', action='store_true', help='Ignore the scan journal and re-examine every source file')
+    args, unknown = parser.parse_known_args()
+
+    if not (args.source and args.dest and (args.db or args.plan)):
+        emit({"status": "error", "message": "Missing arguments"})
         sys.exit(1)
     
-    source = sys.argv[1]
-    dest = sys.argv[2]
-    db = sys.argv[3]
-    
     try:
-        scan_and_organize(source, dest, db)
+        hashing.configure(args.hash_algo, args.hash_chunk_kb * 1024 if args.hash_chunk_kb else None)
+        ORGANIZE_MODE = args.organize_mode or 'copy'
+        NEAR_DUP_MODE = args.near_dup
+        NEAR_DUP_RADIUS = args.near_dup_radius
+        device_limits = {kind: n for kind, n in (('hdd', args.hdd_readers), ('ssd', args.ssd_readers)) if n}
+        if args.execute:
+            execute_manifest(args.source, args.dest, args.db, db_batch_size=args.db_batch_size, verbose=args.verbose,
+                             copy_workers=args.copy_workers, device_limits=device_limits,
+                             organize_mode=args.organize_mode)
+        else:
+            scan_and_organize(args.source, args.dest, args.db, rescan=args.rescan, db_batch_size=args.db_batch_size,
+                              verbose=args.verbose, hash_workers=args.hash_workers, meta_workers=args.meta_workers,
+                              copy_workers=args.copy_workers, device_limits=device_limits, plan_path=args.plan)
     except Exception as e:
-        print(json.dumps({"status": "error", "message": str(e)}))
+        emit({"status": "error", "message": str(e)})
@@ -0,0 +1,364 @@
+import os
+import struct
+import datetime
+
+# Creation dates straight from container headers. Only the few header bytes
+# needed are read with positioned reads (os.pread); media data such as an MP4
+# 'mdat' or AVI 'movi' is skipped by its size, never read, so the cost does
+# not depend on clip length.
+
+MP4_EPOCH = datetime.datetime(1904, 1, 1, tzinfo=datetime.timezone.utc)
+MKV_EPOCH = datetime.datetime(2001, 1, 1, tzinfo=datetime.timezone.utc)
+FILETIME_EPOCH = datetime.datetime(1601, 1, 1, tzinfo=datetime.timezone.utc)
+
+# Header-only parsing must stay bounded even on corrupt files
+MAX_BOXES = 4096
+
+APPLE_CREATION_DATE_KEY = b'com.apple.quicktime.creationdate'
+
+ASF_HEADER_GUID = bytes.fromhex('3026b2758e66cf11a6d900aa0062ce6c')
+ASF_FILE_PROPERTIES_GUID = bytes.fromhex('a1dcab8c47a9cf118ee400c00c205365')
+
+AVI_DATE_FORMATS = ('%a %b %d %H:%M:%S %Y', '%Y:%m:%d %H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y/%m/%d %H:%M:%S',
+                    '%Y-%m-%d', '%Y/%m/%d')
+
+
+class _Reader:
+    def __init__(self, f):
+        self.f = f
+        self.fd = f.fileno()
+        self.size = os.fstat(self.fd).st_size
+
+    def read_at(self, offset, n):
+        if offset < 0 or offset >= self.size:
+            return b''
+        if hasattr(os, 'pread'):
+            return os.pread(self.fd, n, offset)
+        self.f.seek(offset)
+        return self.f.read(n)
+
+
+def _local(dt_utc):
+    """Aware UTC -> naive local time, the same convention as EXIF dates."""
+    return dt_utc.astimezone().replace(tzinfo=None)
+
+
+def _plausible(dt):
+    # Unset fields come out as the epoch (1904 / 1970 / 2001) or garbage
+    return dt if dt is not None and 1971 <= dt.year <= 2100 else None
+
+
+# --- MP4 / MOV / M4V (ISO base media) ---
+
+def _iter_boxes(r, start, end):
+    pos = start
+    count = 0
+    while pos + 8 <= end and count < MAX_BOXES:
+        header = r.read_at(pos, 16)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack('>I4s', header[:8])
+        header_len = 8
+        if size == 1:
+            if len(header) < 16:
+                return
+            size = struct.unpack('>Q', header[8:16])[0]
+            header_len = 16
+        elif size == 0:
+            size = end - pos
+        if size < header_len:
+            return
+        yield box_type, pos + header_len, min(pos + size, end)
+        pos += size
+        count += 1
+
+
+def _find_box(r, start, end, box_type):
+    for t, body, box_end in _iter_boxes(r, start, end):
+        if t == box_type:
+            return body, box_end
+    return None
+
+
+def _parse_iso_date(text):
+    """
+    ISO 8601 date as written by the camera. An explicit offset marks the
+    camera's wall-clock time, which is kept as-is (like EXIF dates); 'Z'
+    means UTC and is converted to local time.
+    """
+    text = text.strip('\x00 ')
+    utc = text.endswith('Z')
+    if utc:
+        text = text[:-1]
+    for candidate in (text, text[:19]):
+        try:
+            dt = datetime.datetime.fromisoformat(candidate)
+        except ValueError:
+            continue
+        if utc:
+            return _local(dt.replace(tzinfo=datetime.timezone.utc))
+        return dt.replace(tzinfo=None)
+    return None
+
+
+def _meta_children(r, body):
+    """
+    Start of a 'meta' box's children. MP4 (ISO) meta is a full box with 4
+    bytes of version/flags first; QuickTime meta is not.
+    """
+    head = r.read_at(body, 12)
+    return body if head[4:8] in (b'hdlr', b'keys', b'ilst') else body + 4
+
+
+def _ilst_text(r, ilst, item_type):
+    item = _find_box(r, ilst[0], ilst[1], item_type)
+    if item:
+        data = _find_box(r, item[0], item[1], b'data')
+        if data:
+            # data box: 4 bytes type + 4 bytes locale, then the text
+            payload = r.read_at(data[0] + 8, min(data[1] - data[0] - 8, 256))
+            return payload.decode('utf-8', 'ignore')
+    return None
+
+
+def _apple_creation_date(r, moov_start, moov_end):
+    """com.apple.quicktime.creationdate from moov/meta/keys + ilst (iPhone and most Apple devices)."""
+    meta = _find_box(r, moov_start, moov_end, b'meta')
+    if not meta:
+        return None
+    start = _meta_children(r, meta[0])
+    keys = _find_box(r, start, meta[1], b'keys')
+    ilst = _find_box(r, start, meta[1], b'ilst')
+    if not keys or not ilst:
+        return None
+    # keys: version/flags, entry count, then (size, namespace, name) entries
+    pos = keys[0] + 8
+    index = 1
+    while pos + 8 <= keys[1]:
+        entry = r.read_at(pos, 8)
+        key_size = struct.unpack('>I', entry[:4])[0]
+        if key_size < 8:
+            return None
+        if r.read_at(pos + 8, key_size - 8) == APPLE_CREATION_DATE_KEY:
+            text = _ilst_text(r, ilst, struct.pack('>I', index))
+            return _parse_iso_date(text) if text else None
+        pos += key_size
+        index += 1
+    return None
+
+
+def _mp4_day(r, udta_start, udta_end):
+    """©day from moov/udta, either QuickTime style or iTunes style (udta/meta/ilst/©day/data)."""
+    found = _find_box(r, udta_start, udta_end, b'\xa9day')
+    if found:
+        body, end = found
+        payload = r.read_at(body, min(end - body, 256))
+        if len(payload) >= 4:
+            length = struct.unpack('>H', payload[:2])[0]
+            return _parse_iso_date(payload[4:4 + length].decode('utf-8', 'ignore'))
+
+    meta = _find_box(r, udta_start, udta_end, b'meta')
+    if meta:
+        ilst = _find_box(r, _meta_children(r, meta[0]), meta[1], b'ilst')
+        if ilst:
+            text = _ilst_text(r, ilst, b'\xa9day')
+            return _parse_iso_date(text) if text else None
+    return None
+
+
+def _mp4_date(r):
+    moov = _find_box(r, 0, r.size, b'moov')
+    if not moov:
+        return None
+    # The Apple creation date and ©day carry the camera's local time (with zone);
+    # both are preferred over mvhd's UTC creation time
+    dt = _plausible(_apple_creation_date(r, moov[0], moov[1]))
+    if dt:
+        return dt
+    udta = _find_box(r, moov[0], moov[1], b'udta')
+    if udta:
+        dt = _plausible(_mp4_day(r, udta[0], udta[1]))
+        if dt:
+            return dt
+    mvhd = _find_box(r, moov[0], moov[1], b'mvhd')
+    if mvhd:
+        payload = r.read_at(mvhd[0], 12)
+        if len(payload) >= 8:
+            if payload[0] == 1 and len(payload) >= 12:
+                seconds = struct.unpack('>Q', payload[4:12])[0]
+            else:
+                seconds = struct.unpack('>I', payload[4:8])[0]
+            if seconds:
+                try:
+                    return _plausible(_local(MP4_EPOCH + datetime.timedelta(seconds=seconds)))
+                except OverflowError:
+                    return None
+    return None
+
+
+# --- MKV / WebM (EBML) ---
+
+EBML_SEGMENT = 0x18538067
+EBML_INFO = 0x1549A966
+EBML_CLUSTER = 0x1F43B675
+EBML_DATE_UTC = 0x4461
+
+
+def _ebml_vint(r, pos, keep_marker):
+    first = r.read_at(pos, 1)
+    if not first:
+        return None, 0
+    b = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not b & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        return None, 0
+    data = r.read_at(pos, length)
+    if len(data) < length:
+        return None, 0
+    value = b if keep_marker else b & (mask - 1)
+    for byte in data[1:]:
+        value = (value << 8) | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        value = -1  # unknown size
+    return value, length
+
+
+def _iter_ebml(r, start, end):
+    pos = start
+    count = 0
+    while pos < end and count < MAX_BOXES:
+        element_id, id_len = _ebml_vint(r, pos, keep_marker=True)
+        if element_id is None:
+            return
+        size, size_len = _ebml_vint(r, pos + id_len, keep_marker=False)
+        if size is None:
+            return
+        body = pos + id_len + size_len
+        body_end = end if size < 0 else min(body + size, end)
+        yield element_id, body, body_end
+        if size < 0:
+            return
+        pos = body_end
+        count += 1
+
+
+def _mkv_date(r):
+    for element_id, body, end in _iter_ebml(r, 0, r.size):
+        if element_id != EBML_SEGMENT:
+            continue
+        for child_id, child_body, child_end in _iter_ebml(r, body, end):
+            if child_id == EBML_CLUSTER:
+                return None  # media data starts; Info always precedes it in practice
+            if child_id != EBML_INFO:
+                continue
+            for info_id, info_body, info_end in _iter_ebml(r, child_body, child_end):
+                if info_id == EBML_DATE_UTC and info_end - info_body == 8:
+                    ns = struct.unpack('>q', r.read_at(info_body, 8))[0]
+                    return _plausible(_local(MKV_EPOCH + datetime.timedelta(microseconds=ns // 1000)))
+            return None
+    return None
+
+
+# --- AVI (RIFF) ---
+
+def _parse_avi_date(raw):
+    text = raw.decode('latin-1', 'ignore').strip('\x00 \r\n')
+    for fmt in AVI_DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    # Some cameras pad or title-case differently; retry normalized
+    try:
+        return datetime.datetime.strptime(' '.join(text.split()).title(), AVI_DATE_FORMATS[0])
+    except ValueError:
+        return None
+
+
+def _iter_riff(r, start, end):
+    pos = start
+    count = 0
+    while pos + 8 <= end and count < MAX_BOXES:
+        header = r.read_at(pos, 12)
+        if len(header) < 8:
+            return
+        chunk_id, size = struct.unpack('<4sI', header[:8])
+        list_type = header[8:12] if chunk_id in (b'LIST', b'RIFF') else None
+        yield chunk_id, list_type, pos + 8, min(pos + 8 + size, end)
+        pos += 8 + size + (size & 1)  # chunks are word aligned
+        count += 1
+
+
+def _avi_date(r):
+    riff = r.read_at(0, 12)
+    if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'AVI ':
+        return None
+    found = {}
+    for chunk_id, list_type, body, end in _iter_riff(r, 12, r.size):
+        if chunk_id != b'LIST' or list_type not in (b'hdrl', b'INFO'):
+            continue  # skips 'movi' without reading it
+        for sub_id, _, sub_body, sub_end in _iter_riff(r, body + 4, end):
+            if sub_id in (b'IDIT', b'ICRD') and sub_end - sub_body <= 256:
+                found.setdefault(sub_id, r.read_at(sub_body, sub_end - sub_body))
+    # IDIT is the capture time; ICRD is often only a date
+    for key in (b'IDIT', b'ICRD'):
+        if key in found:
+            dt = _plausible(_parse_avi_date(found[key]))
+            if dt:
+                return dt
+    return None
+
+
+# --- WMV / ASF ---
+
+def _asf_date(r):
+    header = r.read_at(0, 30)
+    if len(header) < 30 or header[:16] != ASF_HEADER_GUID:
+        return None
+    header_size = struct.unpack('<Q', header[16:24])[0]
+    pos = 30
+    end = min(header_size, r.size)
+    count = 0
+    while pos + 24 <= end and count < MAX_BOXES:
+        obj = r.read_at(pos, 24)
+        guid, size = obj[:16], struct.unpack('<Q', obj[16:24])[0]
+        if guid == ASF_FILE_PROPERTIES_GUID:
+            # File ID (16) + File Size (8), then Creation Date as FILETIME
+            payload = r.read_at(pos + 24 + 24, 8)
+            if len(payload) == 8:
+                ticks = struct.unpack('<Q', payload)[0]
+                if ticks:
+                    return _plausible(_local(FILETIME_EPOCH + datetime.timedelta(microseconds=ticks // 10)))
+            return None
+        if size < 24:
+            return None
+        pos += size
+        count += 1
+    return None
+
+
+_PARSERS = {
+    '.mp4': _mp4_date, '.mov': _mp4_date, '.m4v': _mp4_date,
+    '.mkv': _mkv_date, '.webm': _mkv_date,
+    '.avi': _avi_date,
+    '.wmv': _asf_date,
+}
+
+
+def extract_video_date(file_path):
+    """
+    Recording date from the container header as a naive local datetime,
+    or None (unsupported container such as FLV, missing or unset field).
+    """
+    parser = _PARSERS.get(os.path.splitext(file_path)[1].lower())
+    if parser is None:
+        return None
+    try:
+        with open(file_path, 'rb', buffering=0) as f:
+            return parser(_Reader(f))
+    except (OSError, struct.error, ValueError, OverflowError):
+        return None
@@ -0,0 +1,49 @@
+import os
+import json
+
+
+def iter_entries(root, skip_hidden_files=True):
+    """
+    Stream regular files under root as os.DirEntry objects, depth-first.
+
+    Unlike os.walk this never materializes a directory's file list, and the
+    DirEntry carries the type (and on Windows the stat) from the directory read,
+    so callers can start working on the first file immediately.
+    """
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                subdirs = []
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file():
+                            if skip_hidden_files and entry.name.startswith('.'):
+                                continue
+                            yield entry
+                    except OSError:
+                        continue
+                # Reverse so subdirectories are visited in listing order
+                stack.extend(reversed(subdirs))
+        except OSError:
+            continue
+
+
+def iter_source_files(source):
+    """
+    Yield (path, filename) for every file to import. `source` is either a
+    directory or a JSON file containing a list of paths (multi-file selection).
+    """
+    if os.path.isfile(source):
+        with open(source, 'r', encoding='utf-8') as f:
+            paths = json.load(f)
+        for p in paths:
+            if os.path.exists(p):
+                yield p, os.path.basename(p)
+        return
+
+    for entry in iter_entries(source):
+        yield entry.path, entry.name
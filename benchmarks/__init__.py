@@ -0,0 +1,6 @@
+"""
+Benchmarks. The bench_*.py scripts measure one component each and run
+standalone; corpus.py and suite.py form the end-to-end suite:
+
+    python -m benchmarks.suite --output report.json
+"""
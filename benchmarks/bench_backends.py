@@ -0,0 +1,136 @@
+"""
+MobileNet backend comparison: the TF SavedModel (reference) versus the
+converted TFLite / ONNX models from convert_model.py, on the same images.
+
+Each backend runs in its own interpreter, so load time (imports + model
+init) and peak RSS are not polluted by the others. Reported per backend:
+load seconds, images/sec at the classifier's batch size, peak RSS, and
+agreement with the tf reference (top-1 match rate, mean top-5 overlap).
+
+    python -m benchmarks.bench_backends [--corpus DIR] [--images 200]
+        [--model tflite=backend/models/mobilenet_v3_int8.tflite --model onnx=...] [--json]
+
+Without --corpus a synthetic corpus (benchmarks.corpus) is used; a folder
+of real photos gives the meaningful accuracy numbers.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPO_ROOT, 'backend'))
+import numpy as np
+from batcher import DEFAULT_BATCH_SIZE
+from inference import BACKENDS, DEFAULT_MODELS
+from benchmarks.rss import peak_rss_mb
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.heic')
+TOP_K = 5
+
+
+def list_images(root, limit):
+    paths = []
+    for dirpath, dirs, files in os.walk(root):
+        dirs.sort()
+        paths.extend(os.path.join(dirpath, f) for f in sorted(files) if f.lower().endswith(IMAGE_EXTS))
+    return paths[:limit]
+
+
+def run_one(backend, model_path, paths, batch_size):
+    """Child process: load one backend, classify every image, report timings + top-k."""
+    from decode import decode_rgb, model_frame
+    frames = np.stack([model_frame(decode_rgb(p)) for p in paths])
+
+    t0 = time.perf_counter()
+    from inference import load_model
+    model, model_path, version = load_model(backend, model_path)
+    model(frames[:batch_size])  # first call builds kernels / allocates tensors
+    load_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    probs = np.concatenate([model(frames[i:i + batch_size]) for i in range(0, len(frames), batch_size)])
+    elapsed = time.perf_counter() - t0
+    top = np.argsort(-probs, axis=1, kind='stable')[:, :TOP_K]
+    return {"backend": backend, "model": model_path, "version": version, "load_s": round(load_s, 2),
+            "images_per_sec": round(len(frames) / elapsed, 1), "peak_rss_mb": peak_rss_mb(),
+            "top": top.tolist()}
+
+
+def spawn(backend, model_path, list_path, batch_size):
+    cmd = [sys.executable, '-m', 'benchmarks.bench_backends', '--run-one', backend, '--paths', list_path,
+           '--batch-size', str(batch_size)]
+    if model_path:
+        cmd += ['--model', f'{backend}={model_path}']
+    proc = subprocess.run(cmd, cwd=REPO_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ['failed']
+        return {"backend": backend, "skipped": tail[0]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--corpus', help='Folder of photos (default: synthetic corpus)')
+    parser.add_argument('--images', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--model', action='append', default=[], metavar='BACKEND=PATH',
+                        help='Model for a backend (default: the backend default under backend/models)')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable JSON only')
+    parser.add_argument('--run-one', choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument('--paths', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    models = dict(m.split('=', 1) for m in args.model)
+
+    if args.run_one:
+        with open(args.paths, encoding='utf-8') as f:
+            paths = json.load(f)
+        print(json.dumps(run_one(args.run_one, models.get(args.run_one), paths, args.batch_size)))
+        return
+
+    work = tempfile.mkdtemp(prefix='bench_backends_')
+    try:
+        if args.corpus:
+            paths = list_images(args.corpus, args.images)
+        else:
+            from benchmarks.corpus import build_corpus
+            build_corpus(os.path.join(work, 'corpus'), args.images)
+            paths = list_images(os.path.join(work, 'corpus'), args.images)
+        list_path = os.path.join(work, 'paths.json')
+        with open(list_path, 'w', encoding='utf-8') as f:
+            json.dump(paths, f)
+
+        results = [spawn(b, models.get(b) or DEFAULT_MODELS[b], list_path, args.batch_size)
+                   for b in args.backends]
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    reference = next((r["top"] for r in results if r["backend"] == 'tf' and "top" in r), None)
+    for r in results:
+        top = r.pop("top", None)
+        if reference is None or top is None:
+            continue
+        r["top1_agreement"] = round(float(np.mean([a[0] == b[0] for a, b in zip(top, reference)])), 3)
+        r["top5_overlap"] = round(float(np.mean([len(set(a) & set(b)) / TOP_K for a, b in zip(top, reference)])), 3)
+
+    if args.json:
+        print(json.dumps({"images": len(paths), "batch_size": args.batch_size, "results": results}))
+        return
+    print(f"{len(paths)} images, batch {args.batch_size}")
+    for r in results:
+        if "skipped" in r:
+            print(f"  {r['backend']:<7} skipped: {r['skipped']}")
+            continue
+        accuracy = (f"top-1 agree {r['top1_agreement']:.1%}, top-5 overlap {r['top5_overlap']:.1%}"
+                    if "top1_agreement" in r else "no tf reference")
+        print(f"  {r['backend']:<7} load {r['load_s']:>6.2f} s  {r['images_per_sec']:>8.1f} images/s  "
+              f"RSS {r['peak_rss_mb']} MB  {accuracy}  ({os.path.basename(r['model'])})")
+
+
+if __name__ == "__main__":
+    main()
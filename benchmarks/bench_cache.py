@@ -0,0 +1,76 @@
+"""
+Classification cache benchmark: what a cache hit costs (content hash +
+SQLite lookup) against the decode + resize work it skips before inference
+even starts, plus raw get/put throughput of a cache with many entries.
+
+    python -m benchmarks.bench_cache [--images 100] [--entries 100000] [--json]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPO_ROOT, 'backend'))
+import hashing
+from decode import decode_rgb, model_frame
+from classify_cache import ClassificationCache, ClassifyResult
+from benchmarks.corpus import build_corpus
+from benchmarks.bench_backends import list_images
+
+
+def per_image_ms(fn, paths):
+    t0 = time.perf_counter()
+    for p in paths:
+        fn(p)
+    return round((time.perf_counter() - t0) / len(paths) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images', type=int, default=100)
+    parser.add_argument('--entries', type=int, default=100000, help='Cache rows before timing lookups')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable JSON only')
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix='bench_cache_')
+    try:
+        build_corpus(os.path.join(work, 'corpus'), args.images)
+        paths = list_images(os.path.join(work, 'corpus'), args.images)
+        result = ClassifyResult('People', 1, 0.91, list(range(25)))
+
+        cache = ClassificationCache('bench', os.path.join(work, 'cache'), max_entries=args.entries)
+        t0 = time.perf_counter()
+        for i in range(args.entries):
+            cache.put(f'sha256:{i:064x}', result)
+        put_us = (time.perf_counter() - t0) / args.entries * 1e6
+        hashes = {p: hashing.calculate_file_hash(p) for p in paths}
+        for h in hashes.values():
+            cache.put(h, result)
+
+        report = {
+            "images": len(paths), "entries": args.entries, "put_us": round(put_us, 1),
+            "hash_ms": per_image_ms(hashing.calculate_file_hash, paths),
+            "hit_ms": per_image_ms(lambda p: cache.get(hashes[p]), paths),
+            "decode_ms": per_image_ms(lambda p: model_frame(decode_rgb(p)), paths),
+        }
+        cache.close()
+        report["hit_rate"] = cache.report()["hit_rate"]
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report))
+        return
+    print(f"{report['images']} images, cache of {report['entries']} entries")
+    print(f"  put:                    {report['put_us']:>8.1f} us/entry")
+    print(f"  content hash:           {report['hash_ms']:>8.3f} ms/image")
+    print(f"  cache hit (lookup):     {report['hit_ms']:>8.3f} ms/image")
+    print(f"  decode + resize (miss): {report['decode_ms']:>8.3f} ms/image, before any model runs")
+
+
+if __name__ == "__main__":
+    main()
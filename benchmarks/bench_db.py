@@ -0,0 +1,112 @@
+"""
+DB layer benchmark.
+
+1. 100k-row insert: the old pattern (plain connection, rollback journal,
+   commit every 100 rows) versus DBWriter (WAL, single writer thread, batched
+   transactions) at a few batch sizes.
+2. The classifier's pending-image query and the People count, with and
+   without the indexes from db.INDEXES.
+
+    python benchmarks/bench_db.py [--rows 100000] [--dir /path/on/real/disk] [--json]
+
+Use --dir on the disk that holds the library: on tmpfs commits cost nothing
+and the per-100 commit pattern looks much cheaper than it is.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import tempfile
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+import db
+
+TYPES = ['image', 'video', 'document', 'screenshot', 'People', 'Food']
+
+
+def make_rows(n):
+    rows = []
+    for i in range(n):
+        t = TYPES[i % len(TYPES)]
+        rows.append((f'/src/{i // 1000}/IMG_{i}.jpg', f'/dest/2023-{1 + i % 12:02d}/IMG_{i}.jpg', f'IMG_{i}.jpg',
+                     t, 0 if t == 'image' and i % 3 else 1, f'2023-{1 + i % 12:02d}', f'sha256:{i:064x}',
+                     f'{i:016x}', None))
+    return rows
+
+
+def legacy_insert(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute(db.SCHEMA)
+    conn.commit()
+    for i in range(0, len(rows), 100):
+        conn.executemany(db.INSERT_FILE_SQL, rows[i:i + 100])
+        conn.commit()
+    conn.close()
+
+
+def writer_insert(path, rows, batch_size):
+    db.ensure_schema(path)
+    writer = db.DBWriter(path, batch_size=batch_size)
+    # Producers hand over small chunks, like the scanner's per-100-file results
+    for i in range(0, len(rows), 100):
+        writer.insert_files(rows[i:i + 100])
+    writer.close()
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def query_times(path, repeat=20):
+    conn = db.connect_readonly(path)
+    pending = "SELECT id, dest_path, filename, exif_date FROM files WHERE type='image' AND processed=0"
+    people = "SELECT COUNT(*) FROM files WHERE type GLOB 'People*'"
+    out = {}
+    for name, sql in (("pending_images", pending), ("people_count", people)):
+        best = min(timed(lambda: conn.execute(sql).fetchall()) for _ in range(repeat))
+        out[name + "_ms"] = round(best * 1000, 2)
+    conn.close()
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[100, 500, 2000])
+    parser.add_argument('--dir', type=str, default=None, help='Where to create the benchmark databases')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    root = tempfile.mkdtemp(prefix='myphoto_bench_db_', dir=args.dir)
+    report = {"rows": args.rows, "insert_s": {}, "query": {}}
+    try:
+        legacy_path = os.path.join(root, 'legacy.db')
+        report["insert_s"]["legacy_commit_per_100"] = round(timed(lambda: legacy_insert(legacy_path, rows)), 3)
+        report["query"]["no_indexes"] = query_times(legacy_path)
+
+        for bs in args.batch_sizes:
+            path = os.path.join(root, f'writer_{bs}.db')
+            report["insert_s"][f"writer_batch_{bs}"] = round(timed(lambda: writer_insert(path, rows, bs)), 3)
+        report["query"]["indexed"] = query_times(path)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report))
+        return
+    print(f"Inserting {args.rows} rows")
+    for name, secs in report["insert_s"].items():
+        print(f"  {name:<24} {secs:>8.3f}s  ({args.rows / secs:,.0f} rows/s)")
+    print("Queries (best of 20)")
+    for name, q in report["query"].items():
+        print(f"  {name:<12} pending images {q['pending_images_ms']:>8.2f}ms   people count {q['people_count_ms']:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
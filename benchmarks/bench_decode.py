@@ -0,0 +1,90 @@
+"""
+Classifier decode benchmark: full-size decode (the old cv2.imdecode
+IMREAD_COLOR path) versus decode.decode_rgb (JPEG DCT scaling, HEIC
+embedded thumbnail when one meets DECODE_MIN_SIDE). Reports per-file time, the decoded frame's size (what one
+classifier worker holds while it runs the models) and how far the 224x224 model input
+drifts from the one built from the full-size frame (mean absolute error,
+0-255 scale).
+
+cv2 cannot decode HEIC at all, so the HEIC "before" is a full pillow_heif
+decode.
+
+    python -m benchmarks.bench_decode [--images 10] [--size 4032 3024] [--json]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPO_ROOT, 'backend'))
+import cv2
+import numpy as np
+import decode
+from benchmarks.corpus import write_photos
+
+
+def full_decode(path):
+    if path.endswith('.heic'):
+        import pillow_heif
+        heif = pillow_heif.open_heif(path)
+        return np.asarray(heif[heif.primary_index])
+    img = cv2.imdecode(np.fromfile(path, np.uint8), cv2.IMREAD_COLOR)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+def model_input(rgb):
+    return cv2.resize(rgb, (224, 224), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+
+def measure(fn, paths):
+    t0 = time.perf_counter()
+    for p in paths:
+        fn(p)
+    ms = (time.perf_counter() - t0) / len(paths) * 1000
+    frame = fn(paths[0])
+    return ms, frame.nbytes / 1024 ** 2, frame.shape
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images', type=int, default=10)
+    parser.add_argument('--size', type=int, nargs=2, default=[4032, 3024])
+    parser.add_argument('--json', action='store_true', help='Print machine-readable JSON only')
+    args = parser.parse_args()
+
+    kinds = ['jpg']
+    if decode.pillow_heif is not None:
+        kinds.append('heic')
+
+    root = tempfile.mkdtemp(prefix='bench_decode_')
+    results = {}
+    try:
+        for kind in kinds:
+            paths = write_photos(root, args.images, tuple(args.size), f'.{kind}')
+            before_ms, before_mb, before_shape = measure(full_decode, paths)
+            after_ms, after_mb, after_shape = measure(decode.decode_rgb, paths)
+            drift = np.mean([np.abs(model_input(full_decode(p)) - model_input(decode.decode_rgb(p))).mean()
+                             for p in paths])
+            results[kind] = {"before_ms": round(before_ms, 2), "after_ms": round(after_ms, 2),
+                             "speedup": round(before_ms / after_ms, 1),
+                             "before_frame_mb": round(before_mb, 1), "after_frame_mb": round(after_mb, 1),
+                             "before_shape": before_shape, "after_shape": after_shape,
+                             "model_input_mae": round(float(drift), 2)}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps({"size": args.size, "results": results}))
+        return
+    for kind, r in results.items():
+        print(f"{kind:<4} full {r['before_ms']:>7.1f} ms {r['before_frame_mb']:>6.1f} MB {r['before_shape']}   "
+              f"reduced {r['after_ms']:>6.1f} ms {r['after_frame_mb']:>5.1f} MB {r['after_shape']}   "
+              f"x{r['speedup']}, 224px input MAE {r['model_input_mae']}")
+
+
+if __name__ == "__main__":
+    main()
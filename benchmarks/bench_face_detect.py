@@ -0,0 +1,82 @@
+"""
+Face detection benchmark: per-image latency of the old path, which built a
+MediaPipe FaceDetection graph (long-range, then short-range when nothing
+was found) inside every call, versus FaceDetectorPool's long-lived pair.
+
+The frames contain no faces, so both paths run both models - the most
+common case for a photo library (landscapes, food, screenshots) and the
+one where the old path paid for two graph constructions.
+
+    python benchmarks/bench_face_detect.py [--images 50] [--size 1024 768] [--json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+import numpy as np
+
+
+def per_image_construct(mp, img_rgb):
+    for model in (1, 0):
+        with mp.solutions.face_detection.FaceDetection(model_selection=model,
+                                                       min_detection_confidence=0.5) as detector:
+            results = detector.process(img_rgb)
+            if results.detections:
+                return len(results.detections)
+    return 0
+
+
+def ms_per_image(fn, frames):
+    fn(frames[0])  # warm-up: first call loads the TFLite runtime
+    t0 = time.perf_counter()
+    for frame in frames:
+        fn(frame)
+    return (time.perf_counter() - t0) / len(frames) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images', type=int, default=50)
+    parser.add_argument('--size', type=int, nargs=2, default=[1024, 768])
+    parser.add_argument('--json', action='store_true', help='Print machine-readable JSON only')
+    args = parser.parse_args()
+
+    try:
+        import mediapipe as mp
+        from face_detector import FaceDetectorPool
+    except ImportError as e:
+        print(json.dumps({"skipped": f"mediapipe unavailable: {e!r}"}))
+        return
+
+    rng = np.random.default_rng(0)
+    w, h = args.size
+    # Smooth noise: structured enough to exercise the detector, no faces
+    base = rng.integers(0, 256, (h // 16, w // 16, 3), dtype=np.uint8)
+    frames = [np.ascontiguousarray(np.roll(base, i, axis=1).repeat(16, 0).repeat(16, 1)) for i in range(args.images)]
+
+    pool = FaceDetectorPool(1)
+    t0 = time.perf_counter()
+    FaceDetectorPool(1).close()
+    construct_ms = (time.perf_counter() - t0) * 1000
+    try:
+        old_ms = ms_per_image(lambda f: per_image_construct(mp, f), frames)
+        pooled_ms = ms_per_image(pool.detect, frames)
+    finally:
+        pool.close()
+
+    report = {"images": args.images, "size": args.size, "pair_construct_ms": round(construct_ms, 2),
+              "per_image_construct_ms": round(old_ms, 2), "pooled_ms": round(pooled_ms, 2),
+              "saved_ms": round(old_ms - pooled_ms, 2)}
+    if args.json:
+        print(json.dumps(report))
+        return
+    print(f"{w}x{h}, no faces: construct per image {report['per_image_construct_ms']} ms, "
+          f"pooled {report['pooled_ms']} ms (saves {report['saved_ms']} ms/image; "
+          f"building a detector pair costs {report['pair_construct_ms']} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Content hash micro-benchmark.
+
+Reports GB/s for every hash algorithm available on this machine, both on an
+in-memory buffer (pure CPU) and through calculate_file_hash on a temp file
+(page-cache reads + hashing), for a few read sizes.
+
+    python benchmarks/bench_hashing.py [--size-mb 256] [--json]
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+import hashing
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=int, default=256)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--chunk-kb', type=int, nargs='+', default=[64, 1024, 4096])
+    parser.add_argument('--json', action='store_true', help='Print machine-readable JSON only')
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    gb = size / (1024 ** 3)
+    data = os.urandom(size)
+
+    fd, path = tempfile.mkstemp(suffix='.bin')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+
+    results = []
+    try:
+        for algo in sorted(hashing.ALGORITHMS):
+            def in_memory():
+                h = hashing.new_hasher(algo)
+                h.update(data)
+                h.hexdigest()
+
+            row = {"algorithm": algo, "memory_gbps": round(gb / best_of(in_memory, args.repeat), 3), "file_gbps": {}}
+            for kb in args.chunk_kb:
+                t = best_of(lambda: hashing.calculate_file_hash(path, algo, kb * 1024), args.repeat)
+                row["file_gbps"][f"{kb}KB"] = round(gb / t, 3)
+            results.append(row)
+    finally:
+        os.remove(path)
+
+    report = {"size_mb": args.size_mb, "default": hashing.get_algorithm(), "results": results}
+    if args.json:
+        print(json.dumps(report))
+        return
+
+    print(f"Hashing {args.size_mb} MB (default algorithm: {report['default']})")
+    header = f"{'algorithm':<10} {'memory':>11}" + ''.join(f" {f'file@{kb}KB':>12}" for kb in args.chunk_kb)
+    print(header)
+    for row in results:
+        line = f"{row['algorithm']:<10} {row['memory_gbps']:>7.2f}GB/s" + ''.join(
+            f" {row['file_gbps'][f'{kb}KB']:>10.2f}GB/s" for kb in args.chunk_kb)
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+MobileNet inference benchmark: images/sec through InferenceBatcher for a
+range of batch sizes, with as many submitting threads as the batch size
+(what run_classification does). Batch size 1 is the old batch-of-one path.
+
+Needs TensorFlow + tensorflow_hub and backend/models/mobilenet_v3.
+
+    python benchmarks/bench_inference.py [--frames 256] [--batch-sizes 1 8 16 32 64] [--json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+import numpy as np
+from batcher import InferenceBatcher, DEFAULT_MAX_WAIT
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'models', 'mobilenet_v3')
+
+
+def load_model():
+    import tensorflow as tf
+    import tensorflow_hub as hub
+    model = hub.load(MODEL_PATH)
+
+    def run(frames):
+        return tf.nn.softmax(model(tf.constant(frames))).numpy()
+    return run
+
+
+def images_per_sec(model_fn, frames, batch_size, max_wait):
+    batcher = InferenceBatcher(model_fn, batch_size, max_wait)
+    try:
+        batcher.infer(frames[0])  # warm-up: graph tracing for this batch shape is not inference
+        with ThreadPoolExecutor(max_workers=batch_size) as pool:
+            t0 = time.perf_counter()
+            list(pool.map(batcher.infer, frames))
+            elapsed = time.perf_counter() - t0
+        return len(frames) / elapsed, dict(batcher.stats)
+    finally:
+        batcher.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=256)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 16, 32, 64])
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT * 1000)
+    parser.add_argument('--json', action='store_true', help='Print machine-readable JSON only')
+    args = parser.parse_args()
+
+    try:
+        model_fn = load_model()
+    except Exception as e:
+        print(json.dumps({"skipped": f"model unavailable: {e!r}"}))
+        return
+
+    rng = np.random.default_rng(0)
+    frames = list(rng.random((args.frames, 224, 224, 3), dtype=np.float32))
+    results = []
+    for batch_size in args.batch_sizes:
+        ips, stats = images_per_sec(model_fn, frames, batch_size, args.max_wait_ms / 1000)
+        results.append({"batch_size": batch_size, "images_per_sec": round(ips, 1),
+                        "mean_batch": round(stats["frames"] / stats["batches"], 1)})
+
+    if args.json:
+        print(json.dumps({"frames": args.frames, "results": results}))
+        return
+    base = results[0]["images_per_sec"]
+    for row in results:
+        print(f"batch {row['batch_size']:>3}: {row['images_per_sec']:>8.1f} images/s "
+              f"(mean batch {row['mean_batch']}, x{row['images_per_sec'] / base:.2f})")
+
+
+if __name__ == "__main__":
+    main()
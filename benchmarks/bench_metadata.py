@@ -0,0 +1,144 @@
+"""
+Metadata extraction benchmark: files/sec for the old double-open path
+(is_screenshot + get_exif_date, each doing Image.open + _getexif + a full
+TAGS dict) versus the single-open extract_metadata() record.
+
+Note: HEIC images have no _getexif(), so the legacy HEIC numbers measure a
+path that silently fell back to file timestamps; the new path actually reads
+the HEIC EXIF.
+
+For HEIC, "pillow" is the single-open path through pillow_heif (libheif
+parses the container), and "after" is the ISOBMFF fast path in heif_meta
+that reads only the meta box and the EXIF item. Per-file latency is
+reported alongside files/sec.
+
+    python benchmarks/bench_metadata.py [--count 300] [--json]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import datetime
+import tempfile
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from PIL import Image
+from PIL.ExifTags import TAGS
+import metadata
+
+
+def legacy_get_exif_date(file_path):
+    try:
+        img = Image.open(file_path)
+        exif_data = img._getexif()
+        if exif_data:
+            exif = {TAGS.get(k, k): v for k, v in exif_data.items()}
+            for key in ('DateTimeOriginal', 'DateTimeDigitized', 'DateTime'):
+                if key in exif:
+                    return datetime.datetime.strptime(exif[key], '%Y:%m:%d %H:%M:%S')
+    except Exception:
+        pass
+    return datetime.datetime.fromtimestamp(os.path.getmtime(file_path))
+
+
+def legacy_is_screenshot(file_path):
+    try:
+        img = Image.open(file_path)
+        exif_data = img._getexif()
+        if exif_data is None:
+            return True
+        exif = {TAGS.get(k, k): v for k, v in exif_data.items()}
+        return not ('Model' in exif or 'Make' in exif)
+    except Exception:
+        return False
+
+
+def legacy(path):
+    legacy_is_screenshot(path)
+    legacy_get_exif_date(path)
+
+
+def single_open(path):
+    meta = metadata.extract_metadata(path)
+    _ = (meta.has_exif, meta.make or meta.model, meta.date_taken)
+
+
+def pillow_single_open(path):
+    with Image.open(path) as img:
+        meta = metadata.metadata_from_exif(img.getexif(), *img.size)
+    _ = (meta.has_exif, meta.make or meta.model, meta.date_taken)
+
+
+def make_exif(i):
+    exif = Image.Exif()
+    exif[metadata.TAG_MAKE] = 'Apple'
+    exif[metadata.TAG_MODEL] = f'iPhone {12 + i % 4}'
+    exif[metadata.TAG_SOFTWARE] = '17.0'
+    exif[metadata.TAG_DATETIME] = f'2023:{1 + i % 12:02d}:01 12:00:00'
+    exif.get_ifd(metadata.IFD_EXIF)[metadata.TAG_DATETIME_ORIGINAL] = f'2023:{1 + i % 12:02d}:01 12:00:00'
+    return exif
+
+
+def build_corpus(root, count, size):
+    corpus = {"jpeg": []}
+    if metadata.pillow_heif is not None:
+        corpus["heic"] = []
+    for i in range(count):
+        img = Image.new('RGB', size, ((i * 7) % 255, (i * 13) % 255, (i * 29) % 255))
+        for kind, paths in corpus.items():
+            path = os.path.join(root, f'img_{i}.{kind}')
+            img.save(path, exif=make_exif(i).tobytes(), quality=85)
+            paths.append(path)
+    return corpus
+
+
+def files_per_sec(fn, paths, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for p in paths:
+            fn(p)
+        best = min(best, time.perf_counter() - t0)
+    return len(paths) / best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=300)
+    parser.add_argument('--width', type=int, default=4032)
+    parser.add_argument('--height', type=int, default=3024)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='myphoto_bench_meta_')
+    try:
+        corpus = build_corpus(root, args.count, (args.width, args.height))
+        results = {}
+        for kind, paths in corpus.items():
+            before = files_per_sec(legacy, paths, args.repeat)
+            after = files_per_sec(single_open, paths, args.repeat)
+            results[kind] = {"before_fps": round(before, 1), "after_fps": round(after, 1),
+                             "speedup": round(after / before, 2), "after_ms": round(1000 / after, 3)}
+            if kind == "heic":
+                pillow = files_per_sec(pillow_single_open, paths, args.repeat)
+                results[kind].update(pillow_fps=round(pillow, 1), pillow_ms=round(1000 / pillow, 3),
+                                     fast_path_speedup=round(after / pillow, 2))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps({"count": args.count, "results": results}))
+        return
+    for kind, r in results.items():
+        print(f"{kind:<5} before {r['before_fps']:>9.1f} files/s   after {r['after_fps']:>9.1f} files/s   x{r['speedup']}"
+              f"   ({r['after_ms']} ms/file)")
+        if 'pillow_fps' in r:
+            print(f"      pillow path {r['pillow_fps']:>9.1f} files/s ({r['pillow_ms']} ms/file)   "
+                  f"fast path x{r['fast_path_speedup']}")
+
+
+if __name__ == "__main__":
+    main()
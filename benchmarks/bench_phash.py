@@ -0,0 +1,97 @@
+"""
+Perceptual hash benchmark.
+
+1. dHash cost per image: draft (reduced JPEG decode, what the scanner does)
+   versus a full decode + resize.
+2. Near-duplicate lookups at library scale: MultiIndexHash radius queries
+   versus a linear scan over every stored hash. Random hashes are the worst
+   case for the index (real photo hashes cluster less evenly).
+
+    python -m benchmarks.bench_phash [--library 500000] [--queries 1000] [--json]
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import argparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPO_ROOT, 'backend'))
+from PIL import Image
+import phash
+from benchmarks.corpus import write_photos
+
+
+def full_decode_thumbnail(path):
+    with Image.open(path) as img:
+        px = img.convert('L').resize((phash.HASH_SIZE + 1, phash.HASH_SIZE), Image.Resampling.BILINEAR).tobytes()
+    return px
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images', type=int, default=20)
+    parser.add_argument('--image-size', type=int, nargs=2, default=[4032, 3024])
+    parser.add_argument('--library', type=int, default=500000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--radius', type=int, default=phash.DEFAULT_RADIUS)
+    parser.add_argument('--json', action='store_true', help='Print machine-readable JSON only')
+    args = parser.parse_args()
+
+    report = {}
+
+    root = tempfile.mkdtemp(prefix='bench_phash_')
+    try:
+        paths = write_photos(root, args.images, tuple(args.image_size))
+        t0 = time.perf_counter()
+        for p in paths:
+            phash.dhash_file(p)
+        draft_ms = (time.perf_counter() - t0) / len(paths) * 1000
+        t0 = time.perf_counter()
+        for p in paths:
+            full_decode_thumbnail(p)
+        full_ms = (time.perf_counter() - t0) / len(paths) * 1000
+        report["dhash_ms"] = {"draft": round(draft_ms, 2), "full_decode": round(full_ms, 2)}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    rng = random.Random(0)
+    values = [rng.getrandbits(64) for _ in range(args.library)]
+    index = phash.MultiIndexHash(args.radius)
+    t0 = time.perf_counter()
+    for i, v in enumerate(values):
+        index.add(v, i)
+    build_s = time.perf_counter() - t0
+
+    # Queries are near (2 flipped bits) to stored hashes, like re-exported copies
+    queries = [values[rng.randrange(len(values))] ^ 0b101 for _ in range(args.queries)]
+    t0 = time.perf_counter()
+    for q in queries:
+        index.search(q)
+    index_ms = (time.perf_counter() - t0) / len(queries) * 1000
+
+    linear_queries = queries[:max(1, args.queries // 50)]
+    t0 = time.perf_counter()
+    for q in linear_queries:
+        [i for i, v in enumerate(values) if phash.hamming(q, v) <= args.radius]
+    linear_ms = (time.perf_counter() - t0) / len(linear_queries) * 1000
+
+    report["search"] = {"library": args.library, "radius": args.radius, "build_s": round(build_s, 2),
+                        "index_query_ms": round(index_ms, 3), "linear_query_ms": round(linear_ms, 3)}
+
+    if args.json:
+        print(json.dumps(report))
+        return
+
+    print(f"dHash per {args.image_size[0]}x{args.image_size[1]} JPEG: draft {report['dhash_ms']['draft']} ms, "
+          f"full decode {report['dhash_ms']['full_decode']} ms")
+    s = report["search"]
+    print(f"Radius-{s['radius']} query over {s['library']} hashes: index {s['index_query_ms']} ms, "
+          f"linear {s['linear_query_ms']} ms (index build {s['build_s']} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Classifier preprocessing benchmark: decode + resize throughput in the
+classifier's threads (GIL-bound Python around cv2/PIL) versus the
+Preprocessor's worker processes writing into the shared-memory ring.
+
+Frames are consumed the way the classifier does (one ring slot per thread,
+released after use), but no models run, so this isolates the decode stage.
+
+    python -m benchmarks.bench_preprocess [--images 64] [--threads 8] [--processes 1 2 4] [--json]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPO_ROOT, 'backend'))
+from decode import decode_rgb, model_frame
+from preprocess import Preprocessor
+from benchmarks.corpus import write_photos
+
+
+def in_thread(path):
+    rgb = decode_rgb(path)
+    model_frame(rgb)
+
+
+def run(fn, paths, threads):
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        t0 = time.perf_counter()
+        list(pool.map(fn, paths))
+        return len(paths) / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images', type=int, default=64)
+    parser.add_argument('--size', type=int, nargs=2, default=[4032, 3024])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--processes', type=int, nargs='+', default=None)
+    parser.add_argument('--json', action='store_true', help='Print machine-readable JSON only')
+    args = parser.parse_args()
+    cpu = os.cpu_count() or 1
+    process_counts = args.processes or sorted({1, max(1, cpu // 2), max(1, cpu - 1)})
+
+    root = tempfile.mkdtemp(prefix='bench_preprocess_')
+    try:
+        paths = write_photos(root, args.images, tuple(args.size))
+
+        report = {"cpu_count": cpu, "images": args.images, "threads": args.threads,
+                  "threads_fps": round(run(in_thread, paths, args.threads), 1), "processes": {}}
+        for count in process_counts:
+            with Preprocessor(count, slots=args.threads) as pre:
+                pre.load(paths[0]).release()  # workers are up and have imported cv2
+
+                def consume(path):
+                    frame = pre.load(path)
+                    frame.release()
+
+                report["processes"][count] = round(run(consume, paths, args.threads), 1)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report))
+        return
+    print(f"{args.images} x {args.size[0]}x{args.size[1]} JPEG, {cpu} CPUs")
+    print(f"  {args.threads} threads, in-thread decode: {report['threads_fps']:>7.1f} images/s")
+    for count, fps in report["processes"].items():
+        print(f"  {count} worker process(es) + shared memory: {fps:>7.1f} images/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Video date extraction benchmark.
+
+Builds one synthetic clip per container (MP4 with 'moov' after a multi-GB
+sparse 'mdat', MOV with ©day, MKV with DateUTC, AVI with IDIT, WMV with ASF
+File Properties) and reports the per-file cost of extract_video_date, which
+must stay well under a millisecond regardless of clip size.
+
+    python benchmarks/bench_video_meta.py [--mdat-gb 4] [--repeat 1000] [--json]
+"""
+import os
+import sys
+import json
+import time
+import struct
+import shutil
+import datetime
+import tempfile
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from video_meta import extract_video_date
+
+UTC = datetime.timezone.utc
+WHEN = datetime.datetime(2023, 7, 14, 3, 0, tzinfo=UTC)
+
+
+def box(box_type, body):
+    return struct.pack('>I4s', 8 + len(body), box_type) + body
+
+
+def riff_chunk(chunk_id, body):
+    return struct.pack('<4sI', chunk_id, len(body)) + body + (b'\0' if len(body) & 1 else b'')
+
+
+def mvhd():
+    seconds = int((WHEN - datetime.datetime(1904, 1, 1, tzinfo=UTC)).total_seconds())
+    return box(b'mvhd', b'\0\0\0\0' + struct.pack('>II', seconds, seconds) + b'\0' * 88)
+
+
+def write_mp4(path, mdat_size):
+    with open(path, 'wb') as f:
+        f.write(box(b'ftyp', b'isom\0\0\0\0'))
+        f.write(struct.pack('>I4sQ', 1, b'mdat', mdat_size))
+        f.seek(mdat_size - 16, os.SEEK_CUR)  # sparse: no data blocks are written
+        f.write(box(b'moov', mvhd()))
+
+
+def write_mov(path):
+    day = b'2023-07-14T12:00:00+0900'
+    udta = box(b'udta', box(b'\xa9day', struct.pack('>HH', len(day), 0) + day))
+    with open(path, 'wb') as f:
+        f.write(box(b'ftyp', b'qt  ') + box(b'moov', mvhd() + udta))
+
+
+def write_mkv(path):
+    ns = int((WHEN - datetime.datetime(2001, 1, 1, tzinfo=UTC)).total_seconds() * 1e9)
+    date = bytes([0x44, 0x61, 0x88]) + struct.pack('>q', ns)
+    info = bytes.fromhex('1549A966') + (1 << 56 | len(date)).to_bytes(8, 'big') + date
+    segment = bytes.fromhex('18538067') + b'\x01' + b'\xff' * 7 + info
+    ebml = bytes.fromhex('1A45DFA3') + bytes([0x84]) + b'\x42\x86\x81\x01'
+    with open(path, 'wb') as f:
+        f.write(ebml + segment)
+
+
+def write_avi(path):
+    hdrl = riff_chunk(b'LIST', b'hdrl' + riff_chunk(b'avih', b'\0' * 56) +
+                      riff_chunk(b'IDIT', b'FRI JUL 14 03:00:00 2023\n\0'))
+    body = b'AVI ' + hdrl + riff_chunk(b'LIST', b'movi' + b'\0' * 4096)
+    with open(path, 'wb') as f:
+        f.write(b'RIFF' + struct.pack('<I', len(body)) + body)
+
+
+def write_wmv(path):
+    ticks = int((WHEN - datetime.datetime(1601, 1, 1, tzinfo=UTC)).total_seconds() * 1e7)
+    props = (bytes.fromhex('a1dcab8c47a9cf118ee400c00c205365') + struct.pack('<Q', 104) + b'\0' * 16 +
+             struct.pack('<QQ', 0, ticks) + b'\0' * 48)
+    header = bytes.fromhex('3026b2758e66cf11a6d900aa0062ce6c') + struct.pack('<QIBB', 30 + len(props), 1, 1, 2)
+    with open(path, 'wb') as f:
+        f.write(header + props)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mdat-gb', type=float, default=4)
+    parser.add_argument('--repeat', type=int, default=1000)
+    parser.add_argument('--json', action='store_true', help='Print machine-readable JSON only')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='bench_video_')
+    try:
+        files = {
+            'clip.mp4': lambda p: write_mp4(p, int(args.mdat_gb * 1024 ** 3)),
+            'clip.mov': write_mov,
+            'clip.mkv': write_mkv,
+            'clip.avi': write_avi,
+            'clip.wmv': write_wmv,
+        }
+        results = []
+        for name, writer in files.items():
+            path = os.path.join(root, name)
+            writer(path)
+            date = extract_video_date(path)
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                extract_video_date(path)
+            us = (time.perf_counter() - t0) / args.repeat * 1e6
+            results.append({"file": name, "size": os.path.getsize(path), "date": date.isoformat() if date else None,
+                            "us_per_file": round(us, 1)})
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps({"results": results}))
+        return
+    for row in results:
+        print(f"{row['file']:<10} {row['size'] / 1024 ** 2:>10.1f} MB  {row['date']}  {row['us_per_file']:>7.1f} us/file")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Deterministic synthetic photo library for the benchmark suite.
+
+The same (count, seed, size) always produces the same bytes, names and
+mtimes, so runs on different machines or commits scan identical input:
+
+- camera JPEGs with varied EXIF (make/model, dates, orientation, some
+  without DateTimeOriginal), partly under Korean folder and file names
+- PNG screenshots without EXIF
+- HEIC photos (with a 320 px embedded thumbnail) when pillow_heif is installed
+- small MP4s with an mvhd creation date
+- exact duplicates (byte copies under other names) and near duplicates
+  (re-encoded at a smaller size and lower quality)
+
+    python -m benchmarks.corpus OUT_DIR [--count 200] [--seed 0]
+
+write_photos() gives the per-component bench_*.py scripts a flat folder of
+same-sized photos drawn the same way.
+"""
+import os
+import json
+import random
+import struct
+import shutil
+import datetime
+import argparse
+
+from PIL import Image, ImageDraw
+
+try:
+    import pillow_heif
+    pillow_heif.register_heif_opener()
+except ImportError:
+    pillow_heif = None
+
+TAG_MAKE = 0x010F
+TAG_MODEL = 0x0110
+TAG_ORIENTATION = 0x0112
+TAG_DATETIME = 0x0132
+TAG_DATETIME_ORIGINAL = 0x9003
+IFD_EXIF = 0x8769
+
+CAMERAS = [('Apple', 'iPhone 13'), ('Apple', 'iPhone 15 Pro'), ('samsung', 'SM-S918N'),
+           ('Canon', 'Canon EOS R6'), ('SONY', 'ILCE-7M4')]
+FOLDERS = ['', 'DCIM', '여행/제주도', '가족 사진', 'Camera Roll/2023']
+KOREAN_NAMES = ['사진', '가족', '여행', '생일', '바다']
+
+HEIC_THUMBNAIL = 320  # px, like the thumbnails iPhones embed
+
+# Share of `count` for each kind; the remainder are camera JPEGs
+MIX = {'screenshot': 0.10, 'heic': 0.10, 'video': 0.05, 'duplicate': 0.10, 'near_duplicate': 0.05}
+
+EPOCH = datetime.datetime(2021, 1, 1, 9, 0)
+MP4_EPOCH = datetime.datetime(1904, 1, 1)
+
+
+def draw_photo(rng, size):
+    """Gradient background plus random shapes: real structure for dHash and realistic JPEG sizes."""
+    w, h = size
+    img = Image.linear_gradient('L').resize((w, h)).convert('RGB')
+    tint = Image.new('RGB', (w, h), tuple(rng.randrange(256) for _ in range(3)))
+    img = Image.blend(img, tint, 0.5)
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x0, y0 = rng.randrange(w), rng.randrange(h)
+        x1, y1 = x0 + rng.randrange(w // 8, w // 2), y0 + rng.randrange(h // 8, h // 2)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        if rng.random() < 0.5:
+            draw.ellipse((x0, y0, x1, y1), fill=color)
+        else:
+            draw.rectangle((x0, y0, x1, y1), fill=color)
+    return img
+
+
+def save_photo(img, path, **params):
+    """Save by extension; HEIC gets an embedded thumbnail like the ones iPhones write."""
+    if path.lower().endswith('.heic'):
+        params['thumbnails'] = [HEIC_THUMBNAIL]
+    img.save(path, **params)
+
+
+def write_photos(root, count, size=(4032, 3024), ext='.jpg', seed=0, quality=90):
+    """count photos of one size and format, root/IMG_<i><ext>; returns their paths."""
+    os.makedirs(root, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(root, f'IMG_{i}{ext}')
+        save_photo(draw_photo(random.Random(seed + i), size), path, quality=quality)
+        paths.append(path)
+    return paths
+
+
+def camera_exif(rng, when):
+    exif = Image.Exif()
+    make, model = rng.choice(CAMERAS)
+    exif[TAG_MAKE] = make
+    exif[TAG_MODEL] = model
+    exif[TAG_DATETIME] = when.strftime('%Y:%m:%d %H:%M:%S')
+    exif[TAG_ORIENTATION] = rng.choice((1, 1, 1, 6, 3, 8))
+    # Some cameras/editors drop DateTimeOriginal and keep only DateTime
+    if rng.random() < 0.8:
+        exif.get_ifd(IFD_EXIF)[TAG_DATETIME_ORIGINAL] = when.strftime('%Y:%m:%d %H:%M:%S')
+    return exif
+
+
+def _box(box_type, body):
+    return struct.pack('>I4s', 8 + len(body), box_type) + body
+
+
+def write_mp4(path, when, payload):
+    seconds = int((when - MP4_EPOCH).total_seconds())
+    mvhd = _box(b'mvhd', b'\0\0\0\0' + struct.pack('>II', seconds, seconds) + b'\0' * 88)
+    with open(path, 'wb') as f:
+        f.write(_box(b'ftyp', b'isom\0\0\0\0isommp41'))
+        f.write(_box(b'mdat', payload))
+        f.write(_box(b'moov', mvhd))
+
+
+def _file_name(rng, i, ext):
+    if rng.random() < 0.3:
+        return f'{rng.choice(KOREAN_NAMES)}_{i:05d}{ext}'
+    return f'IMG_{i:05d}{ext}'
+
+
+def _path(root, rng, name):
+    folder = os.path.join(root, rng.choice(FOLDERS))
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, name)
+
+
+def build_corpus(root, count=200, seed=0, size=(1600, 1200)):
+    """
+    Write the corpus under root and return a summary dict: {"root", "seed",
+    "files", "bytes", "kinds": {kind: n}}. heic entries are written as JPEG
+    photos when pillow_heif is missing, so the file count stays the same.
+    """
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+    plan = {kind: int(count * share) for kind, share in MIX.items()}
+    if pillow_heif is None:
+        plan['heic'] = 0
+    plan['jpeg'] = count - sum(plan.values())
+
+    kinds = dict.fromkeys(plan, 0)
+    originals = []
+    written = []
+
+    def finish(path, when, kind):
+        ts = when.timestamp()
+        os.utime(path, (ts, ts))
+        written.append(path)
+        kinds[kind] += 1
+
+    i = 0
+    for kind in ('jpeg', 'heic', 'screenshot', 'video'):
+        for _ in range(plan[kind]):
+            i += 1
+            when = EPOCH + datetime.timedelta(days=rng.randrange(3 * 365), seconds=rng.randrange(86400))
+            if kind == 'video':
+                path = _path(root, rng, _file_name(rng, i, '.mp4'))
+                write_mp4(path, when, rng.randbytes(rng.randrange(64, 256) * 1024))
+            elif kind == 'screenshot':
+                name = rng.choice(('Screenshot_{}.png', '스크린샷 {}.png', 'capture_{}.png')).format(i)
+                path = _path(root, rng, name)
+                draw_photo(rng, (size[1] // 2, size[0] // 2)).save(path, optimize=False)
+            else:
+                ext = '.heic' if kind == 'heic' else '.jpg'
+                path = _path(root, rng, _file_name(rng, i, ext))
+                save_photo(draw_photo(rng, size), path, exif=camera_exif(rng, when).tobytes(), quality=85)
+                originals.append((path, when))
+            finish(path, when, kind)
+
+    jpegs = [(p, w) for p, w in originals if p.endswith('.jpg')]
+    for _ in range(plan['duplicate']):
+        i += 1
+        src, when = rng.choice(originals)
+        path = _path(root, rng, _file_name(rng, i, os.path.splitext(src)[1]))
+        shutil.copyfile(src, path)
+        finish(path, when, 'duplicate')
+
+    for _ in range(plan['near_duplicate']):
+        if not jpegs:
+            break
+        i += 1
+        src, when = rng.choice(jpegs)
+        path = _path(root, rng, _file_name(rng, i, '.jpg'))
+        with Image.open(src) as img:
+            exif = img.getexif()
+            img.resize((img.width * 3 // 4, img.height * 3 // 4)).save(path, exif=exif.tobytes(), quality=70)
+        finish(path, when, 'near_duplicate')
+
+    return {"root": root, "seed": seed, "files": len(written),
+            "bytes": sum(os.path.getsize(p) for p in written), "kinds": kinds}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('out')
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', type=int, nargs=2, default=[1600, 1200])
+    args = parser.parse_args()
+    print(json.dumps(build_corpus(args.out, args.count, args.seed, tuple(args.size)), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+End-to-end benchmark: scan -> classify -> cluster on a deterministic corpus.
+
+Each phase runs in its own interpreter so peak RSS and import cost are
+per phase, and a phase whose dependencies are missing (TensorFlow,
+MediaPipe, DeepFace) is reported as skipped instead of failing the suite.
+Per-file latency is measured by wrapping the pipeline stage functions
+(scan: hash / metadata / copy; classify: classify_task, plus analyze_image
+for the images that ran the model cascade rather than hitting the results
+cache; cluster: extract_embedding).
+
+    python -m benchmarks.suite [--count 200] [--seed 0] [--phases scan classify cluster]
+                               [--output report.json] [--baseline old.json [--tolerance 0.2]]
+
+The report is JSON (stdout, or --output). With --baseline, a phase whose
+files/sec dropped by more than the tolerance is listed under "regressions"
+and the exit status is 1.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import functools
+import tempfile
+import argparse
+import subprocess
+
+from benchmarks.corpus import build_corpus
+from benchmarks.rss import peak_rss_mb
+
+REPORT_VERSION = 1
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(REPO_ROOT, 'backend')
+
+PHASES = ('scan', 'classify', 'cluster')
+# phase -> (module, [(stage name, function name)]); the first stage sees every file
+STAGES = {
+    'scan': ('scanner', [('hash', 'hash_stage'), ('metadata', 'metadata_stage'), ('copy', 'copy_stage')]),
+    'classify': ('classifier', [('task', 'classify_task'), ('analyze_image', 'analyze_image')]),
+    'cluster': ('face_cluster', [('extract_embedding', 'extract_embedding')]),
+}
+
+
+def percentiles(samples):
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+    return {"count": len(ordered), "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p50_ms": round(rank(50), 3), "p90_ms": round(rank(90), 3), "p99_ms": round(rank(99), 3),
+            "max_ms": round(ordered[-1] * 1000, 3)}
+
+
+def timed(func, samples):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - t0)  # list.append is atomic under the GIL
+    return wrapper
+
+
+def run_phase(phase, args):
+    """Child process: import the backend module, instrument it, run one phase."""
+    sys.path.insert(0, BACKEND_DIR)
+    module_name, stages = STAGES[phase]
+    t0 = time.perf_counter()
+    try:
+        module = __import__(module_name)
+    except (ImportError, SystemExit) as e:
+        # classifier exits(1) after reporting a failed import
+        return {"status": "skipped", "reason": f"{module_name} import failed: {e!r}"}
+    import_s = time.perf_counter() - t0
+
+    samples = {name: [] for name, _ in stages}
+    for name, attr in stages:
+        setattr(module, attr, timed(getattr(module, attr), samples[name]))
+
+    t0 = time.perf_counter()
+    if phase == 'scan':
+        module.NEAR_DUP_MODE = args.near_dup
+        module.scan_and_organize(args.source, args.dest, args.db)
+    elif phase == 'classify':
+        # Cold results cache inside the work dir: measure inference, not ~/.myphoto
+        module.CACHE_DIR = os.path.join(os.path.dirname(args.db), 'classify_cache')
+        module.run_classification(args.dest, args.db)
+    else:
+        module.run_face_clustering(args.dest, args.db)
+    wall_s = time.perf_counter() - t0
+
+    files = len(samples[stages[0][0]])
+    return {"status": "ok", "files": files, "wall_s": round(wall_s, 3),
+            "files_per_sec": round(files / wall_s, 1) if wall_s else None, "import_s": round(import_s, 3),
+            "peak_rss_mb": peak_rss_mb(), "stages": {name: percentiles(s) for name, s in samples.items()}}
+
+
+def spawn_phase(phase, source, dest, db_path, near_dup):
+    fd, result_path = tempfile.mkstemp(prefix=f'bench_{phase}_', suffix='.json')
+    os.close(fd)
+    try:
+        cmd = [sys.executable, '-m', 'benchmarks.suite', '--run-phase', phase, '--result', result_path,
+               '--source', source, '--dest', dest, '--db', db_path, '--near-dup', near_dup]
+        proc = subprocess.run(cmd, cwd=REPO_ROOT, stdin=subprocess.DEVNULL, capture_output=True,
+                              text=True, encoding='utf-8', errors='replace')
+        try:
+            with open(result_path, encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            tail = (proc.stderr or proc.stdout).strip().splitlines()[-5:]
+            return {"status": "failed", "returncode": proc.returncode, "reason": "\n".join(tail)}
+    finally:
+        os.remove(result_path)
+
+    # The phase's own stdout protocol: keep the final event and count errors
+    events = []
+    for line in proc.stdout.splitlines():
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            continue
+    errors = sum(1 for e in events if e.get("status") == "error")
+    completed = next((e for e in reversed(events) if e.get("status") in ("completed", "skipped")), None)
+    # The classifier loads its models after import; a failed stage makes the run meaningless
+    loaded = next((e for e in events if e.get("status") == "loaded"), None)
+    if loaded:
+        result["startup"] = loaded.get("startup")
+        if loaded.get("failed") and result["status"] == "ok":
+            result["status"] = "skipped"
+    if result["status"] == "skipped" and errors:
+        # e.g. classifier's "Failed to load face_detector: No module named ..."
+        first_error = next(e for e in events if e.get("status") == "error")
+        result["reason"] = str(first_error.get("message", "")).splitlines()[0]
+    result.update(events=len(events), errors=errors, completed=completed)
+    return result
+
+
+def find_regressions(report, baseline, tolerance):
+    regressions = []
+    for phase, current in report["phases"].items():
+        before = baseline.get("phases", {}).get(phase, {})
+        if current.get("status") != "ok" or before.get("status") != "ok" or not before.get("files_per_sec"):
+            continue
+        change = current["files_per_sec"] / before["files_per_sec"] - 1
+        if change < -tolerance:
+            regressions.append({"phase": phase, "baseline_fps": before["files_per_sec"],
+                                "fps": current["files_per_sec"], "change": round(change, 3)})
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', type=int, nargs=2, default=[1600, 1200])
+    parser.add_argument('--phases', nargs='+', choices=PHASES, default=list(PHASES))
+    parser.add_argument('--near-dup', choices=('off', 'flag', 'review'), default='flag')
+    parser.add_argument('--corpus', help='Reuse (or create) the corpus in this directory instead of a temp dir')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', help='Earlier report to compare files/sec against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed files/sec drop vs the baseline')
+    parser.add_argument('--keep', action='store_true', help='Keep the work directory (corpus + library)')
+    # Internal: one phase in this process
+    parser.add_argument('--run-phase', choices=PHASES, help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    parser.add_argument('--source', help=argparse.SUPPRESS)
+    parser.add_argument('--dest', help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_phase:
+        result = run_phase(args.run_phase, args)
+        with open(args.result, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return
+
+    work = tempfile.mkdtemp(prefix='myphoto_suite_')
+    try:
+        source = args.corpus or os.path.join(work, 'corpus')
+        if args.corpus and os.path.isdir(args.corpus) and os.listdir(args.corpus):
+            corpus = {"root": source, "reused": True}
+        else:
+            t0 = time.perf_counter()
+            corpus = build_corpus(source, args.count, args.seed, tuple(args.size))
+            corpus["build_s"] = round(time.perf_counter() - t0, 2)
+        dest = os.path.join(work, 'library')
+        os.makedirs(dest)
+        db_path = os.path.join(work, 'library.db')
+
+        report = {"version": REPORT_VERSION, "revision": git_revision(), "python": platform.python_version(),
+                  "platform": platform.platform(), "cpu_count": os.cpu_count(), "corpus": corpus, "phases": {}}
+        for phase in args.phases:
+            report["phases"][phase] = spawn_phase(phase, source, dest, db_path, args.near_dup)
+
+        status = 0
+        if args.baseline:
+            with open(args.baseline, encoding='utf-8') as f:
+                report["regressions"] = find_regressions(report, json.load(f), args.tolerance)
+            status = 1 if report["regressions"] else 0
+        if args.keep:
+            report["work_dir"] = work
+    finally:
+        if not args.keep:
+            shutil.rmtree(work, ignore_errors=True)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
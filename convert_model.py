@@ -0,0 +1,110 @@
+"""
+Convert backend/models/mobilenet_v3 (the TF-Hub SavedModel written by
+download_model.py) for the lightweight inference backends.
+
+    python convert_model.py --format tflite --quantize int8         # -> mobilenet_v3_int8.tflite (default)
+    python convert_model.py --format tflite --quantize float16      # -> mobilenet_v3_float16.tflite
+    python convert_model.py --format tflite --quantize int8-full --calibration-dir ~/Pictures
+    python convert_model.py --format onnx [--quantize int8]         # -> mobilenet_v3.onnx / mobilenet_v3_int8.onnx
+
+int8 is dynamic-range quantization (int8 weights, float activations) and
+needs no calibration data. int8-full also quantizes activations and the
+input; it needs a folder of representative photos.
+
+Then run the classifier with --inference-backend tflite|onnx [--model PATH].
+Conversion needs full TensorFlow (+ tf2onnx for ONNX); inference afterwards
+only needs ai-edge-litert / tflite-runtime or onnxruntime.
+"""
+import os
+import sys
+import argparse
+
+import numpy as np
+import tensorflow as tf
+import tensorflow_hub as hub
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from inference import MODELS_DIR, DEFAULT_MODELS
+from decode import decode_rgb, model_frame
+
+INPUT_SPEC = tf.TensorSpec([None, 224, 224, 3], tf.float32, name='images')
+CALIBRATION_IMAGES = 200
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.heic')
+
+
+def concrete_function(model):
+    # The re-saved Hub model has no serving signature; trace one with a dynamic batch
+    return tf.function(lambda images: model(images)).get_concrete_function(INPUT_SPEC)
+
+
+def representative_dataset(calibration_dir):
+    paths = []
+    for root, _, files in os.walk(calibration_dir):
+        paths.extend(os.path.join(root, f) for f in sorted(files) if f.lower().endswith(IMAGE_EXTS))
+    if not paths:
+        sys.exit(f"No images found in {calibration_dir}")
+
+    def generate():
+        for path in paths[:CALIBRATION_IMAGES]:
+            rgb = decode_rgb(path)
+            if rgb is not None:
+                yield [model_frame(rgb)[np.newaxis].astype(np.float32) / 255.0]
+    return generate
+
+
+def convert_tflite(model, quantize, calibration_dir, output):
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([concrete_function(model)], model)
+    if quantize != 'none':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantize == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantize == 'int8-full':
+        if not calibration_dir:
+            sys.exit("--quantize int8-full needs --calibration-dir")
+        converter.representative_dataset = representative_dataset(calibration_dir)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.uint8
+        converter.inference_output_type = tf.uint8
+    with open(output, 'wb') as f:
+        f.write(converter.convert())
+
+
+def convert_onnx(model, quantize, output):
+    import tf2onnx
+    if quantize not in ('none', 'int8'):
+        sys.exit("ONNX export supports --quantize none or int8")
+    float_path = output if quantize == 'none' else output + '.float.onnx'
+    tf2onnx.convert.from_function(tf.function(lambda images: model(images)), input_signature=[INPUT_SPEC],
+                                  opset=13, output_path=float_path)
+    if quantize == 'int8':
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(float_path, output, weight_type=QuantType.QInt8)
+        os.remove(float_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--format', choices=('tflite', 'onnx'), default='tflite')
+    parser.add_argument('--quantize', choices=('none', 'float16', 'int8', 'int8-full'), default='int8')
+    parser.add_argument('--calibration-dir', help='Representative photos for int8-full')
+    parser.add_argument('--output', help='Output path (default: next to the SavedModel)')
+    args = parser.parse_args()
+
+    suffix = '' if args.quantize == 'none' else '_' + args.quantize.replace('-', '_')
+    if args.format == 'onnx' and args.quantize == 'none':
+        output = args.output or DEFAULT_MODELS['onnx']
+    else:
+        output = args.output or os.path.join(MODELS_DIR, f'mobilenet_v3{suffix}.{args.format}')
+
+    print(f"Loading {DEFAULT_MODELS['tf']}...")
+    model = hub.load(DEFAULT_MODELS['tf'])
+    print(f"Converting to {args.format} ({args.quantize})...")
+    if args.format == 'tflite':
+        convert_tflite(model, args.quantize, args.calibration_dir, output)
+    else:
+        convert_onnx(model, args.quantize, output)
+    print(f"Model saved to {output} ({os.path.getsize(output) / 1024 ** 2:.1f} MB).")
+
+
+if __name__ == "__main__":
+    main()
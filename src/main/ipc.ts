@@ -58,6 +58,28 @@ if (process.platform === 'win32') {
 let currentPythonProcess: any = null
 let aiEngineProcess: any = null
 
+// Python emits one JSON object per line, but stdout chunks can split a line.
+// Buffer the trailing partial line instead of dropping it.
+function onJsonLines(stream: NodeJS.ReadableStream, onMessage: (msg: any) => void, onText?: (line: string) => void) {
+    let buffer = ''
+    stream.on('data', (data) => {
+        buffer += data.toString()
+        const lines = buffer.split('\n')
+        buffer = lines.pop() ?? ''
+        for (const line of lines) {
+            if (!line.trim()) continue
+            let msg: any
+            try {
+                msg = JSON.parse(line)
+            } catch (e) {
+                onText?.(line)
+                continue
+            }
+            onMessage(msg)
+        }
+    })
+}
+
 export function setupIpc(mainWindow: Electron.BrowserWindow) {
     // Helper to safely register handler
     const safeHandle = (channel: string, listener: (event: Electron.IpcMainInvokeEvent, ...args: any[]) => (Promise<any>) | (any)) => {
@@ -87,7 +109,7 @@ export function setupIpc(mainWindow: Electron.BrowserWindow) {
         }
     })
 
-    safeHandle('scan-files', async (_, source: string | string[], destPath: string) => {
+    safeHandle('scan-files', async (_, source: string | string[], destPath: string, organizeMode?: 'copy' | 'hardlink' | 'move', nearDupMode?: 'off' | 'flag' | 'review') => {
         const dbPath = path.join(destPath, 'myphoto.db')
         const scannerScript = path.join(backendPath, 'scanner.py')
 
@@ -111,7 +133,15 @@ export function setupIpc(mainWindow: Electron.BrowserWindow) {
         console.log(`[IPC] PYTHONPATH: ${sitePackagesPath}`)
         mainWindow.webContents.send('error-log', `[시스템] 스캔 프로세스 시작: ${scannerScript}`)
 
-        const pythonProcess = spawn(pythonPath, ['-u', scannerScript, sourceArg, destPath, dbPath], {
+        const scannerArgs = ['-u', scannerScript, sourceArg, destPath, dbPath]
+        if (organizeMode) {
+            scannerArgs.push('--organize-mode', organizeMode)
+        }
+        if (nearDupMode) {
+            scannerArgs.push('--near-dup', nearDupMode)
+        }
+
+        const pythonProcess = spawn(pythonPath, scannerArgs, {
             env: { ...process.env, PYTHONPATH: sitePackagesPath }
         })
         currentPythonProcess = pythonProcess
@@ -124,22 +154,13 @@ export function setupIpc(mainWindow: Electron.BrowserWindow) {
         })
 
         let newImagesCount = 0
-        pythonProcess.stdout.on('data', (data) => {
-            const lines = data.toString().split('\n')
-            for (const line of lines) {
-                if (line.trim()) {
-                    try {
-                        const status = JSON.parse(line)
-                        mainWindow.webContents.send('scanner-status', status)
-                        if (status.status === 'completed' && status.new_images !== undefined) {
-                            newImagesCount = status.new_images
-                        }
-                    } catch (e) {
-                        console.error('Failed to parse python output:', line)
-                    }
-                }
+        // Progress arrives as batched events (a few per second), so each line is forwarded as-is
+        onJsonLines(pythonProcess.stdout, (status) => {
+            mainWindow.webContents.send('scanner-status', status)
+            if (status.status === 'completed' && status.new_images !== undefined) {
+                newImagesCount = status.new_images
             }
-        })
+        }, (line) => console.error('Failed to parse python output:', line))
 
         pythonProcess.stderr.on('data', (data) => {
             const errorMsg = data.toString()
@@ -161,81 +182,72 @@ export function setupIpc(mainWindow: Electron.BrowserWindow) {
     })
 
 
-    safeHandle('initialize-ai', async () => {
+    // Service mode answers within a fraction of a second ('started'), then loads its
+    // models in the background and reports each stage as a 'ready' event:
+    // decoder -> face_detector -> classifier, followed by 'loaded' with timings.
+    // Classify commands can be sent at any point; they wait for the stages they need.
+    const startAiEngine = (reason: string) => {
         const classifierScript = path.join(backendPath, 'classifier.py')
+        console.log(`Starting AI Engine in Service Mode (${reason})...`)
+        const pythonProcess = spawn(pythonPath, ['-u', classifierScript, '--mode', 'service'], {
+            env: { ...process.env, PYTHONPATH: sitePackagesPath, PYTHONWARNINGS: 'ignore' }
+        })
+        aiEngineProcess = pythonProcess
 
-        if (!aiEngineProcess || aiEngineProcess.exitCode !== null) {
-            console.log("Pre-starting AI Engine in Service Mode...")
-            const pythonProcess = spawn(pythonPath, ['-u', classifierScript, '--mode', 'service'], {
-                env: { ...process.env, PYTHONPATH: sitePackagesPath, PYTHONWARNINGS: 'ignore' }
-            })
-            aiEngineProcess = pythonProcess
+        pythonProcess.on('error', (err) => {
+            const msg = `Failed to start AI process: ${err.message}`
+            console.error(msg)
+            mainWindow.webContents.send('error-log', `[치명적 오류] AI 프로세스 실행 실패: ${err.message}`)
+        })
 
-            pythonProcess.on('error', (err) => {
-                const msg = `Failed to start AI process: ${err.message}`
-                console.error(msg)
-                mainWindow.webContents.send('error-log', `[치명적 오류] AI 프로세스 실행 실패: ${err.message}`)
-            })
+        onJsonLines(pythonProcess.stdout, (status) => {
+            mainWindow.webContents.send('classifier-status', status)
+            pythonProcess.emit('json-message', status)
+        }, (line) => console.log('AI Log:', line))
 
-            pythonProcess.stdout.on('data', (data) => {
-                const lines = data.toString().split('\n')
-                for (const line of lines) {
-                    if (line.trim()) {
-                        try {
-                            const status = JSON.parse(line)
-                            mainWindow.webContents.send('classifier-status', status)
-                            pythonProcess.emit('json-message', status)
-                        } catch (e) {
-                            console.log('AI Log:', line)
-                        }
-                    }
-                }
-            })
+        pythonProcess.stderr.on('data', (data) => {
+            const msg = data.toString()
+            if (!msg.includes('GL version') && !msg.includes('gl_context') && !msg.includes('Metal')) {
+                console.error(`AI Engine Error: ${msg}`)
+            }
+        })
+        return pythonProcess
+    }
 
-            pythonProcess.stderr.on('data', (data) => {
-                const msg = data.toString()
-                if (!msg.includes('GL version') && !msg.includes('gl_context') && !msg.includes('Metal')) {
-                    console.error(`AI Engine Error: ${msg}`)
-                }
-            })
+    // Resolves true once the engine accepts commands, false if it failed to start
+    safeHandle('initialize-ai', async () => {
+        if (aiEngineProcess && aiEngineProcess.exitCode === null) {
             return true
         }
-        return false
+        const pythonProcess = startAiEngine('pre-start')
+        return new Promise((resolve) => {
+            const cleanup = () => {
+                pythonProcess.removeListener('json-message', messageHandler)
+                pythonProcess.removeListener('error', failed)
+                pythonProcess.removeListener('exit', failed)
+            }
+            const messageHandler = (status: any) => {
+                if (status.status === 'started') {
+                    cleanup()
+                    resolve(true)
+                }
+            }
+            const failed = () => {
+                cleanup()
+                resolve(false)
+            }
+            pythonProcess.on('json-message', messageHandler)
+            pythonProcess.once('error', failed)
+            pythonProcess.once('exit', failed)
+        })
     })
 
     safeHandle('classify-images', async (_, destPath: string) => {
         const dbPath = path.join(destPath, 'myphoto.db')
-        const classifierScript = path.join(backendPath, 'classifier.py')
 
         // Start Persistent Engine if not running
         if (!aiEngineProcess || aiEngineProcess.exitCode !== null) {
-            console.log("Starting AI Engine in Service Mode (On-demand)...")
-            const pythonProcess = spawn(pythonPath, ['-u', classifierScript, '--mode', 'service'], {
-                env: { ...process.env, PYTHONPATH: sitePackagesPath, PYTHONWARNINGS: 'ignore' }
-            })
-            aiEngineProcess = pythonProcess
-
-            pythonProcess.stdout.on('data', (data) => {
-                const lines = data.toString().split('\n')
-                for (const line of lines) {
-                    if (line.trim()) {
-                        try {
-                            const status = JSON.parse(line)
-                            mainWindow.webContents.send('classifier-status', status)
-                            pythonProcess.emit('json-message', status)
-                        } catch (e) {
-                            console.log('AI Log:', line)
-                        }
-                    }
-                }
-            })
-
-            pythonProcess.stderr.on('data', (data) => {
-                const msg = data.toString()
-                if (!msg.includes('GL version') && !msg.includes('gl_context') && !msg.includes('Metal')) {
-                    console.error(`AI Engine Error: ${msg}`)
-                }
-            })
+            startAiEngine('on-demand')
         }
 
         // Return a promise that waits for completion
@@ -290,18 +302,8 @@ export function setupIpc(mainWindow: Electron.BrowserWindow) {
         })
         currentPythonProcess = pythonProcess
 
-        pythonProcess.stdout.on('data', (data) => {
-            const lines = data.toString().split('\n')
-            for (const line of lines) {
-                if (line.trim()) {
-                    try {
-                        const status = JSON.parse(line)
-                        mainWindow.webContents.send('cluster-status', status)
-                    } catch (e) {
-                        // ignore partial json
-                    }
-                }
-            }
+        onJsonLines(pythonProcess.stdout, (status) => {
+            mainWindow.webContents.send('cluster-status', status)
         })
 
         return new Promise((resolve) => {
@@ -6,7 +6,7 @@ const api = {
     selectDirectory: () => ipcRenderer.invoke('select-directory'),
     selectFiles: () => ipcRenderer.invoke('select-files'),
     initializeAi: () => ipcRenderer.invoke('initialize-ai'),
-    scanFiles: (source: string | string[], dest: string) => ipcRenderer.invoke('scan-files', source, dest),
+    scanFiles: (source: string | string[], dest: string, organizeMode?: 'copy' | 'hardlink' | 'move', nearDupMode?: 'off' | 'flag' | 'review') => ipcRenderer.invoke('scan-files', source, dest, organizeMode, nearDupMode),
     pauseProcess: () => ipcRenderer.invoke('pause-process'),
     resumeProcess: () => ipcRenderer.invoke('resume-process'),
     classifyImages: (dest: string) => ipcRenderer.invoke('classify-images', dest),
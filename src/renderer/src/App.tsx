@@ -2,6 +2,13 @@ import React, { useState, useEffect, useRef } from 'react'
 import { FolderOpen, Play, Pause, CheckCircle2, FileText, ImageIcon, Loader2, Square, XCircle, Layers, Bell } from 'lucide-react'
 import logo from './assets/bi_logo.png'
 
+// Stages the AI engine reports as it loads in the background (classifier.py STAGES)
+const AI_STAGE_LABELS: Record<string, string> = {
+    decoder: '이미지 디코더',
+    face_detector: '얼굴 인식',
+    classifier: 'AI 분류 모델'
+}
+
 function App() {
     // Basic Settings
     const [sourcePath, setSourcePath] = useState<string>('')
@@ -81,8 +88,19 @@ function App() {
 
         const scannerListener = (_event: any, status: any) => {
             if (status.status === 'progress') {
-                setScanProgress({ file: status.file, type: status.type })
-                setLogs(prev => [`[정리] ${status.file} (${status.type})`, ...prev.slice(0, 50)])
+                if (status.file) setScanProgress({ file: status.file, type: status.type })
+                if (status.processed === undefined) {
+                    // One-off phase notice (e.g. the library duplicate check), not a batch summary
+                    setLogs(prev => [`[정리] ${status.file}`, ...prev.slice(0, 50)])
+                    return
+                }
+                // Batched event: one summary line per interval instead of one per file
+                const found = status.discovered ?? status.total
+                const summary = found ? `${status.processed}/${found}` : `${status.processed}`
+                setLogs(prev => [`[정리] ${summary} (${status.rate}/s) ${(status.recent || []).join(', ')}`, ...prev.slice(0, 50)])
+                for (const err of status.errors || []) {
+                    setLogs(prev => [`[오류] ${err}`, ...prev.slice(0, 50)])
+                }
             } else if (status.status === 'skipped') {
                 setLogs(prev => [`[스캔] 중복 건너김: ${status.file}`, ...prev.slice(0, 50)])
             } else if (status.status === 'paused') {
@@ -101,8 +119,9 @@ function App() {
                 if (status.total) setAiTotalCount(status.total)
                 if (status.current) setAiProcessedCount(status.current)
 
-                // Optional: Reduce log spam for AI by only logging key events or reducing frequency
-                setLogs(prev => [`[AI] ${status.file} -> ${status.category}`, ...prev.slice(0, 50)])
+                // Batched event: log the latest file plus how many others finished since the last one
+                const counts = Object.entries(status.counts || {}).map(([k, v]) => `${k} ${v}`).join(', ')
+                setLogs(prev => [`[AI] ${status.file} -> ${status.category} (${counts})`, ...prev.slice(0, 50)])
             } else if (status.status === 'completed') {
                 // Handled in processQueue
             } else if (status.status === 'paused') {
@@ -113,10 +132,19 @@ function App() {
                 setIsAiPaused(false)
                 setLogs(prev => ['[AI] AI 분석이 재개되었습니다.', ...prev])
                 showNotification('AI 분석이 재개되었습니다.')
+            } else if (status.status === 'warning') {
+                // Non-fatal fallback; the run continues
+                setLogs(prev => [`[AI] 경고: ${status.message}`, ...prev.slice(0, 50)])
+            } else if (status.status === 'started') {
+                setLogs(prev => [`[AI] AI 엔진 시작 (${status.seconds}s), 작업 대기 가능`, ...prev])
             } else if (status.status === 'startup') {
                 setLogs(prev => ['[AI] AI 모델 로딩 중...', ...prev])
             } else if (status.status === 'ready') {
-                setLogs(prev => ['[AI] AI 모델 준비 완료.', ...prev])
+                const stage = AI_STAGE_LABELS[status.stage] ?? 'AI 모델'
+                setLogs(prev => [`[AI] ${stage} 준비 완료 (${status.seconds}s)`, ...prev])
+            } else if (status.status === 'loaded') {
+                const phases = Object.entries(status.startup || {}).map(([k, v]) => `${k} ${v}s`).join(', ')
+                setLogs(prev => [`[AI] 로딩 시간: ${phases}`, ...prev])
             }
         }
 
@@ -206,7 +234,8 @@ function App() {
             const scanSource = selectedFiles ? selectedFiles : sourcePath
             const currentDest = destPath
 
-            const scanResult = await window.api.scanFiles(scanSource, currentDest)
+            // Near-duplicates are imported as usual and recorded (files.near_dup_of)
+            const scanResult = await window.api.scanFiles(scanSource, currentDest, undefined, 'flag')
 
             if (scanResult.success) {
                 if (scanResult.newImages > 0) {
@@ -13,7 +13,7 @@ declare global {
             selectDirectory: () => Promise<string | null>
             selectFiles: () => Promise<string[] | null>
             initializeAi: () => Promise<boolean>
-            scanFiles: (source: string | string[], dest: string) => Promise<{ success: boolean; newImages: number }>
+            scanFiles: (source: string | string[], dest: string, organizeMode?: 'copy' | 'hardlink' | 'move', nearDupMode?: 'off' | 'flag' | 'review') => Promise<{ success: boolean; newImages: number }>
             pauseProcess: () => Promise<boolean>
             resumeProcess: () => Promise<boolean>
             classifyImages: (dest: string) => Promise<{ success: boolean; message?: string; peopleCount?: number }>
@@ -0,0 +1,47 @@
+import os
+import sys
+import json
+import subprocess
+
+# Smoke test: run face_cluster.py the way ipc.ts 'face-cluster' does (script dest db)
+project_root = os.path.dirname(os.path.abspath(__file__))
+cluster_script = os.path.join(project_root, "backend", "face_cluster.py")
+
+# Stand-ins for the heavy ML packages when they are not installed; an empty
+# library never reaches them
+STUBS = {
+    "sklearn/__init__.py": "",
+    "sklearn/cluster.py": "class DBSCAN:\n    pass\n",
+    "deepface/__init__.py": "class DeepFace:\n    pass\n",
+}
+
+
+def write_stubs(root):
+    for rel, source in STUBS.items():
+        package = rel.split("/")[0]
+        try:
+            __import__(package)
+            continue
+        except ImportError:
+            pass
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(source)
+
+
+def test_face_cluster_cli(tmp_path):
+    stubs = tmp_path / "stubs"
+    write_stubs(str(stubs))
+    dest = tmp_path / "library"
+    dest.mkdir()
+    db_path = dest / "myphoto.db"
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(stubs), os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run([sys.executable, "-u", cluster_script, str(dest), str(db_path)],
+                          capture_output=True, text=True, env=env, timeout=120)
+
+    events = [json.loads(line) for line in proc.stdout.splitlines() if line.startswith("{")]
+    assert [e for e in events if e["status"] == "error"] == []
+    assert events[-1]["status"] == "completed"
+    assert db_path.exists()